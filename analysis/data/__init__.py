@@ -0,0 +1 @@
+from .recording import ColumnarColumn, Recording, load_recording
@@ -0,0 +1,174 @@
+import numpy as np
+from bionic_boarder_simulation_tool.riding.columnar_recording import COLUMNAR_MAGIC, ColumnarRecordingReader
+from bionic_boarder_simulation_tool.riding.recording_format import open_recording
+
+"""
+Largest span of samples that a ColumnarColumn reads at once to gather the samples at an array of indexes.
+"""
+TAKE_WINDOW_SIZE = 1 << 16
+
+
+class ColumnarColumn:
+    """
+    One field of a columnar recording, read from the recording as it is indexed. A slice or the samples at an array
+    of indexes only decompress the chunks holding them, so the column can be read a window at a time like a memory
+    mapped column. Converting it to an array decompresses it as a whole.
+    """
+
+    def __init__(self, reader: ColumnarRecordingReader, field: str) -> None:
+        self.__reader = reader
+        self.__field = field
+        self.__length = reader.number_of_samples
+
+    @property
+    def dtype(self) -> np.dtype:
+        return self.__reader.dtype.fields[self.__field][0]
+
+    @property
+    def shape(self) -> tuple[int]:
+        return (self.__length,)
+
+    def __len__(self) -> int:
+        return self.__length
+
+    def __array__(self, dtype=None, copy=None) -> np.ndarray:
+        values = self.__read(0, self.__length)
+        return values if dtype is None else values.astype(dtype)
+
+    def __getitem__(self, key):
+        if isinstance(key, slice):
+            start, stop, step = key.indices(self.__length)
+            if step < 0:
+                return np.asarray(self)[key]
+            return self.__read(start, stop)[::step]
+        if isinstance(key, (int, np.integer)):
+            index = key + self.__length if key < 0 else key
+            if not 0 <= index < self.__length:
+                raise IndexError(f"Index {key} is out of range for a column of {self.__length} samples")
+            return self.__read(index, index + 1)[0]
+        indexes = np.asarray(key)
+        if indexes.dtype == bool:
+            return np.asarray(self)[indexes]
+        indexes = np.where(indexes < 0, indexes + self.__length, indexes)
+        values = np.empty(indexes.shape, dtype=self.dtype)
+        if indexes.size == 0:
+            return values
+        # Every run of sorted indexes within one window is read with a single read of the window
+        flat = indexes.ravel()
+        order = np.argsort(flat, kind="stable")
+        sorted_indexes = flat[order]
+        gathered = np.empty(len(flat), dtype=self.dtype)
+        first = 0
+        while first < len(sorted_indexes):
+            start = int(sorted_indexes[first])
+            last = int(np.searchsorted(sorted_indexes, start + TAKE_WINDOW_SIZE, side="left"))
+            stop = int(sorted_indexes[last - 1]) + 1
+            gathered[first:last] = self.__read(start, stop)[sorted_indexes[first:last] - start]
+            first = last
+        values.ravel()[order] = gathered
+        return values
+
+    def searchsorted(self, value, side: str = "left"):
+        """
+        Finds where [value] would be inserted to keep the column in order. The time field is searched from the
+        chunk index, decompressing one chunk at most.
+        """
+        if self.__field == self.__reader.time_field and np.ndim(value) == 0:
+            return self.__reader.search_time(value, side)
+        return np.asarray(self).searchsorted(value, side)
+
+    def __read(self, start: int, stop: int) -> np.ndarray:
+        return self.__reader.read_samples([self.__field], start, stop)[self.__field]
+
+
+class Recording:
+    """
+    Column-oriented view of a recording for the analysis scripts. Row recordings, with or without a header, are
+    memory mapped, so a column is a strided view of the file that is only read as it is used. A column of a
+    columnar recording is a ColumnarColumn, which decompresses the chunks of the samples it is indexed with.
+    """
+
+    def __init__(self, file_name: str) -> None:
+        self.__file_name = file_name
+        with open(file_name, "rb") as file:
+            columnar = file.read(len(COLUMNAR_MAGIC)) == COLUMNAR_MAGIC
+        if columnar:
+            self.__reader = ColumnarRecordingReader(file_name)
+            self.__records = None
+            self.__metadata = self.__reader.metadata
+            self.__dtype = self.__reader.dtype
+            self.__length = self.__reader.number_of_samples
+        else:
+            self.__reader = None
+            header, self.__records = open_recording(file_name)
+            self.__metadata = header.metadata
+            self.__dtype = header.dtype
+            self.__length = len(self.__records)
+
+    @property
+    def file_name(self) -> str:
+        return self.__file_name
+
+    @property
+    def metadata(self) -> dict:
+        """
+        Metadata of the recording, empty for recordings without a header.
+        """
+        return self.__metadata
+
+    @property
+    def dtype(self) -> np.dtype:
+        return self.__dtype
+
+    @property
+    def fields(self) -> tuple[str, ...]:
+        return self.__dtype.names
+
+    def __len__(self) -> int:
+        return self.__length
+
+    def __getitem__(self, field: str) -> np.ndarray:
+        return self.column(field)
+
+    def column(self, field: str) -> np.ndarray | ColumnarColumn:
+        """
+        Returns:
+            the values of [field] of every sample, as a view of a row recording or a ColumnarColumn
+        Raises:
+            KeyError: if the recording has no such field
+        """
+        if field not in self.__dtype.names:
+            raise KeyError(f"Recording {self.__file_name} has no field {field}")
+        if self.__records is not None:
+            return self.__records[field]
+        return ColumnarColumn(self.__reader, field)
+
+    def window(self, start_time: float = None, end_time: float = None, fields: list[str] = None) -> np.ndarray:
+        """
+        Args:
+            start_time: start of the time window in seconds, or None for the start of the recording
+            end_time: end of the time window in seconds, inclusive, or None for the end of the recording
+            fields: names of the fields, or None for all fields. The timestamp is always included.
+        Returns:
+            the samples in the time window as a structured array
+        """
+        if self.__reader is not None:
+            return self.__reader.read(fields, start_time, end_time)
+        timestamps = self.__records["timestamp"]
+        start = 0 if start_time is None else int(np.searchsorted(timestamps, start_time, side="left"))
+        end = len(timestamps) if end_time is None else int(np.searchsorted(timestamps, end_time, side="right"))
+        records = self.__records[start:end]
+        if fields is None:
+            return records
+        names = ["timestamp"] + [name for name in fields if name != "timestamp"]
+        selected = np.empty(len(records), dtype=[(name, self.__dtype.fields[name][0]) for name in names])
+        for name in names:
+            selected[name] = records[name]
+        return selected
+
+
+def load_recording(file_name: str) -> Recording:
+    """
+    Opens a row or columnar recording for analysis.
+    """
+    return Recording(file_name)
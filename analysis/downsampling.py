@@ -0,0 +1,301 @@
+import numpy as np
+from analysis.streaming_stats import DEFAULT_WINDOW_SIZE
+
+"""
+Default number of points drawn per channel, about one per pixel of a full-width plot.
+"""
+DEFAULT_POINTS = 2000
+
+"""
+Default number of samples in a block of the finest level of a min/max pyramid. Windows with fewer samples per
+bucket are small enough to be downsampled from their samples.
+"""
+DEFAULT_BASE_BLOCK_SIZE = 64
+
+
+def window_indexes(timestamps: np.ndarray, start_time: float = None, end_time: float = None) -> tuple[int, int]:
+    """
+    Finds the samples within a time window by binary search, so only the window of a memory mapped recording is
+    read afterwards.
+
+    Returns:
+        the index of the first sample in the window and the index after the last one
+    """
+    start = 0 if start_time is None else int(np.searchsorted(timestamps, start_time, side="left"))
+    stop = len(timestamps) if end_time is None else int(np.searchsorted(timestamps, end_time, side="right"))
+    return start, max(start, stop)
+
+
+def minmax_indexes(values: np.ndarray, points: int = DEFAULT_POINTS) -> np.ndarray:
+    """
+    Downsamples a channel to the minimum and the maximum sample of every bucket, in time order, so the drawn
+    envelope keeps every peak of the channel.
+
+    Returns:
+        the indexes of at most [points] selected samples
+    """
+    n = len(values)
+    buckets = max(1, points // 2)
+    if n <= points:
+        return np.arange(n)
+    bucket_size = -(-n // buckets)
+    padded = np.empty(buckets * bucket_size, dtype=values.dtype)
+    padded[:n] = values
+    # Padding with the last sample keeps the last bucket's minimum and maximum those of the channel.
+    padded[n:] = values[n - 1]
+    padded = padded.reshape(buckets, bucket_size)
+    offsets = np.arange(buckets) * bucket_size
+    minimums = np.minimum(offsets + padded.argmin(axis=1), n - 1)
+    maximums = np.minimum(offsets + padded.argmax(axis=1), n - 1)
+    return np.sort(np.column_stack((minimums, maximums)), axis=1).ravel()
+
+
+class MinMaxPyramid:
+    """
+    Min/max pyramid of a channel. Every level holds the index and value of the minimum and the maximum sample of
+    every aligned block of the channel, with blocks of [base_block_size] samples at the finest level and twice the
+    size of the level below at every other level. The min/max envelope of any time window is read from the level
+    whose blocks fit the buckets of the window instead of from every sample of the window.
+
+    The pyramid is built lazily in tiles of about [window_size] samples. The levels whose blocks fit in a tile are
+    built for a whole tile from its samples the first time a window reaches into it, and the coarser levels are
+    reduced from the coarsest level of the tiles when they are read. Creating a pyramid reads no samples, and
+    zooming into a window only reads the tiles of that window.
+    """
+
+    def __init__(
+        self, values: np.ndarray, base_block_size: int = DEFAULT_BASE_BLOCK_SIZE, window_size: int = DEFAULT_WINDOW_SIZE
+    ):
+        self.__values = values
+        self.__base_block_size = base_block_size
+        # Only the full blocks are kept, the samples after the last one are read from the channel when needed
+        self.__base_blocks = len(values) // base_block_size
+        # Tiles hold a power of two number of blocks, so the blocks of the levels up to the tile level are aligned
+        # with the tiles
+        self.__tile_level = max(0, (window_size // base_block_size).bit_length() - 1)
+        self.__tiles: dict[int, list[tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]]] = {}
+
+    @staticmethod
+    def __coarser(
+        minimum_indexes: np.ndarray, maximum_indexes: np.ndarray, minimums: np.ndarray, maximums: np.ndarray
+    ) -> tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+        """
+        Returns:
+            the level with blocks of two blocks of the given level
+        """
+        pairs = len(minimums) // 2
+        rows = np.arange(pairs)
+        argmins = minimums[: 2 * pairs].reshape(pairs, 2).argmin(axis=1)
+        argmaxs = maximums[: 2 * pairs].reshape(pairs, 2).argmax(axis=1)
+        return (
+            minimum_indexes[: 2 * pairs].reshape(pairs, 2)[rows, argmins],
+            maximum_indexes[: 2 * pairs].reshape(pairs, 2)[rows, argmaxs],
+            minimums[: 2 * pairs].reshape(pairs, 2)[rows, argmins],
+            maximums[: 2 * pairs].reshape(pairs, 2)[rows, argmaxs],
+        )
+
+    @property
+    def levels(self) -> int:
+        """
+        Number of levels of the pyramid.
+        """
+        return self.__base_blocks.bit_length()
+
+    @property
+    def built_tiles(self) -> int:
+        """
+        Number of tiles built so far.
+        """
+        return len(self.__tiles)
+
+    def __block_count(self, level: int) -> int:
+        return self.__base_blocks >> level
+
+    def __tile(self, tile: int) -> list[tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]]:
+        """
+        Returns:
+            the levels of [tile] up to the tile level, built from its samples the first time it is read
+        """
+        if tile not in self.__tiles:
+            base = self.__base_block_size
+            tile_size = base << self.__tile_level
+            offset = tile * tile_size
+            stop = min(offset + tile_size, self.__base_blocks * base)
+            blocks = np.asarray(self.__values[offset:stop]).reshape(-1, base)
+            offsets = offset + np.arange(len(blocks)) * base
+            argmins = blocks.argmin(axis=1)
+            argmaxs = blocks.argmax(axis=1)
+            rows = np.arange(len(blocks))
+            levels = [(offsets + argmins, offsets + argmaxs, blocks[rows, argmins], blocks[rows, argmaxs])]
+            while len(levels) <= self.__tile_level:
+                levels.append(self.__coarser(*levels[-1]))
+            self.__tiles[tile] = levels
+        return self.__tiles[tile]
+
+    def __blocks(self, level: int, first: int, last: int) -> tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+        """
+        Returns:
+            the indexes and values of the minimums and maximums of the blocks from [first] up to, but not including,
+            [last] of [level]
+        """
+        if level > self.__tile_level:
+            return self.__coarser(*self.__blocks(level - 1, 2 * first, 2 * last))
+        blocks_per_tile = 1 << (self.__tile_level - level)
+        first_tile = first // blocks_per_tile
+        tiles = [self.__tile(tile)[level] for tile in range(first_tile, (last - 1) // blocks_per_tile + 1)]
+        start = first - first_tile * blocks_per_tile
+        return tuple(np.concatenate(arrays)[start : start + last - first] for arrays in zip(*tiles))
+
+    def indexes(self, start: int, stop: int, points: int = DEFAULT_POINTS) -> np.ndarray:
+        """
+        Downsamples the samples from [start] up to, but not including, [stop] to the minimum and the maximum sample
+        of every bucket like minmax_indexes. The buckets are made of the blocks of the coarsest level whose blocks
+        are not larger than the buckets, and the samples at the ends of the window that do not fill a block of that
+        level are covered by blocks of the finer levels, so only about [points] entries of the pyramid are read.
+
+        Returns:
+            the indexes of about [points] selected samples, in time order
+        """
+        n = stop - start
+        buckets = max(1, points // 2)
+        if n <= points:
+            return np.arange(start, stop)
+        bucket_size = -(-n // buckets)
+        if bucket_size < self.__base_block_size or self.levels == 0:
+            return start + minmax_indexes(np.asarray(self.__values[start:stop]), points)
+        level = min(int(np.log2(bucket_size // self.__base_block_size)), self.levels - 1)
+        block_size = self.__base_block_size << level
+        first = -(-start // block_size)
+        last = min(stop // block_size, self.__block_count(level))
+        if first >= last:
+            return self.__range_indexes(start, stop)
+        minimum_indexes, maximum_indexes, minimums, maximums = self.__blocks(level, first, last)
+        # Every bucket is made of the same number of consecutive blocks, and like in minmax_indexes the last bucket
+        # is padded with the last block.
+        blocks = last - first
+        blocks_per_bucket = -(-blocks // buckets)
+        bucket_count = -(-blocks // blocks_per_bucket)
+        padded = np.minimum(np.arange(bucket_count * blocks_per_bucket), blocks - 1)
+        padded = padded.reshape(bucket_count, blocks_per_bucket)
+        rows = np.arange(bucket_count)
+        bucket_minimums = minimum_indexes[padded[rows, minimums[padded].argmin(axis=1)]]
+        bucket_maximums = maximum_indexes[padded[rows, maximums[padded].argmax(axis=1)]]
+        middle = np.sort(np.column_stack((bucket_minimums, bucket_maximums)), axis=1).ravel()
+        return np.concatenate(
+            (self.__range_indexes(start, first * block_size), middle, self.__range_indexes(last * block_size, stop))
+        )
+
+    def __range_indexes(self, start: int, stop: int) -> np.ndarray:
+        """
+        Finds the minimum and the maximum sample from [start] up to, but not including, [stop] from the largest
+        blocks of the pyramid that fit in the range, and from the samples at its ends that do not fill a block of
+        the finest level.
+
+        Returns:
+            the indexes of the minimum and the maximum sample in time order, or no indexes for an empty range
+        """
+        candidates = []
+        base = self.__base_block_size
+        head_stop = min(stop, -(-start // base) * base)
+        tail_start = max(head_stop, stop // base * base)
+        for range_start, range_stop in ((start, head_stop), (tail_start, stop)):
+            if range_start < range_stop:
+                samples = np.asarray(self.__values[range_start:range_stop])
+                argmin, argmax = int(samples.argmin()), int(samples.argmax())
+                candidates.append((range_start + argmin, samples[argmin], range_start + argmax, samples[argmax]))
+        position = head_stop
+        while position < tail_start:
+            # The largest block aligned at the position that does not reach past the range
+            level = self.levels - 1
+            while position % (base << level) != 0 or position + (base << level) > tail_start:
+                level -= 1
+            block = position // (base << level)
+            minimum_indexes, maximum_indexes, minimums, maximums = self.__blocks(level, block, block + 1)
+            candidates.append((minimum_indexes[0], minimums[0], maximum_indexes[0], maximums[0]))
+            position += base << level
+        if not candidates:
+            return np.empty(0, dtype=np.int64)
+        minimum = min(candidates, key=lambda candidate: candidate[1])[0]
+        maximum = max(candidates, key=lambda candidate: candidate[3])[2]
+        return np.array(sorted((minimum, maximum)), dtype=np.int64)
+
+
+def lttb_indexes(x: np.ndarray, y: np.ndarray, points: int = DEFAULT_POINTS) -> np.ndarray:
+    """
+    Downsamples a channel with the Largest-Triangle-Three-Buckets algorithm, which keeps the first and last sample
+    and from every bucket in between the sample forming the largest triangle with the previously selected sample
+    and the mean of the next bucket. It keeps the visual shape of the channel with one sample per bucket.
+
+    Returns:
+        the indexes of [points] selected samples, or of every sample if there are not more
+    """
+    n = len(y)
+    if points >= n or points < 3:
+        return np.arange(n)
+    x = np.asarray(x, dtype=np.float64)
+    y = np.asarray(y, dtype=np.float64)
+    edges = np.linspace(1, n - 1, points - 1).astype(np.int64)
+    indexes = np.empty(points, dtype=np.int64)
+    indexes[0] = 0
+    indexes[-1] = n - 1
+    selected = 0
+    for bucket in range(points - 2):
+        start, stop = edges[bucket], edges[bucket + 1]
+        if bucket + 2 < len(edges):
+            next_start, next_stop = edges[bucket + 1], edges[bucket + 2]
+            next_x, next_y = x[next_start:next_stop].mean(), y[next_start:next_stop].mean()
+        else:
+            next_x, next_y = x[n - 1], y[n - 1]
+        selected_x, selected_y = x[selected], y[selected]
+        areas = np.abs(
+            (selected_x - next_x) * (y[start:stop] - selected_y) - (selected_x - x[start:stop]) * (next_y - selected_y)
+        )
+        selected = start + int(areas.argmax())
+        indexes[bucket + 1] = selected
+    return indexes
+
+
+def downsample(
+    timestamps: np.ndarray,
+    values: np.ndarray,
+    points: int = DEFAULT_POINTS,
+    method: str = "minmax",
+    start_time: float = None,
+    end_time: float = None,
+    pyramid: MinMaxPyramid = None,
+) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Selects at most about [points] samples of a channel within a time window for plotting. With the min/max
+    [pyramid] of the channel, only the selected samples are read. The min/max envelope is then read from the
+    pyramid, and LTTB selects its samples among the samples of a min/max envelope of twice as many points.
+
+    Args:
+        timestamps: timestamps of the samples, in increasing order
+        values: the channel
+        points: number of points to draw
+        method: "minmax" for the min/max envelope or "lttb" for Largest-Triangle-Three-Buckets
+        start_time: start of the time window, or None for the start of the recording
+        end_time: end of the time window, or None for the end of the recording
+        pyramid: min/max pyramid of the channel, or None to downsample from every sample of the window
+    Returns:
+        the timestamps and values of the selected samples
+    """
+    if method not in ("minmax", "lttb"):
+        raise ValueError(f"Unknown downsampling method {method}")
+    start, stop = window_indexes(timestamps, start_time, end_time)
+    if pyramid is not None:
+        if method == "minmax":
+            indexes = pyramid.indexes(start, stop, points)
+        else:
+            candidates = pyramid.indexes(start, stop, 2 * points)
+            indexes = candidates[lttb_indexes(np.asarray(timestamps[candidates]), values[candidates], points)]
+        return np.asarray(timestamps[indexes]), np.asarray(values[indexes])
+    window_timestamps = np.asarray(timestamps[start:stop])
+    window_values = np.asarray(values[start:stop])
+    if method == "minmax":
+        indexes = minmax_indexes(window_values, points)
+    elif method == "lttb":
+        indexes = lttb_indexes(window_timestamps, window_values, points)
+    else:
+        raise ValueError(f"Unknown downsampling method {method}")
+    return window_timestamps[indexes], window_values[indexes]
@@ -0,0 +1,210 @@
+import numpy as np
+from analysis.data import ColumnarColumn
+
+"""
+One detected event. An event spans the samples from start up to, but not including, end. delta is the value of
+the last sample of the event less the value of its first sample, so its sign is the direction of a ramp or step.
+"""
+EVENT_DTYPE = np.dtype(
+    [
+        ("start", "<i8"),
+        ("end", "<i8"),
+        ("start_time", "<f8"),
+        ("end_time", "<f8"),
+        ("minimum", "<f8"),
+        ("maximum", "<f8"),
+        ("mean", "<f8"),
+        ("delta", "<f8"),
+    ]
+)
+
+
+def runs(mask: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Finds the runs of consecutive True values of a boolean mask from the boundaries of the runs, without a loop
+    over the samples.
+
+    Returns:
+        the start indexes and the exclusive end indexes of the runs
+    """
+    padded = np.concatenate(([False], np.asarray(mask, dtype=bool), [False]))
+    boundaries = np.flatnonzero(padded[1:] != padded[:-1])
+    return boundaries[0::2], boundaries[1::2]
+
+
+def threshold_runs(
+    values: np.ndarray, threshold: float, above: bool = True, window_size: int = None
+) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Finds the runs of samples above, or below, [threshold]. With a [window_size], the channel is compared one
+    window at a time and a run still open at the end of a window is continued into the next one, so a memory
+    mapped channel is never read into memory as a whole.
+
+    Returns:
+        the start indexes and the exclusive end indexes of the runs
+    """
+    n = len(values)
+    window_size = max(1, n if window_size is None else window_size)
+    all_starts, all_ends = [], []
+    last_ends = None
+    for offset in range(0, n, window_size):
+        window = np.asarray(values[offset : offset + window_size])
+        starts, ends = runs(window > threshold if above else window < threshold)
+        starts = starts + offset
+        ends = ends + offset
+        if len(starts) > 0 and starts[0] == offset and last_ends is not None and last_ends[-1] == offset:
+            # The first run of this window continues the last run of the previous windows
+            last_ends[-1] = ends[0]
+            starts, ends = starts[1:], ends[1:]
+        if len(starts) > 0:
+            all_starts.append(starts)
+            all_ends.append(ends)
+            last_ends = ends
+    if not all_starts:
+        return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.int64)
+    return np.concatenate(all_starts), np.concatenate(all_ends)
+
+
+def merge_runs(
+    starts: np.ndarray, ends: np.ndarray, max_gap: int = 0, min_length: int = 1
+) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Merges runs separated by at most [max_gap] samples, then drops the runs shorter than [min_length] samples.
+    """
+    if max_gap > 0 and len(starts) > 1:
+        keep = np.concatenate(([True], starts[1:] - ends[:-1] > max_gap))
+        starts = starts[keep]
+        ends = ends[np.concatenate((keep[1:], [True]))]
+    long_enough = ends - starts >= min_length
+    return starts[long_enough], ends[long_enough]
+
+
+def _indexable(values) -> np.ndarray:
+    """
+    Returns:
+        [values] as an array unless it already supports indexing with an array of indexes, like a memory mapped
+        column or a column of a columnar recording, which are then only read at the indexes
+    """
+    return values if isinstance(values, (np.ndarray, ColumnarColumn)) else np.asarray(values)
+
+
+def event_stats(values: np.ndarray, starts: np.ndarray, ends: np.ndarray, timestamps: np.ndarray = None) -> np.ndarray:
+    """
+    Computes the statistics of every event with one reduction per statistic over all events. Only the samples of
+    the events are read from the channel and the timestamps, so they may be memory mapped or columns of a columnar
+    recording.
+
+    Args:
+        values: the channel the events were detected in
+        starts: start indexes of the events
+        ends: exclusive end indexes of the events, after their start indexes
+        timestamps: timestamps of the samples, or None to report the sample indexes as times
+    Returns:
+        the events as an array of EVENT_DTYPE
+    """
+    events = np.empty(len(starts), dtype=EVENT_DTYPE)
+    events["start"] = starts
+    events["end"] = ends
+    if len(starts) == 0:
+        return events
+    if timestamps is None:
+        events["start_time"] = starts
+        events["end_time"] = ends - 1
+    else:
+        timestamps = _indexable(timestamps)
+        events["start_time"] = timestamps[starts]
+        events["end_time"] = timestamps[ends - 1]
+    # The samples of all events are gathered back to back, overlapping events each with their own copy, and every
+    # event is reduced from its offset in the gathered samples.
+    lengths = ends - starts
+    offsets = np.concatenate(([0], np.cumsum(lengths)[:-1]))
+    indexes = np.repeat(starts - offsets, lengths) + np.arange(offsets[-1] + lengths[-1])
+    event_values = np.asarray(_indexable(values)[indexes], dtype=np.float64)
+    events["minimum"] = np.minimum.reduceat(event_values, offsets)
+    events["maximum"] = np.maximum.reduceat(event_values, offsets)
+    events["mean"] = np.add.reduceat(event_values, offsets) / lengths
+    events["delta"] = event_values[offsets + lengths - 1] - event_values[offsets]
+    return events
+
+
+def detect_threshold(
+    values: np.ndarray,
+    threshold: float,
+    above: bool = True,
+    timestamps: np.ndarray = None,
+    max_gap: int = 0,
+    min_length: int = 1,
+    window_size: int = None,
+) -> np.ndarray:
+    """
+    Detects the runs of samples above, or below, [threshold], comparing the channel [window_size] samples at a
+    time if given, see threshold_runs.
+
+    Returns:
+        the events as an array of EVENT_DTYPE
+    """
+    starts, ends = merge_runs(*threshold_runs(values, threshold, above, window_size), max_gap, min_length)
+    return event_stats(values, starts, ends, timestamps)
+
+
+def detect_spikes(
+    values: np.ndarray,
+    multiplier: float = 10.0,
+    timestamps: np.ndarray = None,
+    median: float = None,
+    mad: float = None,
+    window_size: int = None,
+) -> np.ndarray:
+    """
+    Detects spikes above the median plus [multiplier] times the median absolute deviation of the channel, like the
+    push spikes in the x acceleration. The median and MAD are computed from the channel unless given, e.g. from a
+    streaming estimate of a recording that does not fit in memory. With a [window_size], the channel is then also
+    compared with the threshold one window at a time.
+
+    Returns:
+        the events as an array of EVENT_DTYPE
+    """
+    if median is None or mad is None:
+        values = np.asarray(values)
+    if median is None:
+        median = float(np.median(values))
+    if mad is None:
+        mad = float(np.median(np.abs(values - median)))
+    return detect_threshold(values, median + multiplier * mad, True, timestamps, window_size=window_size)
+
+
+def detect_steps(values: np.ndarray, min_step: float, timestamps: np.ndarray = None) -> np.ndarray:
+    """
+    Detects steps of at least [min_step] between consecutive samples, like slope changes in the pitch or current
+    steps in the motor current. Consecutive steps form one event, which spans the sample before the first step to
+    the sample after the last step.
+
+    Returns:
+        the events as an array of EVENT_DTYPE
+    """
+    values = np.asarray(values)
+    starts, ends = runs(np.abs(np.diff(values.astype(np.float64))) >= min_step)
+    return event_stats(values, starts, ends + 1, timestamps)
+
+
+def detect_ramps(values: np.ndarray, timestamps: np.ndarray, min_rate: float, min_duration: float = 0.0) -> np.ndarray:
+    """
+    Detects ramps where the channel rises or falls at [min_rate] per second or faster for at least [min_duration]
+    seconds, like the ERPM ramps of the motor controller. Rising and falling ramps are told apart by the sign of
+    their delta.
+
+    Returns:
+        the events as an array of EVENT_DTYPE, in order of their start
+    """
+    values = np.asarray(values)
+    timestamps = np.asarray(timestamps, dtype=np.float64)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        rates = np.diff(values.astype(np.float64)) / np.diff(timestamps)
+    rising_starts, rising_ends = runs(rates >= min_rate)
+    falling_starts, falling_ends = runs(rates <= -min_rate)
+    starts = np.concatenate((rising_starts, falling_starts))
+    ends = np.concatenate((rising_ends, falling_ends)) + 1
+    order = np.argsort(starts, kind="stable")
+    starts, ends = starts[order], ends[order]
+    long_enough = timestamps[ends - 1] - timestamps[starts] >= min_duration
+    return event_stats(values, starts[long_enough], ends[long_enough], timestamps)
@@ -0,0 +1,326 @@
+import math
+import multiprocess
+import numpy as np
+from analysis.data import load_recording
+
+"""
+Default number of samples per window, about 8 MB of float64 values.
+"""
+DEFAULT_WINDOW_SIZE = 1 << 20
+
+"""
+Default compression of a QuantileSketch. The sketch keeps at most about half as many centroids.
+"""
+DEFAULT_COMPRESSION = 200
+
+
+class RunningMoments:
+    """
+    Count, minimum, maximum, mean and variance of a stream of values, updated a window at a time and mergeable
+    with the moments of other parts of the stream with the pairwise algorithm of Chan et al.
+    """
+
+    def __init__(self) -> None:
+        self.__count = 0
+        self.__minimum = math.inf
+        self.__maximum = -math.inf
+        self.__mean = 0.0
+        self.__m2 = 0.0
+
+    @property
+    def count(self) -> int:
+        return self.__count
+
+    @property
+    def minimum(self) -> float:
+        return self.__minimum
+
+    @property
+    def maximum(self) -> float:
+        return self.__maximum
+
+    @property
+    def mean(self) -> float:
+        return self.__mean if self.__count > 0 else math.nan
+
+    @property
+    def variance(self) -> float:
+        """
+        Population variance of the values.
+        """
+        return self.__m2 / self.__count if self.__count > 0 else math.nan
+
+    @property
+    def std(self) -> float:
+        return math.sqrt(self.variance)
+
+    def update(self, values: np.ndarray) -> None:
+        values = np.asarray(values, dtype=np.float64)
+        if len(values) == 0:
+            return
+        mean = float(values.mean())
+        self.__combine(len(values), float(values.min()), float(values.max()), mean, float(((values - mean) ** 2).sum()))
+
+    def merge(self, other: "RunningMoments") -> None:
+        if other.count > 0:
+            self.__combine(other.count, other.minimum, other.maximum, other.mean, other.variance * other.count)
+
+    def __combine(self, count: int, minimum: float, maximum: float, mean: float, m2: float) -> None:
+        total = self.__count + count
+        delta = mean - self.__mean
+        self.__m2 += m2 + delta * delta * self.__count * count / total
+        self.__mean += delta * count / total
+        self.__count = total
+        self.__minimum = min(self.__minimum, minimum)
+        self.__maximum = max(self.__maximum, maximum)
+
+
+class StreamingHistogram:
+    """
+    Histogram with fixed, equally wide bins over [low, high). Values outside the range are counted as underflow
+    or overflow.
+    """
+
+    def __init__(self, low: float, high: float, bins: int) -> None:
+        if not high > low or bins < 1:
+            raise ValueError("A histogram needs a range with high > low and at least 1 bin")
+        self.__low = low
+        self.__high = high
+        self.__counts = np.zeros(bins, dtype=np.int64)
+        self.__underflow = 0
+        self.__overflow = 0
+
+    @property
+    def edges(self) -> np.ndarray:
+        return np.linspace(self.__low, self.__high, len(self.__counts) + 1)
+
+    @property
+    def counts(self) -> np.ndarray:
+        return self.__counts
+
+    @property
+    def underflow(self) -> int:
+        return self.__underflow
+
+    @property
+    def overflow(self) -> int:
+        return self.__overflow
+
+    def update(self, values: np.ndarray) -> None:
+        values = np.asarray(values, dtype=np.float64)
+        bins = len(self.__counts)
+        indexes = np.floor((values - self.__low) * (bins / (self.__high - self.__low))).astype(np.int64)
+        below = indexes < 0
+        above = indexes >= bins
+        self.__underflow += int(below.sum())
+        self.__overflow += int(above.sum())
+        self.__counts += np.bincount(indexes[~(below | above)], minlength=bins)
+
+    def merge(self, other: "StreamingHistogram") -> None:
+        if len(other.counts) != len(self.__counts) or not np.array_equal(other.edges, self.edges):
+            raise ValueError("Only histograms with the same bins can be merged")
+        self.__counts += other.counts
+        self.__underflow += other.underflow
+        self.__overflow += other.overflow
+
+
+class QuantileSketch:
+    """
+    Mergeable sketch of the distribution of a stream of values, in the style of a merging t-digest. The values
+    are summarized by weighted centroids that are merged along the arcsine scale function, which keeps the
+    centroids small near the tails, so quantiles are estimated with a small relative rank error in bounded memory.
+    Every update merges a whole window of values with NumPy instead of one value at a time.
+    """
+
+    def __init__(self, compression: int = DEFAULT_COMPRESSION) -> None:
+        self.__compression = compression
+        self.__means = np.empty(0)
+        self.__weights = np.empty(0)
+        self.__minimum = math.inf
+        self.__maximum = -math.inf
+
+    @property
+    def count(self) -> int:
+        return int(self.__weights.sum())
+
+    @property
+    def number_of_centroids(self) -> int:
+        return len(self.__means)
+
+    def update(self, values: np.ndarray) -> None:
+        values = np.asarray(values, dtype=np.float64)
+        if len(values) == 0:
+            return
+        self.__minimum = min(self.__minimum, float(values.min()))
+        self.__maximum = max(self.__maximum, float(values.max()))
+        self.__compress(np.concatenate((self.__means, values)), np.concatenate((self.__weights, np.ones(len(values)))))
+
+    def merge(self, other: "QuantileSketch") -> None:
+        if other.count == 0:
+            return
+        means, weights, minimum, maximum = other.__means, other.__weights, other.__minimum, other.__maximum
+        self.__minimum = min(self.__minimum, minimum)
+        self.__maximum = max(self.__maximum, maximum)
+        self.__compress(np.concatenate((self.__means, means)), np.concatenate((self.__weights, weights)))
+
+    def quantile(self, q: float) -> float:
+        """
+        Returns:
+            the estimated value below which a fraction [q] of the values lie, or NaN for an empty sketch
+        """
+        if len(self.__means) == 0:
+            return math.nan
+        total = self.__weights.sum()
+        centers = np.cumsum(self.__weights) - self.__weights / 2
+        return float(
+            np.interp(
+                min(1.0, max(0.0, q)) * total,
+                np.concatenate(([0.0], centers, [total])),
+                np.concatenate(([self.__minimum], self.__means, [self.__maximum])),
+            )
+        )
+
+    def median(self) -> float:
+        return self.quantile(0.5)
+
+    def __compress(self, means: np.ndarray, weights: np.ndarray) -> None:
+        order = np.argsort(means, kind="stable")
+        means = means[order]
+        weights = weights[order]
+        cumulative = np.cumsum(weights)
+        q = (cumulative - weights / 2) / cumulative[-1]
+        # Centroids whose ranks fall within the same unit of the arcsine scale are merged into one.
+        k = np.floor(self.__compression / (2 * math.pi) * np.arcsin(2 * q - 1))
+        starts = np.flatnonzero(np.concatenate(([True], k[1:] != k[:-1])))
+        merged_weights = np.add.reduceat(weights, starts)
+        self.__means = np.add.reduceat(means * weights, starts) / merged_weights
+        self.__weights = merged_weights
+
+
+class StreamingSummary:
+    """
+    Moments, quantile sketch and optional histogram of a column, updated a window at a time.
+    """
+
+    def __init__(
+        self, compression: int = DEFAULT_COMPRESSION, histogram_range: tuple[float, float, int] = None
+    ) -> None:
+        """
+        Args:
+            compression: compression of the quantile sketch
+            histogram_range: low, high and number of bins of the histogram, or None for no histogram
+        """
+        self.__moments = RunningMoments()
+        self.__sketch = QuantileSketch(compression)
+        self.__histogram = None if histogram_range is None else StreamingHistogram(*histogram_range)
+
+    @property
+    def moments(self) -> RunningMoments:
+        return self.__moments
+
+    @property
+    def sketch(self) -> QuantileSketch:
+        return self.__sketch
+
+    @property
+    def histogram(self) -> StreamingHistogram:
+        return self.__histogram
+
+    def update(self, values: np.ndarray) -> None:
+        values = np.asarray(values, dtype=np.float64)
+        self.__moments.update(values)
+        self.__sketch.update(values)
+        if self.__histogram is not None:
+            self.__histogram.update(values)
+
+    def merge(self, other: "StreamingSummary") -> None:
+        self.__moments.merge(other.moments)
+        self.__sketch.merge(other.sketch)
+        if self.__histogram is not None:
+            self.__histogram.merge(other.histogram)
+
+
+def windows(column: np.ndarray, window_size: int = DEFAULT_WINDOW_SIZE, start: int = 0, stop: int = None):
+    """
+    Yields the samples of [column] from [start] to [stop] in windows of at most [window_size] samples. Windows of
+    a memory mapped column are read from the file one at a time.
+    """
+    stop = len(column) if stop is None else stop
+    for window_start in range(start, stop, window_size):
+        yield column[window_start : min(stop, window_start + window_size)]
+
+
+def _summarize_range(
+    file_name: str,
+    field: str,
+    start: int,
+    stop: int,
+    window_size: int,
+    compression: int,
+    histogram_range: tuple[float, float, int],
+    center: float,
+) -> StreamingSummary:
+    column = load_recording(file_name)[field]
+    summary = StreamingSummary(compression, histogram_range)
+    for window in windows(column, window_size, start, stop):
+        window = np.asarray(window, dtype=np.float64)
+        summary.update(window if center is None else np.abs(window - center))
+    return summary
+
+
+def summarize_recording(
+    file_name: str,
+    field: str,
+    window_size: int = DEFAULT_WINDOW_SIZE,
+    processes: int = 0,
+    compression: int = DEFAULT_COMPRESSION,
+    histogram_range: tuple[float, float, int] = None,
+    center: float = None,
+) -> StreamingSummary:
+    """
+    Summarizes [field] of a recording without loading it into memory. Row recordings are memory mapped and columnar
+    recordings decompress the chunks of the field, both read a window at a time.
+
+    Args:
+        file_name: name of the recording file
+        field: name of the field
+        window_size: number of samples summarized at a time
+        processes: number of worker processes the windows are spread across, or 0 to summarize in this process
+        compression: compression of the quantile sketch
+        histogram_range: low, high and number of bins of the histogram, or None for no histogram
+        center: if set, the absolute deviations of the values from [center] are summarized instead of the values
+    """
+    if processes < 1:
+        return _summarize_range(file_name, field, 0, None, window_size, compression, histogram_range, center)
+    number_of_samples = len(load_recording(file_name))
+    number_of_windows = math.ceil(number_of_samples / window_size)
+    samples_per_process = max(1, math.ceil(number_of_windows / processes)) * window_size
+    bounds = [
+        (start, min(number_of_samples, start + samples_per_process))
+        for start in range(0, number_of_samples, samples_per_process)
+    ]
+    args = [
+        (file_name, field, start, stop, window_size, compression, histogram_range, center) for start, stop in bounds
+    ]
+    with multiprocess.Pool(processes) as pool:
+        summaries = pool.starmap(_summarize_range, args)
+    summary = StreamingSummary(compression, histogram_range)
+    for part in summaries:
+        summary.merge(part)
+    return summary
+
+
+def median_and_mad(
+    file_name: str,
+    field: str,
+    window_size: int = DEFAULT_WINDOW_SIZE,
+    processes: int = 0,
+    compression: int = DEFAULT_COMPRESSION,
+) -> tuple[float, float]:
+    """
+    Estimates the median and the median absolute deviation of [field] in two streaming passes over a recording,
+    the first for the median and the second for the median of the absolute deviations from it.
+    """
+    median = summarize_recording(file_name, field, window_size, processes, compression).sketch.median()
+    mad = summarize_recording(file_name, field, window_size, processes, compression, center=median).sketch.median()
+    return median, mad
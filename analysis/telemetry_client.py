@@ -0,0 +1,187 @@
+import argparse
+import os
+import socket
+import time
+import numpy as np
+from bionic_boarder_simulation_tool.riding.recording_format import RECORD_DTYPE
+from bionic_boarder_simulation_tool.riding.telemetry_publisher import (
+    TelemetryTransport,
+    decode_telemetry_datagram,
+    telemetry_socket_address,
+)
+
+"""
+Field, y axis label and line style of every live plotted channel.
+"""
+CHANNELS = [
+    ("velocity", "Velocity (m/s)", "b-"),
+    ("erpm", "ERPM", "m-"),
+    ("motor_current", "Motor Current (A)", "c-"),
+    ("input_current", "Input Current (A)", "y-"),
+]
+
+
+class TelemetryClient:
+    """
+    Receives the datagrams of a TelemetryPublisher and keeps the latest samples of every board in a fixed-size
+    window. Gaps in the sequence numbers of a board are counted as lost datagrams. A datagram with a sequence
+    number behind the next expected one, a duplicate or a datagram overtaken by later ones, is stale: it is counted
+    but its samples are dropped, so the samples of a board stay in order.
+    """
+
+    def __init__(self, transport: TelemetryTransport, address: str, window_size: int = 10000) -> None:
+        """
+        Args:
+            transport: the kind of datagram socket
+            address: "host:port" to receive the UDP datagrams on, or the path of the Unix datagram socket
+            window_size: number of latest samples kept per board
+        """
+        family, socket_address = telemetry_socket_address(transport, address)
+        if family == socket.AF_UNIX and os.path.exists(socket_address):
+            os.unlink(socket_address)
+        self.__socket = socket.socket(family, socket.SOCK_DGRAM)
+        self.__socket.bind(socket_address)
+        self.__window_size = window_size
+        self.__windows: dict[int, np.ndarray] = {}
+        self.__next_sequences: dict[int, int] = {}
+        self.__received_datagrams = 0
+        self.__lost_datagrams = 0
+        self.__stale_datagrams = 0
+
+    @property
+    def address(self) -> object:
+        return self.__socket.getsockname()
+
+    @property
+    def received_datagrams(self) -> int:
+        return self.__received_datagrams
+
+    @property
+    def lost_datagrams(self) -> int:
+        return self.__lost_datagrams
+
+    @property
+    def stale_datagrams(self) -> int:
+        return self.__stale_datagrams
+
+    def samples(self, board_index: int = 0) -> np.ndarray:
+        """
+        Returns:
+            the latest samples of board [board_index], oldest first
+        """
+        return self.__windows.get(board_index, np.empty(0, dtype=RECORD_DTYPE))
+
+    def poll(self, timeout_sec: float = 0.0) -> int:
+        """
+        Receives every datagram that is waiting, after waiting up to [timeout_sec] for the first one.
+
+        Returns:
+            the number of samples received
+        """
+        self.__socket.settimeout(max(0.0, timeout_sec))
+        received = []
+        while True:
+            try:
+                datagram = self.__socket.recv(65536)
+            except (BlockingIOError, socket.timeout):
+                break
+            self.__socket.settimeout(0.0)
+            try:
+                board_index, sequence, samples = decode_telemetry_datagram(datagram)
+            except ValueError:
+                continue
+            self.__received_datagrams += 1
+            expected = self.__next_sequences.get(board_index, sequence)
+            # The sequence numbers wrap around, so only a gap of less than half their range is ahead of the next
+            # expected sequence number.
+            gap = (sequence - expected) & 0xFFFFFFFF
+            if gap >= 1 << 31:
+                self.__stale_datagrams += 1
+                continue
+            self.__lost_datagrams += gap
+            self.__next_sequences[board_index] = (sequence + 1) & 0xFFFFFFFF
+            received.append((board_index, samples))
+        for board_index in {board_index for board_index, _ in received}:
+            parts = [self.samples(board_index)] + [samples for i, samples in received if i == board_index]
+            self.__windows[board_index] = np.concatenate(parts)[-self.__window_size :]
+        return sum(len(samples) for _, samples in received)
+
+    def close(self) -> None:
+        address = self.__socket.getsockname()
+        self.__socket.close()
+        if isinstance(address, str) and os.path.exists(address):
+            os.unlink(address)
+
+
+def print_telemetry(client: TelemetryClient, board_index: int) -> None:
+    while True:
+        start = time.monotonic()
+        count = 0
+        while time.monotonic() - start < 1.0:
+            count += client.poll(0.1)
+        samples = client.samples(board_index)
+        latest = samples[-1] if len(samples) > 0 else None
+        print(
+            f"{count} samples/s, {client.lost_datagrams} datagrams lost, {client.stale_datagrams} stale"
+            + (
+                ""
+                if latest is None
+                else f", t={latest['simulated_time']:.3f} s velocity={latest['velocity']:.2f} m/s erpm={latest['erpm']}"
+            )
+        )
+
+
+def plot_telemetry(client: TelemetryClient, board_index: int) -> None:
+    import matplotlib.pyplot as plt
+    from matplotlib.animation import FuncAnimation
+
+    fig, axes = plt.subplots(len(CHANNELS), 1, figsize=(10, 10), sharex=True)
+    fig.suptitle(f"Live Telemetry of Board {board_index}")
+    lines = []
+    for ax, (_, label, style) in zip(axes, CHANNELS):
+        (line,) = ax.plot([], [], style)
+        ax.set_ylabel(label)
+        ax.grid(True)
+        lines.append(line)
+    axes[-1].set_xlabel("Simulated Time (s)")
+
+    def update(_):
+        client.poll()
+        samples = client.samples(board_index)
+        if len(samples) > 0:
+            for ax, line, (field, _, _) in zip(axes, lines, CHANNELS):
+                line.set_data(samples["simulated_time"], samples[field])
+                ax.relim()
+                ax.autoscale_view()
+        return lines
+
+    # The animation only runs while it is referenced, so it is kept until the window is closed
+    animation = FuncAnimation(fig, update, interval=100, cache_frame_data=False)
+    plt.tight_layout()
+    plt.show()
+    del animation
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("address", type=str, help="host:port, or socket path with --transport unix, to listen on.")
+    parser.add_argument(
+        "--transport",
+        choices=[transport.value for transport in TelemetryTransport],
+        default=TelemetryTransport.UDP.value,
+        help="Datagram socket the telemetry is published on.",
+    )
+    parser.add_argument("--board", type=int, default=0, help="Index of the board to show.")
+    parser.add_argument("--window-size", type=int, default=10000, help="Number of latest samples shown.")
+    parser.add_argument("--no-plot", action="store_true", help="Print a summary every second instead of plotting.")
+    args = parser.parse_args()
+    client = TelemetryClient(TelemetryTransport(args.transport), args.address, args.window_size)
+    try:
+        if args.no_plot:
+            print_telemetry(client, args.board)
+        else:
+            plot_telemetry(client, args.board)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        client.close()
@@ -0,0 +1,180 @@
+import argparse
+import json
+import os
+import numpy as np
+from bionic_boarder_simulation_tool.riding.recording_format import open_recording
+
+"""
+Suffix of the time index sidecar file, which is written next to the recording.
+"""
+TIME_INDEX_SUFFIX = ".tidx"
+
+"""
+Default number of samples between the entries of a time index.
+"""
+DEFAULT_STRIDE = 1024
+
+
+def time_index_file_name(recording_file_name: str) -> str:
+    return recording_file_name + TIME_INDEX_SUFFIX
+
+
+def _sample_index(timestamps: np.ndarray, sparse_timestamps: np.ndarray, stride: int, time: float, side: str) -> int:
+    # The sparse index brackets the time within one stride, so only that stride of the recording is searched.
+    entry = int(np.searchsorted(sparse_timestamps, time, side=side))
+    start = max(0, (entry - 1) * stride)
+    stop = min(len(timestamps), entry * stride + 1)
+    return start + int(np.searchsorted(timestamps[start:stop], time, side=side))
+
+
+def _read_log_events(log_file_name: str) -> list[dict]:
+    events = []
+    with open(log_file_name, "r") as file:
+        for line in file:
+            try:
+                event = json.loads(line)
+            except json.JSONDecodeError:
+                continue
+            if isinstance(event, dict) and isinstance(event.get("timestamp"), (int, float)):
+                events.append(event)
+    events.sort(key=lambda event: event["timestamp"])
+    return events
+
+
+def build_time_index(recording_file_name: str, log_file_name: str = None, stride: int = DEFAULT_STRIDE) -> str:
+    """
+    Writes the time index sidecar of a row recording. It holds the timestamp and byte offset of every [stride]th
+    sample, and the log events of the simulation together with the index of the first sample at or after each of
+    them. Log events and samples are both stamped with the mission elapsed time.
+
+    Args:
+        recording_file_name: name of the recording file
+        log_file_name: name of the log file of the simulation, or None to index no log events
+        stride: number of samples between the entries of the index
+    Returns:
+        the name of the time index file
+    """
+    if stride < 1:
+        raise ValueError("The stride of a time index must be at least 1")
+    header, records = open_recording(recording_file_name)
+    timestamps = records["timestamp"]
+    sample_indexes = np.arange(0, len(records), stride, dtype=np.int64)
+    sparse_timestamps = np.asarray(timestamps[::stride], dtype=np.float64)
+    events = [] if log_file_name is None else _read_log_events(log_file_name)
+    event_times = np.array([event["timestamp"] for event in events], dtype=np.float64)
+    event_sample_indexes = np.array(
+        [_sample_index(timestamps, sparse_timestamps, stride, time, "left") for time in event_times], dtype=np.int64
+    )
+    description = {
+        "stride": stride,
+        "number_of_samples": len(records),
+        "record_size": header.dtype.itemsize,
+        "payload_offset": header.payload_offset,
+        "recording_size": os.path.getsize(recording_file_name),
+        "clock": header.metadata.get("clock", "mission_elapsed_time"),
+    }
+    index_file_name = time_index_file_name(recording_file_name)
+    with open(index_file_name, "wb") as file:
+        np.savez(
+            file,
+            description=np.array(json.dumps(description)),
+            timestamps=sparse_timestamps,
+            offsets=header.payload_offset + sample_indexes * header.dtype.itemsize,
+            log_event_times=event_times,
+            log_event_sample_indexes=event_sample_indexes,
+            log_events=np.array([json.dumps(event) for event in events], dtype=np.str_),
+        )
+    return index_file_name
+
+
+class TimeIndex:
+    """
+    Time index of a row recording, read from its sidecar. Time windows are found by a binary search of the sparse
+    index followed by a search within one stride of the memory mapped recording, and only the samples of the
+    window are read.
+    """
+
+    def __init__(self, recording_file_name: str) -> None:
+        """
+        Raises:
+            FileNotFoundError: if the recording has no time index
+            ValueError: if the recording changed after the time index was built
+        """
+        with np.load(time_index_file_name(recording_file_name)) as index:
+            self.__description = json.loads(str(index["description"]))
+            self.__timestamps = index["timestamps"]
+            self.__offsets = index["offsets"]
+            self.__log_event_times = index["log_event_times"]
+            self.__log_event_sample_indexes = index["log_event_sample_indexes"]
+            self.__log_events = index["log_events"]
+        if os.path.getsize(recording_file_name) != self.__description["recording_size"]:
+            raise ValueError(f"The time index of {recording_file_name} is stale, rebuild it")
+        self.__records = open_recording(recording_file_name)[1]
+
+    @property
+    def stride(self) -> int:
+        return self.__description["stride"]
+
+    @property
+    def clock(self) -> str:
+        return self.__description["clock"]
+
+    @property
+    def offsets(self) -> np.ndarray:
+        """
+        Byte offset of every indexed sample in the recording file.
+        """
+        return self.__offsets
+
+    def sample_range(self, start_time: float = None, end_time: float = None) -> tuple[int, int]:
+        """
+        Returns:
+            the index of the first sample at or after [start_time] and the index after the last sample at or
+            before [end_time]
+        """
+        timestamps = self.__records["timestamp"]
+        start = (
+            0 if start_time is None else _sample_index(timestamps, self.__timestamps, self.stride, start_time, "left")
+        )
+        stop = (
+            len(timestamps)
+            if end_time is None
+            else _sample_index(timestamps, self.__timestamps, self.stride, end_time, "right")
+        )
+        return start, max(start, stop)
+
+    def window(self, start_time: float = None, end_time: float = None) -> np.ndarray:
+        """
+        Returns:
+            the memory mapped samples in the time window
+        """
+        start, stop = self.sample_range(start_time, end_time)
+        return self.__records[start:stop]
+
+    def log_events(self, start_time: float = None, end_time: float = None) -> list[dict]:
+        """
+        Returns:
+            the log events in the time window, each with the index of the first sample at or after it as
+            "sample_index"
+        """
+        start = 0 if start_time is None else int(np.searchsorted(self.__log_event_times, start_time, side="left"))
+        stop = (
+            len(self.__log_event_times)
+            if end_time is None
+            else int(np.searchsorted(self.__log_event_times, end_time, side="right"))
+        )
+        return [
+            {**json.loads(str(event)), "sample_index": int(sample_index)}
+            for event, sample_index in zip(self.__log_events[start:stop], self.__log_event_sample_indexes[start:stop])
+        ]
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("sim_data_file", type=str, help="This is the path to the recorded sim data file.")
+    parser.add_argument("--log-file", type=str, default=None, help="Log file of the simulation to link to the index.")
+    parser.add_argument(
+        "--stride", type=int, default=DEFAULT_STRIDE, help="Number of samples between the entries of the index."
+    )
+    args = parser.parse_args()
+    print(f"Wrote {build_time_index(args.sim_data_file, args.log_file, args.stride)}")
@@ -1,77 +1,54 @@
 import sys
 import os
 import argparse
-import struct
 import numpy as np
-
+from analysis.data import load_recording
+from analysis.event_detection import detect_spikes
+from analysis.streaming_stats import DEFAULT_WINDOW_SIZE, median_and_mad
 
 if __name__ == "__main__":
     parser = argparse.ArgumentParser()
     parser.add_argument("sim_data_file", type=str, help="This is the path to the recorded sim data file.")
+    parser.add_argument(
+        "--streaming",
+        action="store_true",
+        help="Estimate the median and MAD in streaming passes over the recording instead of loading it into memory.",
+    )
+    parser.add_argument(
+        "--window-size", type=int, default=DEFAULT_WINDOW_SIZE, help="Number of samples per streaming window."
+    )
+    parser.add_argument(
+        "--processes", type=int, default=0, help="Spread the streaming windows across this many worker processes."
+    )
     args = parser.parse_args()
     if not os.path.exists(args.sim_data_file):
         print(f"File {args.sim_data_file} does not exist.")
         sys.exit(1)
 
-    # Define the format string used for packing the data
-    format_string = "d f f f f f f f i f f"
-    # Calculate the size of each data packet
-    packet_size = struct.calcsize(format_string)
-    # Define the keys for the dictionary
-    keys = [
-        "timestamp",
-        "velocity",
-        "acceleration_x",
-        "acceleration_y",
-        "acceleration_z",
-        "pitch",
-        "roll",
-        "yaw",
-        "erpm",
-        "motor_current",
-        "input_current",
-    ]
-    data_packets = []
-
-    with open(args.sim_data_file, "rb") as f:
-        while True:
-            chunk = f.read(packet_size)
-            if not chunk:
-                break  # End of file reached
-            unpacked_data = struct.unpack(format_string, chunk)
-            data_packet = dict(zip(keys, unpacked_data))
-            data_packets.append(data_packet)
-    timestamps = [packet["timestamp"] for packet in data_packets]
-    accelerations_x = [packet["acceleration_x"] for packet in data_packets]
+    # The columns are read from the memory mapped or columnar recording as they are used
+    recording = load_recording(args.sim_data_file)
+    timestamps = recording["timestamp"]
+    accelerations_x = recording["acceleration_x"]
 
     # Use the median absolute deviation method to find the number of spike groups in the x acceleration values
 
     # Calculate the median and MAD of the entire dataset
-    median = np.median(accelerations_x)
-    mad = np.median(np.abs(accelerations_x - median))
+    if args.streaming:
+        median, mad = median_and_mad(args.sim_data_file, "acceleration_x", args.window_size, args.processes)
+    else:
+        accelerations_x = np.asarray(accelerations_x)
+        median = np.median(accelerations_x)
+        mad = np.median(np.abs(accelerations_x - median))
 
     # Define a threshold for what constitutes a spike
     # This threshold is the median plus a multiple of the MAD
     # Adjust the multiplier as needed
     multiplier = 10
-    threshold = median + multiplier * mad
-
-    # Identify data points above the threshold
-    spikes = np.array(accelerations_x) > threshold
-
-    spike_groups = []
-    current_group = []
 
-    for i, is_spike in enumerate(spikes):
-        if is_spike:
-            t = timestamps[i]
-            current_group.append((t, i))
-        else:
-            if current_group:
-                spike_groups.append(current_group)
-                current_group = []
-    if current_group:
-        spike_groups.append(current_group)
+    # Group the consecutive data points above the threshold into spikes. In streaming mode the recording is compared
+    # with the threshold one window at a time as well, so it is never read into memory as a whole.
+    window_size = args.window_size if args.streaming else None
+    spikes = detect_spikes(accelerations_x, multiplier, timestamps, median, mad, window_size)
 
-    number_of_spikes = len(spike_groups)
+    number_of_spikes = len(spikes)
     print(f"Number of spikes in x acceleration values: {number_of_spikes}")
@@ -0,0 +1,250 @@
+import argparse
+import dataclasses
+from datetime import datetime
+import json
+import platform
+import queue
+import subprocess
+from threading import Lock
+import time
+import numpy as np
+from bionic_boarder_simulation_tool.app_input_arguments import load_app_input_arguments
+from bionic_boarder_simulation_tool.simulated_board import SimulatedBoard
+from bionic_boarder_simulation_tool.vesc.command_message_processor import CommandMessageProcessor
+from bionic_boarder_simulation_tool.vesc.fw import FirmwareVersion
+from bionic_boarder_simulation_tool.vesc.transport import Transport
+
+"""
+Command sent by the benchmark and the payload that follows its command ID.
+"""
+COMMAND_PAYLOADS = {
+    CommandMessageProcessor.RPM: (5000).to_bytes(4, byteorder="big"),
+    CommandMessageProcessor.CURRENT: (2000).to_bytes(4, byteorder="big"),
+    CommandMessageProcessor.HEARTBEAT: b"",
+    CommandMessageProcessor.FIRMWARE: b"",
+    CommandMessageProcessor.MOTOR_CONTROLLER_CONFIGURATION: b"",
+    CommandMessageProcessor.BIONIC_BOARDER: b"",
+}
+
+COMMAND_BYTE_SIZE = 256
+
+
+class LoopbackTransport(Transport):
+    """
+    In-process transport that feeds queued command packets to the command message processor.
+
+    A command is complete when the command message processor asks for the next command, which is after its
+    response, if any, has been written. The latency of a command is measured from the time it was scheduled to
+    be sent, so a command message processor that falls behind is charged for the time commands spend queued.
+    """
+
+    def __init__(self) -> None:
+        self.__requests = queue.Queue()
+        self.__in_flight = None
+        self.__lock = Lock()
+        self.__latencies: list[tuple[str, float]] = []
+        self.__last_completion_time = 0.0
+        self.__bytes_written = 0
+
+    def submit(self, command_name: str, packet: bytes, scheduled_time: float) -> None:
+        self.__requests.put((command_name, packet, scheduled_time))
+
+    def reset(self) -> None:
+        with self.__lock:
+            self.__latencies = []
+            self.__bytes_written = 0
+
+    @property
+    def latencies(self) -> list[tuple[str, float]]:
+        with self.__lock:
+            return list(self.__latencies)
+
+    @property
+    def last_completion_time(self) -> float:
+        return self.__last_completion_time
+
+    @property
+    def bytes_written(self) -> int:
+        return self.__bytes_written
+
+    def read(self, size: int) -> bytes:
+        if self.__in_flight is not None:
+            now = time.perf_counter()
+            command_name, scheduled_time = self.__in_flight
+            with self.__lock:
+                self.__latencies.append((command_name, now - scheduled_time))
+            self.__last_completion_time = now
+        command_name, packet, scheduled_time = self.__requests.get()
+        self.__in_flight = (command_name, scheduled_time)
+        return packet
+
+    def write(self, data: bytes) -> int:
+        self.__bytes_written += len(data)
+        return len(data)
+
+    def close(self) -> None:
+        pass
+
+    @property
+    def address(self) -> str:
+        return "loopback"
+
+
+def packetize(cmp: CommandMessageProcessor, command_id: int, payload: bytes) -> bytes:
+    """
+    Frames a command as a short VESC packet padded to the fixed command size the command message processor reads.
+    """
+    data = bytes([command_id]) + payload
+    crc = cmp.crc16(data)
+    packet = bytes([2, len(data)]) + data + crc.to_bytes(2, byteorder="big") + bytes([3])
+    return packet + bytes(COMMAND_BYTE_SIZE - len(packet))
+
+
+def percentiles_ms(latencies_sec: np.ndarray) -> dict:
+    if len(latencies_sec) == 0:
+        return {}
+    p50, p99, p99_9 = np.percentile(latencies_sec, [50, 99, 99.9]) * 1000.0
+    return {
+        "p50_ms": float(p50),
+        "p99_ms": float(p99),
+        "p99_9_ms": float(p99_9),
+        "max_ms": float(latencies_sec.max() * 1000.0),
+    }
+
+
+def run_rate(
+    transport: LoopbackTransport,
+    packets: list[tuple[str, bytes]],
+    rate: float,
+    duration_sec: float,
+    drain_timeout_sec: float,
+) -> dict:
+    """
+    Sends the command mix round robin at a fixed rate and measures the latency of every command.
+    """
+    transport.reset()
+    number_of_commands = max(1, int(rate * duration_sec))
+    start = time.perf_counter() + 0.01
+    for i in range(number_of_commands):
+        scheduled_time = start + i / rate
+        delay = scheduled_time - time.perf_counter()
+        if delay > 0:
+            time.sleep(delay)
+        command_name, packet = packets[i % len(packets)]
+        transport.submit(command_name, packet, scheduled_time)
+    deadline = time.perf_counter() + drain_timeout_sec
+    while len(transport.latencies) < number_of_commands and time.perf_counter() < deadline:
+        time.sleep(0.001)
+    latencies = transport.latencies
+    completed = len(latencies)
+    elapsed_sec = transport.last_completion_time - start
+    result = {
+        "rate": rate,
+        "sent": number_of_commands,
+        "completed": completed,
+        "achieved_rate": completed / elapsed_sec if elapsed_sec > 0 else 0.0,
+    }
+    result.update(percentiles_ms(np.array([latency for _, latency in latencies])))
+    result["per_command"] = {
+        command_name: percentiles_ms(np.array([latency for name, latency in latencies if name == command_name]))
+        for command_name in dict(packets)
+    }
+    return result
+
+
+def benchmark_firmware(app_input_arguments, args) -> dict:
+    transport = LoopbackTransport()
+    board = SimulatedBoard(app_input_arguments, transport=transport)
+    cmp = board.vesc_command_message_processor
+    command_ids = {name: command_id for command_id, name in cmp._command_id_name.items()}
+    packets = [(name, packetize(cmp, command_ids[name], COMMAND_PAYLOADS[name])) for name in args.commands]
+    board.start(run_kinematic_loop=False)
+    levels = []
+    max_sustainable_rate = 0.0
+    rate = args.start_rate
+    while rate <= args.max_rate:
+        level = run_rate(transport, packets, rate, args.duration_sec, args.drain_timeout_sec)
+        level["sustainable"] = (
+            level["completed"] == level["sent"]
+            and level["achieved_rate"] >= 0.95 * rate
+            and (args.max_p99_ms is None or level["p99_ms"] <= args.max_p99_ms)
+        )
+        levels.append(level)
+        print(
+            f"FW {app_input_arguments.vesc_fw} {rate:>9.0f} cmd/s: p50 {level.get('p50_ms', 0):.3f} ms, "
+            f"p99 {level.get('p99_ms', 0):.3f} ms, p99.9 {level.get('p99_9_ms', 0):.3f} ms, "
+            f"sustainable {level['sustainable']}"
+        )
+        if not level["sustainable"]:
+            break
+        max_sustainable_rate = rate
+        rate *= args.rate_factor
+    if cmp.heartbeat_watchdog is not None:
+        cmp.heartbeat_watchdog.stop()
+    board.stop()
+    return {"levels": levels, "max_sustainable_rate": max_sustainable_rate}
+
+
+def git_commit() -> str:
+    try:
+        return subprocess.run(["git", "rev-parse", "HEAD"], capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return ""
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Measure the round trip latency of the VESC command message processors at increasing rates."
+    )
+    parser.add_argument("app_inputs_json", type=str, help="This is the path to the simulation app inputs file.")
+    parser.add_argument(
+        "--firmware",
+        nargs="+",
+        default=[fw.value for fw in FirmwareVersion],
+        help="VESC firmware versions to benchmark.",
+    )
+    parser.add_argument(
+        "--commands",
+        nargs="+",
+        default=list(COMMAND_PAYLOADS),
+        choices=list(COMMAND_PAYLOADS),
+        help="Commands of the mix, sent round robin.",
+    )
+    parser.add_argument("--start-rate", type=float, default=100.0, help="First rate in commands per second.")
+    parser.add_argument("--max-rate", type=float, default=102400.0, help="Last rate in commands per second.")
+    parser.add_argument("--rate-factor", type=float, default=2.0, help="Factor the rate is increased by.")
+    parser.add_argument("--duration-sec", type=float, default=1.0, help="Time commands are sent at every rate.")
+    parser.add_argument(
+        "--drain-timeout-sec", type=float, default=2.0, help="Time to wait for the last commands of a rate."
+    )
+    parser.add_argument(
+        "--max-p99-ms",
+        type=float,
+        default=None,
+        help="Highest p99 latency of a sustainable rate in milliseconds. A rate is sustainable when every command "
+        "completed and the achieved rate is within 5%% of the rate, and, if this is set, the p99 latency is met.",
+    )
+    parser.add_argument("--output", type=str, default="", help="Path of the JSON results file.")
+    args = parser.parse_args()
+
+    with open(args.app_inputs_json, "r") as file:
+        app_input_arguments = load_app_input_arguments(json.load(file))
+    # The heartbeats of the benchmark stop between rates, which must not terminate the benchmark.
+    app_input_arguments = dataclasses.replace(app_input_arguments, heartbeat_timeout_sec=3600.0)
+    timestamp = datetime.now().strftime("%Y-%m-%d_%H-%M-%S")
+    results = {
+        "timestamp": timestamp,
+        "git_commit": git_commit(),
+        "python": platform.python_version(),
+        "machine": platform.machine(),
+        "commands": args.commands,
+        "duration_sec": args.duration_sec,
+        "max_p99_ms": args.max_p99_ms,
+        "firmware": {
+            fw: benchmark_firmware(dataclasses.replace(app_input_arguments, vesc_fw=fw), args) for fw in args.firmware
+        },
+    }
+    output = args.output if args.output else f"cmp_latency_benchmark_{timestamp}.json"
+    with open(output, "w") as file:
+        json.dump(results, file, indent=2)
+    print(f"Results written to {output}")
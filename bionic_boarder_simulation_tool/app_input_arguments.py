@@ -0,0 +1,92 @@
+from dataclasses import asdict, dataclass
+import json
+import os
+from jsonschema import validate
+from bionic_boarder_simulation_tool.riding.motor_controller import ErpmRampMode
+from bionic_boarder_simulation_tool.vesc.heartbeat_watchdog import HeartbeatTimeoutPolicy
+from bionic_boarder_simulation_tool.vesc.transport import TransportKind
+
+APP_INPUT_ARGUMENTS_SCHEMA_PATH = os.path.join(os.path.dirname(__file__), "app_input_arguments.schema.json")
+
+
+@dataclass(frozen=True)
+class AppInputArguments:
+
+    # Electric Land Paddle Board Specifics
+    total_weight_with_rider_kg: float
+    frontal_area_of_rider_m2: float
+    wheel_diameter_m: float
+    battery_max_capacity_Ah: float
+    battery_max_voltage: float
+    gear_ratio: float
+    motor_kv: int
+    motor_max_torque: float
+    motor_max_amps: float
+    motor_max_power_watts: float
+    motor_pole_pairs: int
+
+    # Serial I/O
+    com_port: str
+    baud_rate: int
+
+    # Kinematic loop
+    fixed_time_step_ms: int
+    push_period_sec: float
+    theta_slope_period_sec: float
+    slope_range_bound_deg: float
+
+    # Friction model
+    mu_rolling: float
+    c_drag: float
+
+    # Motor Controller
+    control_time_step_sec: float
+
+    # VESC
+    vesc_fw: str
+    heartbeat_timeout_sec: float
+    heartbeat_timeout_policy: str = HeartbeatTimeoutPolicy.EXIT.value
+    heartbeat_grace_sec: float = 0.0
+
+    # Transport for the VESC command messages
+    transport: str = TransportKind.SERIAL.value
+
+    # How the motor controller ramps the ERPM toward a target ERPM
+    erpm_ramp_mode: str = ErpmRampMode.THREAD.value
+
+    # CSV file of the motor and controller efficiency map, or empty to use fixed efficiency estimates
+    efficiency_map_csv: str = ""
+
+    # Internal resistance of the battery
+    battery_internal_resistance_ohm: float = 0.1
+
+    # Limit the motor current when the thermal model's FET or motor temperature is high
+    thermal_current_derating: bool = False
+
+    # Seed of the random slopes and pushes of the kinematic loop, or None for an unseeded run
+    random_seed: int = None
+
+
+def load_app_input_arguments(app_input_json: dict) -> AppInputArguments:
+    """
+    Validate the app inputs against the app input schema and create the app input arguments from them.
+
+    Args:
+        app_input_json: the app inputs of one simulated board, as loaded from the app inputs JSON file
+    Returns:
+        the app input arguments
+    Raises:
+        jsonschema.ValidationError: if the app inputs do not validate against the app input schema
+    """
+    with open(APP_INPUT_ARGUMENTS_SCHEMA_PATH, "r") as schema_file:
+        schema = json.load(schema_file)
+    validate(instance=app_input_json, schema=schema)
+    return AppInputArguments(**app_input_json)
+
+
+def recording_metadata(app_input_arguments: AppInputArguments) -> dict:
+    """
+    Returns:
+        the description of a board written to the header of its recording file
+    """
+    return {"app_inputs": asdict(app_input_arguments), "random_seed": app_input_arguments.random_seed}
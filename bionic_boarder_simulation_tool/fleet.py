@@ -0,0 +1,114 @@
+from threading import Thread
+from bionic_boarder_simulation_tool.app_input_arguments import AppInputArguments, recording_metadata
+from bionic_boarder_simulation_tool.logger import Logger
+from bionic_boarder_simulation_tool.riding.columnar_recording import ColumnarCodec
+from bionic_boarder_simulation_tool.riding.eboard_state_recorder import DEFAULT_BUFFER_CAPACITY, EboardStateRecorder
+from bionic_boarder_simulation_tool.riding.kinematic_scheduler import KinematicScheduler
+from bionic_boarder_simulation_tool.simulated_board import SimulatedBoard
+
+
+class Fleet:
+    """
+    This class simulates many boards, each with its own VESC command message processor on its own transport,
+    in a single process. The kinematic loops of all boards are stepped by one shared KinematicScheduler and
+    all boards can be recorded by one shared EboardStateRecorder. A board that misses its heartbeat is stopped
+    on its own, while the other boards keep running.
+    """
+
+    def __init__(
+        self,
+        boards_app_input_arguments: list[AppInputArguments],
+        board_indexes: list[int] = None,
+        capture_traffic: bool = False,
+    ) -> None:
+        """
+        Args:
+            boards_app_input_arguments: app input arguments of every board in the fleet. Every board must use its
+            own com port, PTY link path or socket address.
+            board_indexes: index of every board within a larger fleet, used to name the boards. The boards are
+            numbered from 0 by default.
+            capture_traffic: if True, the traffic of every board is written to a traffic capture file of its own
+        """
+        if board_indexes is None:
+            board_indexes = list(range(len(boards_app_input_arguments)))
+        self.__boards = [
+            SimulatedBoard(a, f"board{i}", capture_traffic, exit_on_heartbeat_expiry=False)
+            for i, a in zip(board_indexes, boards_app_input_arguments, strict=True)
+        ]
+        self.__scheduler = KinematicScheduler()
+        for board in self.__boards:
+            self.__scheduler.add(board.kinematic_loop)
+        self.__scheduler_thread = Thread(target=self.__scheduler.run, daemon=True)
+        self.__recorder = None
+
+    @property
+    def boards(self) -> list[SimulatedBoard]:
+        return self.__boards
+
+    @property
+    def scheduler(self) -> KinematicScheduler:
+        return self.__scheduler
+
+    @property
+    def recorder(self) -> EboardStateRecorder:
+        return self.__recorder
+
+    def create_recorder(
+        self,
+        recording_period_ms: int,
+        buffer_capacity: int = DEFAULT_BUFFER_CAPACITY,
+        columnar_codec: ColumnarCodec = None,
+        decimation: int = None,
+        envelope: bool = False,
+    ) -> EboardStateRecorder:
+        """
+        Creates the recorder shared by all boards. Every board is recorded to its own file. With a decimation
+        factor, the recorder is tick-synchronous and records every board from its kinematic loop's tick listeners,
+        and the recording period of every board is its time step times the decimation factor.
+        """
+
+        def board_recording_period_ms(board: SimulatedBoard) -> float:
+            if decimation is None:
+                return recording_period_ms
+            return board.app_input_arguments.fixed_time_step_ms * decimation
+
+        first = self.__boards[0]
+        self.__recorder = EboardStateRecorder(
+            first.eks_lock,
+            first.eks,
+            board_recording_period_ms(first),
+            first.name,
+            first.motor_controller.refresh_kinematic_state,
+            buffer_capacity,
+            metadata=recording_metadata(first.app_input_arguments),
+            columnar_codec=columnar_codec,
+            decimation=decimation,
+            envelope=envelope,
+        )
+        for board in self.__boards[1:]:
+            self.__recorder.add_source(
+                board.eks_lock,
+                board.eks,
+                board.name,
+                board.motor_controller.refresh_kinematic_state,
+                recording_metadata(board.app_input_arguments),
+                board_recording_period_ms(board),
+            )
+        if decimation is not None:
+            for i, board in enumerate(self.__boards):
+                board.kinematic_loop.add_tick_listener(self.__recorder.tick_listener(i))
+        return self.__recorder
+
+    def start(self) -> None:
+        for board in self.__boards:
+            board.start(run_kinematic_loop=False)
+        self.__scheduler_thread.start()
+        Logger().logger.info("Fleet is running", number_of_boards=len(self.__boards))
+
+    def stop(self) -> None:
+        self.__scheduler.stop()
+        for board in self.__boards:
+            board.stop()
+
+    def join(self) -> None:
+        self.__scheduler_thread.join()
@@ -1,55 +1,19 @@
-from dataclasses import dataclass
 import argparse
-import threading
 import sys
 import json
-from jsonschema import validate, ValidationError
-import os
-from bionic_boarder_simulation_tool.riding import *
-from bionic_boarder_simulation_tool.vesc import fw_6_00
-from bionic_boarder_simulation_tool.vesc import fw_6_02
-from bionic_boarder_simulation_tool.vesc import fw_6_05
+from jsonschema import ValidationError
+from bionic_boarder_simulation_tool.app_input_arguments import (
+    AppInputArguments,
+    load_app_input_arguments,
+    recording_metadata,
+)
+from bionic_boarder_simulation_tool.fleet import Fleet
 from bionic_boarder_simulation_tool.logger import Logger
-from bionic_boarder_simulation_tool.riding.eboard_state_recorder import EboardStateRecorder
-
-
-@dataclass(frozen=True)
-class AppInputArguments:
-
-    # Electric Land Paddle Board Specifics
-    total_weight_with_rider_kg: float
-    frontal_area_of_rider_m2: float
-    wheel_diameter_m: float
-    battery_max_capacity_Ah: float
-    battery_max_voltage: float
-    gear_ratio: float
-    motor_kv: int
-    motor_max_torque: float
-    motor_max_amps: float
-    motor_max_power_watts: float
-    motor_pole_pairs: int
-
-    # Serial I/O
-    com_port: str
-    baud_rate: int
-
-    # Kinematic loop
-    fixed_time_step_ms: int
-    push_period_sec: float
-    theta_slope_period_sec: float
-    slope_range_bound_deg: float
-
-    # Friction model
-    mu_rolling: float
-    c_drag: float
-
-    # Motor Controller
-    control_time_step_sec: float
-
-    # VESC
-    vesc_fw: str
-    heartbeat_timeout_sec: float
-
+from bionic_boarder_simulation_tool.process_fleet import ProcessFleet
+from bionic_boarder_simulation_tool.riding.columnar_recording import ColumnarCodec
+from bionic_boarder_simulation_tool.riding.eboard_state_recorder import DEFAULT_BUFFER_CAPACITY, EboardStateRecorder
+from bionic_boarder_simulation_tool.riding.telemetry_publisher import TelemetryPublisher, TelemetryTransport
+from bionic_boarder_simulation_tool.simulated_board import SimulatedBoard
 
 if __name__ == "__main__":
     parser = argparse.ArgumentParser()
@@ -60,111 +24,167 @@ if __name__ == "__main__":
         action="store_true",
         help="Enable recording of simulation data if flag is set.",
     )
+    parser.add_argument(
+        "--recording-buffer-capacity",
+        type=int,
+        default=DEFAULT_BUFFER_CAPACITY,
+        help="Number of samples buffered per board before the recording files are written. Samples recorded while "
+        "the buffer is full are dropped and counted.",
+    )
+    parser.add_argument(
+        "--recording-decimation",
+        type=int,
+        default=1,
+        help="Record every Nth kinematic loop tick, with its mission elapsed time and simulated time.",
+    )
+    parser.add_argument(
+        "--recording-envelope",
+        action="store_true",
+        help="Record the minimum and maximum of every field over each window of --recording-decimation ticks, so "
+        "no peak is missed. Needs a decimation of 2 or more.",
+    )
+    parser.add_argument(
+        "--columnar-recording",
+        choices=[codec.value for codec in ColumnarCodec],
+        default=None,
+        help="Record in the columnar format, compressing every field per chunk with this codec.",
+    )
+    parser.add_argument(
+        "--telemetry-address",
+        type=str,
+        default=None,
+        help="Publish the live kinematic state as datagrams to this host:port, or socket path with "
+        "--telemetry-transport unix.",
+    )
+    parser.add_argument(
+        "--telemetry-transport",
+        choices=[transport.value for transport in TelemetryTransport],
+        default=TelemetryTransport.UDP.value,
+        help="Datagram socket the live kinematic state is published on.",
+    )
+    parser.add_argument(
+        "--telemetry-decimation",
+        type=int,
+        default=10,
+        help="Publish every Nth kinematic loop tick.",
+    )
+    parser.add_argument(
+        "--fleet",
+        action="store_true",
+        help=(
+            "The app inputs file holds a list of app inputs, one per board, and all boards are simulated in this "
+            "process."
+        ),
+    )
+    parser.add_argument(
+        "--fleet-processes",
+        type=int,
+        default=0,
+        help="Spread the boards of the fleet across this many worker processes. Implies --fleet.",
+    )
+    parser.add_argument(
+        "--capture-traffic",
+        action="store_true",
+        help="Capture every frame received and sent by the VESC command message processor if flag is set.",
+    )
     args = parser.parse_args()
+    args.fleet = args.fleet or args.fleet_processes > 0
     Logger.enabled = args.enable_logging
     logger = Logger().logger
-    script_dir = os.path.dirname(__file__)
-    schema_path = os.path.join(script_dir, "./app_input_arguments.schema.json")
-    app_input_json = None
     with open(args.app_inputs_json, "r") as file:
         app_input_json = json.load(file)
-        schema = None
-        with open(schema_path, "r") as schema_file:
-            schema = json.load(schema_file)
-        try:
-            validate(instance=app_input_json, schema=schema)
-        except ValidationError as e:
-            logger.error("App inputs data file did not validate against the app input schema.")
-            sys.exit(1)
-    app_input_arguments = AppInputArguments(**app_input_json)
-    eboard_kinematic_state = eboard_kinematic_state.EboardKinematicState()
-    eboard_kinematic_state_lock = threading.Lock()
-    battery_discharge_model = battery_discharge_model.BatteryDischargeModel(app_input_arguments.battery_max_voltage)
-    eboard = eboard.EBoard(
-        app_input_arguments.total_weight_with_rider_kg,
-        app_input_arguments.frontal_area_of_rider_m2,
-        app_input_arguments.wheel_diameter_m,
-        app_input_arguments.battery_max_capacity_Ah,
-        app_input_arguments.battery_max_voltage,
-        app_input_arguments.gear_ratio,
-        app_input_arguments.motor_kv,
-        app_input_arguments.motor_max_torque,
-        app_input_arguments.motor_max_amps,
-        app_input_arguments.motor_max_power_watts,
-        app_input_arguments.motor_pole_pairs,
-    )
-    frictional_deceleration_model = frictional_deceleration_model.FrictionalDecelerationModel(
-        app_input_arguments.mu_rolling, app_input_arguments.c_drag, eboard
-    )
-    push_model = push_model.PushModel(eboard)
-    motor_controller = motor_controller.MotorController(
-        eboard, eboard_kinematic_state, eboard_kinematic_state_lock, frictional_deceleration_model
-    )
-    motor_controller.control_time_step_ms = int(app_input_arguments.control_time_step_sec * 1000)
-    kinematic_loop = kinematic_loop.KinematicLoop(
-        eboard, eboard_kinematic_state, eboard_kinematic_state_lock, frictional_deceleration_model, push_model
-    )
-    kinematic_loop.fixed_time_step_ms = app_input_arguments.fixed_time_step_ms
-    kinematic_loop.theta_slope_period_sec = app_input_arguments.theta_slope_period_sec
-    kinematic_loop.slope_range_bound_deg = app_input_arguments.slope_range_bound_deg
-    kinematic_loop.push_period_sec = app_input_arguments.push_period_sec
-    vesc_command_message_processor = None
-    if app_input_arguments.vesc_fw == "6.00":
-        vesc_command_message_processor = fw_6_00.FW6_00CMP(
-            app_input_arguments.com_port,
-            app_input_arguments.baud_rate,
-            256,
-            eboard,
-            eboard_kinematic_state,
-            eboard_kinematic_state_lock,
-            battery_discharge_model,
-            motor_controller,
-        )
-    elif app_input_arguments.vesc_fw == "6.02":
-        vesc_command_message_processor = fw_6_02.FW6_02CMP(
-            app_input_arguments.com_port,
-            app_input_arguments.baud_rate,
-            256,
-            eboard,
-            eboard_kinematic_state,
-            eboard_kinematic_state_lock,
-            battery_discharge_model,
-            motor_controller,
-        )
-    elif app_input_arguments.vesc_fw == "6.05":
-        vesc_command_message_processor = fw_6_05.FW6_05CMP(
-            app_input_arguments.com_port,
-            app_input_arguments.baud_rate,
-            256,
-            eboard,
-            eboard_kinematic_state,
-            eboard_kinematic_state_lock,
-            battery_discharge_model,
-            motor_controller,
-        )
-    else:
-        logger.error(f"There is no VESC firmware version matching {app_input_arguments.vesc_fw}")
+    boards_app_input_json = app_input_json if args.fleet else [app_input_json]
+    try:
+        boards_app_input_arguments = [load_app_input_arguments(board_json) for board_json in boards_app_input_json]
+    except (ValidationError, TypeError) as e:
+        logger.error("App inputs data file did not validate against the app input schema.")
         sys.exit(1)
 
-    vesc_command_message_processor.set_heartbeat_timeout_sec(app_input_arguments.heartbeat_timeout_sec)
+    try:
+        if args.fleet_processes > 0:
+            simulation = ProcessFleet(
+                boards_app_input_arguments, args.fleet_processes, capture_traffic=args.capture_traffic
+            )
+        elif args.fleet:
+            simulation = Fleet(boards_app_input_arguments, capture_traffic=args.capture_traffic)
+        else:
+            simulation = SimulatedBoard(boards_app_input_arguments[0], capture_traffic=args.capture_traffic)
+    except ValueError as e:
+        logger.error(str(e))
+        sys.exit(1)
 
     # Launch simulation threads
-    kinematic_loop_thread = threading.Thread(target=kinematic_loop.loop)
-    kinematic_loop_thread.daemon = True
-    vesc_command_message_processor_thread = threading.Thread(target=vesc_command_message_processor.handle_command)
-    vesc_command_message_processor_thread.daemon = True
-    vesc_command_message_processor_thread.start()
-    motor_controller.start()
-    kinematic_loop_thread.start()
+    simulation.start()
     logger.info("VESC CMP, motor controller, and kinematic loop threads are running.")
+    recorder = None
     if args.enable_data_recording:
-        recording_period_ms = app_input_arguments.fixed_time_step_ms * 2
-        recorder = EboardStateRecorder(eboard_kinematic_state_lock, eboard_kinematic_state, recording_period_ms)
+        recording_period_ms = min(a.fixed_time_step_ms for a in boards_app_input_arguments) * args.recording_decimation
+        columnar_codec = None if args.columnar_recording is None else ColumnarCodec(args.columnar_recording)
+        try:
+            if args.fleet_processes > 0:
+                # The kinematic loops run in the worker processes, so the supervisor samples the shared mirrors.
+                if args.recording_envelope:
+                    logger.warning("Envelope recording is not supported with --fleet-processes and is ignored.")
+                recorder = simulation.create_recorder(
+                    recording_period_ms, args.recording_buffer_capacity, columnar_codec
+                )
+            elif args.fleet:
+                recorder = simulation.create_recorder(
+                    recording_period_ms,
+                    args.recording_buffer_capacity,
+                    columnar_codec,
+                    args.recording_decimation,
+                    args.recording_envelope,
+                )
+            else:
+                recorder = EboardStateRecorder(
+                    simulation.eks_lock,
+                    simulation.eks,
+                    recording_period_ms,
+                    buffer_capacity=args.recording_buffer_capacity,
+                    metadata=recording_metadata(simulation.app_input_arguments),
+                    columnar_codec=columnar_codec,
+                    decimation=args.recording_decimation,
+                    envelope=args.recording_envelope,
+                )
+                simulation.kinematic_loop.add_tick_listener(recorder.tick_listener())
+        except ValueError as e:
+            logger.error(str(e))
+            simulation.stop()
+            sys.exit(1)
         recorder.start_recording()
         logger.info("Sim data recorder thread is running.")
 
-    kinematic_loop_thread.join()
-    vesc_command_message_processor_thread.join()
-    recorder.stop_recording()
-    motor_controller.stop()
+    publisher = None
+    if args.telemetry_address is not None:
+        if args.fleet_processes > 0:
+            logger.warning("Live telemetry is not supported with --fleet-processes and is ignored.")
+        else:
+            boards = simulation.boards if args.fleet else [simulation]
+            try:
+                publisher = TelemetryPublisher(
+                    TelemetryTransport(args.telemetry_transport),
+                    args.telemetry_address,
+                    len(boards),
+                    args.telemetry_decimation,
+                )
+            except ValueError as e:
+                logger.error(str(e))
+                simulation.stop()
+                sys.exit(1)
+            for i, board in enumerate(boards):
+                board.kinematic_loop.add_tick_listener(publisher.tick_listener(i))
+            publisher.start()
+
+    try:
+        simulation.join()
+    except KeyboardInterrupt:
+        logger.info("Simulation interrupted, stopping.")
+    finally:
+        # The recorder must be stopped to flush its buffered samples and finish the recording file.
+        if publisher is not None:
+            publisher.stop()
+        if recorder is not None:
+            recorder.stop_recording()
+        simulation.stop()
     sys.exit(0)
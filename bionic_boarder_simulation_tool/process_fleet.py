@@ -0,0 +1,207 @@
+from threading import Event, Lock, Thread
+import time
+import multiprocess
+import numpy as np
+from bionic_boarder_simulation_tool.app_input_arguments import AppInputArguments, recording_metadata
+from bionic_boarder_simulation_tool.fleet import Fleet
+from bionic_boarder_simulation_tool.logger import Logger
+from bionic_boarder_simulation_tool.mission_elapsed_time import MissionElapsedTime
+from bionic_boarder_simulation_tool.riding.eboard_kinematic_state import EboardKinematicState
+from bionic_boarder_simulation_tool.riding.columnar_recording import ColumnarCodec
+from bionic_boarder_simulation_tool.riding.eboard_state_recorder import DEFAULT_BUFFER_CAPACITY, EboardStateRecorder
+from bionic_boarder_simulation_tool.shared_kinematic_state import SharedKinematicStateBlock
+
+
+def _run_worker(
+    shared_block_name: str,
+    number_of_boards: int,
+    board_indexes: list[int],
+    boards_app_input_arguments: list[AppInputArguments],
+    enable_logging: bool,
+    capture_traffic: bool,
+    stop_event,
+) -> None:
+    """
+    Entry point of a worker process. Simulates its share of the fleet and publishes the kinematic state of its
+    boards into the shared kinematic state block after every scheduler pass.
+    """
+    Logger.enabled = enable_logging
+    block = SharedKinematicStateBlock(number_of_boards, shared_block_name)
+    fleet = Fleet(boards_app_input_arguments, board_indexes, capture_traffic)
+
+    def publish() -> None:
+        timestamp = MissionElapsedTime().elapsed_time_sec
+        for index, board in zip(board_indexes, fleet.boards):
+            with board.eks_lock:
+                block.publish(index, board.eks, timestamp)
+
+    fleet.scheduler.add_tick_hook(publish)
+    fleet.start()
+    stop_event.wait()
+    fleet.stop()
+    block.close()
+
+
+class ProcessFleet:
+    """
+    This class spreads the boards of a fleet across worker processes, for fleets larger than one interpreter
+    can carry. Every worker runs a Fleet of its own and publishes the kinematic state of its boards into a
+    SharedKinematicStateBlock.
+
+    This process is the supervisor. It reads the shared block directly to keep a mirror of every board's
+    kinematic state, which the shared recorder records, and to monitor the fleet for boards that stopped
+    publishing.
+    """
+
+    SUMMARY_LOG_PERIOD_SEC = 5.0
+
+    def __init__(
+        self,
+        boards_app_input_arguments: list[AppInputArguments],
+        number_of_workers: int,
+        monitor_period_ms: int = 100,
+        stale_timeout_sec: float = 1.0,
+        capture_traffic: bool = False,
+    ) -> None:
+        """
+        Args:
+            boards_app_input_arguments: app input arguments of every board in the fleet
+            number_of_workers: number of worker processes the boards are spread across
+            monitor_period_ms: period at which the supervisor reads the shared kinematic state block
+            stale_timeout_sec: time after which a board that has not published is reported as stale
+            capture_traffic: if True, the traffic of every board is written to a traffic capture file of its own
+        """
+        self.__boards_app_input_arguments = boards_app_input_arguments
+        self.__number_of_boards = len(boards_app_input_arguments)
+        self.__number_of_workers = max(1, min(number_of_workers, self.__number_of_boards))
+        self.__monitor_period_s = monitor_period_ms / 1000.0
+        self.__stale_timeout_sec = stale_timeout_sec
+        self.__capture_traffic = capture_traffic
+        self.__mirrors = [(Lock(), EboardKinematicState()) for _ in range(self.__number_of_boards)]
+        self.__block = None
+        self.__processes = []
+        self.__stop_event = multiprocess.Event()
+        self.__monitor_stop_event = Event()
+        self.__monitor_thread = Thread(target=self.__monitor, daemon=True)
+        self.__stale_boards: set[int] = set()
+        self.__summary = {}
+
+    @property
+    def number_of_workers(self) -> int:
+        return self.__number_of_workers
+
+    @property
+    def mirrors(self) -> list[tuple[Lock, EboardKinematicState]]:
+        """
+        The lock and mirrored kinematic state of every board, updated by the supervisor every monitor period.
+        """
+        return self.__mirrors
+
+    @property
+    def stale_boards(self) -> set[int]:
+        return set(self.__stale_boards)
+
+    @property
+    def summary(self) -> dict:
+        return dict(self.__summary)
+
+    def snapshot(self) -> np.ndarray:
+        """
+        Returns:
+            a consistent copy of the shared kinematic state block
+        """
+        return self.__block.snapshot()
+
+    def create_recorder(
+        self,
+        recording_period_ms: int,
+        buffer_capacity: int = DEFAULT_BUFFER_CAPACITY,
+        columnar_codec: ColumnarCodec = None,
+    ) -> EboardStateRecorder:
+        """
+        Creates the recorder for all boards. It records the supervisor's mirrors, one file per board.
+        """
+        lock, eks = self.__mirrors[0]
+        a = self.__boards_app_input_arguments
+        recorder = EboardStateRecorder(
+            lock,
+            eks,
+            recording_period_ms,
+            "board0",
+            buffer_capacity=buffer_capacity,
+            metadata=recording_metadata(a[0]),
+            columnar_codec=columnar_codec,
+        )
+        for i, (lock, eks) in enumerate(self.__mirrors[1:], start=1):
+            recorder.add_source(lock, eks, f"board{i}", metadata=recording_metadata(a[i]))
+        return recorder
+
+    def start(self) -> None:
+        self.__block = SharedKinematicStateBlock(self.__number_of_boards)
+        for worker in range(self.__number_of_workers):
+            board_indexes = list(range(worker, self.__number_of_boards, self.__number_of_workers))
+            process = multiprocess.Process(
+                target=_run_worker,
+                args=(
+                    self.__block.name,
+                    self.__number_of_boards,
+                    board_indexes,
+                    [self.__boards_app_input_arguments[i] for i in board_indexes],
+                    Logger.enabled,
+                    self.__capture_traffic,
+                    self.__stop_event,
+                ),
+                daemon=True,
+            )
+            process.start()
+            self.__processes.append(process)
+        self.__monitor_thread.start()
+        Logger().logger.info(
+            "Process fleet is running",
+            number_of_boards=self.__number_of_boards,
+            number_of_workers=self.__number_of_workers,
+        )
+
+    def stop(self) -> None:
+        self.__stop_event.set()
+        for process in self.__processes:
+            process.join(timeout=5.0)
+            if process.is_alive():
+                process.terminate()
+        self.__monitor_stop_event.set()
+        if self.__monitor_thread.is_alive():
+            self.__monitor_thread.join()
+        self.__block.close()
+
+    def join(self) -> None:
+        for process in self.__processes:
+            process.join()
+
+    def __monitor(self) -> None:
+        last_sequences = np.zeros(self.__number_of_boards, dtype=np.uint64)
+        last_change_times = np.full(self.__number_of_boards, time.monotonic())
+        next_summary_time = time.monotonic() + self.SUMMARY_LOG_PERIOD_SEC
+        while not self.__monitor_stop_event.wait(self.__monitor_period_s):
+            states = self.__block.snapshot()
+            now = time.monotonic()
+            for (lock, eks), row in zip(self.__mirrors, states):
+                with lock:
+                    SharedKinematicStateBlock.copy_to_kinematic_state(row, eks)
+            changed = states["sequence"] != last_sequences
+            last_change_times[changed] = now
+            last_sequences = states["sequence"]
+            stale = set(np.flatnonzero(now - last_change_times > self.__stale_timeout_sec).tolist())
+            for board_index in stale - self.__stale_boards:
+                Logger().logger.error("Board stopped publishing its kinematic state", board=f"board{board_index}")
+            self.__stale_boards = stale
+            self.__summary = {
+                "number_of_boards": self.__number_of_boards,
+                "number_of_stale_boards": len(stale),
+                "mean_velocity": float(states["velocity"].mean()),
+                "max_velocity": float(states["velocity"].max()),
+                "max_erpm": int(states["erpm"].max()),
+                "total_input_current": float(states["input_current"].sum()),
+            }
+            if now >= next_summary_time:
+                Logger().logger.info("Fleet summary", **self.__summary)
+                next_summary_time = now + self.SUMMARY_LOG_PERIOD_SEC
@@ -1,9 +1,17 @@
 __all__ = [
     "battery_discharge_model",
+    "columnar_recording",
     "eboard_kinematic_state",
     "eboard",
+    "efficiency_map",
     "frictional_deceleration_model",
     "kinematic_loop",
+    "kinematic_scheduler",
     "motor_controller",
     "push_model",
+    "recording_format",
+    "recording_ring_buffer",
+    "setpoint_mailbox",
+    "telemetry_publisher",
+    "thermal_model",
 ]
@@ -1,26 +1,154 @@
-from threading import Lock
+from typing import NamedTuple
+import numpy as np
+from .eboard_kinematic_state import EboardKinematicState
+
+"""
+Open circuit voltage of a Li-ion cell, as a fraction of its fully charged voltage, at increasing states of charge.
+"""
+OCV_STATE_OF_CHARGE = (0.0, 0.05, 0.1, 0.2, 0.3, 0.4, 0.5, 0.6, 0.7, 0.8, 0.9, 1.0)
+OCV_FRACTION_OF_MAX_VOLTAGE = tuple(
+    v / 4.2 for v in (3.0, 3.3, 3.45, 3.6, 3.68, 3.74, 3.8, 3.87, 3.95, 4.03, 4.11, 4.2)
+)
+
+"""
+Number of steps the open circuit voltage table is precomputed at between a state of charge of 0 and 1.
+"""
+OCV_TABLE_RESOLUTION = 1000
+
+
+class BatterySnapshot(NamedTuple):
+    """
+    State of the battery after the latest current draw.
+    """
+
+    state_of_charge: float
+    open_circuit_voltage: float
+    terminal_voltage: float
+    """Open circuit voltage less the sag across the internal resistance at the latest current draw."""
+    amp_hours: float
+    """Charge drawn from the battery."""
+    amp_hours_charged: float
+    """Charge regenerated into the battery."""
+    watt_hours: float
+    """Energy drawn from the battery."""
+    watt_hours_charged: float
+    """Energy regenerated into the battery."""
 
 
 class BatteryDischargeModel:
-    def __init__(self, battery_max_nominal_voltage: float) -> None:
+    """
+    Battery fed with the input current of the motor controller. It counts the charge drawn from and regenerated
+    into the battery, looks up the open circuit voltage at the state of charge in a precomputed table and sags it
+    across the internal resistance.
+
+    The battery has a single writer, normally the kinematic loop calling on_kinematic_tick every tick. The writer
+    accumulates into private totals and publishes them as an immutable BatterySnapshot with a single reference
+    assignment, so readers on other threads get a consistent snapshot without taking a lock.
+    """
+
+    def __init__(
+        self,
+        battery_max_nominal_voltage: float,
+        battery_capacity_Ah: float = 10.0,
+        internal_resistance_ohm: float = 0.1,
+    ) -> None:
+        """
+        Args:
+            battery_max_nominal_voltage: open circuit voltage of the fully charged battery
+            battery_capacity_Ah: charge of the fully charged battery
+            internal_resistance_ohm: internal resistance of the battery
+        """
         self.__current_draw = 1.0
-        self.__nominal_voltage = battery_max_nominal_voltage
-        self.__total_energy_consumed_Wh = 0
-        self.__total_energy_consumed_lock = Lock()
+        self.__capacity_Ah = battery_capacity_Ah
+        self.__internal_resistance_ohm = internal_resistance_ohm
+        self.__ocv_table = (
+            np.interp(np.linspace(0.0, 1.0, OCV_TABLE_RESOLUTION + 1), OCV_STATE_OF_CHARGE, OCV_FRACTION_OF_MAX_VOLTAGE)
+            * battery_max_nominal_voltage
+        )
+        self.__ocv_table_list = self.__ocv_table.tolist()
+        self.__amp_hours = 0.0
+        self.__amp_hours_charged = 0.0
+        self.__watt_hours = 0.0
+        self.__watt_hours_charged = 0.0
+        self.__snapshot = self.__publish(0.0)
+
+    @property
+    def snapshot(self) -> BatterySnapshot:
+        return self.__snapshot
 
     def get_watt_hours_consumed(self) -> float:
-        self.__total_energy_consumed_lock.acquire()
-        e = self.__total_energy_consumed_Wh
-        self.__total_energy_consumed_lock.release()
-        return e
+        return self.__snapshot.watt_hours
+
+    def open_circuit_voltage(self, state_of_charge: float) -> float:
+        return self.__ocv_table_list[int(min(1.0, max(0.0, state_of_charge)) * OCV_TABLE_RESOLUTION + 0.5)]
+
+    def draw(self, current_A: float, time_step_sec: float) -> None:
+        """
+        Draws [current_A] from the battery for [time_step_sec]. A negative current charges the battery.
+        """
+        voltage = self.open_circuit_voltage(self.__state_of_charge()) - current_A * self.__internal_resistance_ohm
+        amp_hours = current_A * time_step_sec / 3600.0
+        if amp_hours >= 0.0:
+            self.__amp_hours += amp_hours
+            self.__watt_hours += amp_hours * voltage
+        else:
+            self.__amp_hours_charged -= amp_hours
+            self.__watt_hours_charged -= amp_hours * voltage
+        self.__snapshot = self.__publish(current_A)
+
+    def draw_batch(self, currents_A: np.ndarray, time_step_sec: float) -> np.ndarray:
+        """
+        Draws a series of currents from the battery, each for [time_step_sec], with the same result as drawing them
+        one at a time, but vectorized for batch runs. Only the state after the last current is published.
+
+        Returns:
+            the terminal voltage of the battery during every current draw
+        """
+        currents_A = np.asarray(currents_A, dtype=np.float64)
+        if len(currents_A) == 0:
+            return np.empty(0)
+        amp_hours = currents_A * (time_step_sec / 3600.0)
+        net_amp_hours_before = (self.__amp_hours - self.__amp_hours_charged) + np.concatenate(
+            ([0.0], np.cumsum(amp_hours)[:-1])
+        )
+        state_of_charge = np.clip(1.0 - net_amp_hours_before / self.__capacity_Ah, 0.0, 1.0)
+        ocv = self.__ocv_table[(state_of_charge * OCV_TABLE_RESOLUTION + 0.5).astype(np.int64)]
+        voltage = ocv - currents_A * self.__internal_resistance_ohm
+        drawn = amp_hours >= 0.0
+        self.__amp_hours += float(amp_hours[drawn].sum())
+        self.__watt_hours += float((amp_hours[drawn] * voltage[drawn]).sum())
+        self.__amp_hours_charged -= float(amp_hours[~drawn].sum())
+        self.__watt_hours_charged -= float((amp_hours[~drawn] * voltage[~drawn]).sum())
+        self.__snapshot = self.__publish(float(currents_A[-1]))
+        return voltage
+
+    def on_kinematic_tick(self, eks: EboardKinematicState, sim_time_sec: float, time_step_sec: float) -> None:
+        """
+        Tick listener of the kinematic loop that draws the input current of the motor controller.
+        """
+        self.draw(eks.input_current, time_step_sec)
 
     def discharge(self, time_duration_ms: int):
-        power_watts = self.__nominal_voltage * self.__current_draw
-        step = time_duration_ms / 1000
-        energy_consumed = power_watts * (step / 3600)
-        self.__total_energy_consumed_lock.acquire()
-        self.__total_energy_consumed_Wh += energy_consumed
-        self.__total_energy_consumed_lock.release()
+        """
+        Draws the constant current_draw from the battery for [time_duration_ms].
+        """
+        self.draw(self.__current_draw, time_duration_ms / 1000)
+
+    def __state_of_charge(self) -> float:
+        return min(1.0, max(0.0, 1.0 - (self.__amp_hours - self.__amp_hours_charged) / self.__capacity_Ah))
+
+    def __publish(self, current_A: float) -> BatterySnapshot:
+        state_of_charge = self.__state_of_charge()
+        ocv = self.open_circuit_voltage(state_of_charge)
+        return BatterySnapshot(
+            state_of_charge,
+            ocv,
+            ocv - current_A * self.__internal_resistance_ohm,
+            self.__amp_hours,
+            self.__amp_hours_charged,
+            self.__watt_hours,
+            self.__watt_hours_charged,
+        )
 
     @property
     def current_draw(self) -> float:
@@ -0,0 +1,373 @@
+from enum import Enum
+import json
+import lzma
+import struct
+import zlib
+import numpy as np
+
+COLUMNAR_MAGIC = b"BBSCOL\x00\x00"
+COLUMNAR_CHUNK_MAGIC = b"BBSCHK\x00\x00"
+COLUMNAR_FORMAT_VERSION = 1
+
+"""
+Magic, format version, reserved and length of the JSON metadata that follows.
+"""
+COLUMNAR_HEADER = struct.Struct("<8sHHI")
+
+"""
+Magic, number of samples, CRC-32 of the column blocks, and first and last time of a chunk. The compressed length of
+every column block follows as a uint32, in the order of the fields, and then the blocks themselves.
+"""
+COLUMNAR_CHUNK_HEADER = struct.Struct("<8sIIdd")
+
+"""
+Offset and length of the JSON chunk index, and the magic again, at the end of a columnar recording.
+"""
+COLUMNAR_FOOTER = struct.Struct("<QI8s")
+
+"""
+Default number of samples per chunk.
+"""
+DEFAULT_CHUNK_SIZE = 4096
+
+
+class ColumnarCodec(Enum):
+    """
+    Enum class for the stdlib compressors of the column blocks. ZLIB is fast, LZMA is smaller.
+    """
+
+    ZLIB = "zlib"
+    LZMA = "lzma"
+
+
+def _compress(codec: ColumnarCodec, data: bytes) -> bytes:
+    return zlib.compress(data, 6) if codec == ColumnarCodec.ZLIB else lzma.compress(data)
+
+
+def _decompress(codec: ColumnarCodec, data: bytes) -> bytes:
+    return zlib.decompress(data) if codec == ColumnarCodec.ZLIB else lzma.decompress(data)
+
+
+def encode_column(column: np.ndarray, codec: ColumnarCodec) -> bytes:
+    """
+    Compresses one column of a chunk. Integer columns are delta encoded first, since consecutive samples are close.
+    The bytes of every value are then shuffled, so that the first bytes of all values come first, then the second
+    bytes, and so on, which groups the slowly changing high order bytes for the compressor.
+    """
+    column = np.ascontiguousarray(column)
+    if column.dtype.kind in "iu":
+        column = np.diff(column, prepend=column.dtype.type(0))
+    shuffled = column.view(np.uint8).reshape(len(column), column.dtype.itemsize).T
+    return _compress(codec, shuffled.tobytes())
+
+
+def decode_column(block: bytes, dtype: np.dtype, count: int, codec: ColumnarCodec) -> np.ndarray:
+    """
+    Reverses encode_column.
+    """
+    shuffled = np.frombuffer(_decompress(codec, block), dtype=np.uint8).reshape(dtype.itemsize, count)
+    column = np.ascontiguousarray(shuffled.T).view(dtype).reshape(count)
+    if dtype.kind in "iu":
+        column = np.cumsum(column, dtype=dtype)
+    return column
+
+
+class ColumnarRecordingWriter:
+    """
+    Writes records in the columnar recording format. The records are split into chunks of a fixed number of
+    samples, and every field of a chunk is compressed into its own block. A footer index holds the time range of
+    every chunk and the location of its blocks, so a reader decompresses only the fields and chunks it needs.
+    Every chunk also starts with a small header describing it, so the index of a recording that was never closed
+    can be rebuilt by scanning the chunks.
+
+    It has the write method of a binary file, so a RecordingRingBuffer can flush into it.
+    """
+
+    def __init__(
+        self,
+        file_name: str,
+        dtype: np.dtype,
+        metadata: dict,
+        codec: ColumnarCodec = ColumnarCodec.ZLIB,
+        chunk_size: int = DEFAULT_CHUNK_SIZE,
+        time_field: str = "timestamp",
+    ) -> None:
+        """
+        Args:
+            file_name: name of the recording file
+            dtype: structured dtype of one record
+            metadata: JSON serializable description of the recording
+            codec: compressor of the column blocks
+            chunk_size: number of samples per chunk
+            time_field: field holding the time of a sample, indexed per chunk
+        """
+        self.__file = open(file_name, "wb")
+        self.__dtype = dtype
+        self.__codec = codec
+        self.__chunk_size = chunk_size
+        self.__time_field = time_field
+        self.__pending: list[np.ndarray] = []
+        self.__pending_count = 0
+        self.__chunks: list[dict] = []
+        description = dict(metadata)
+        description["fields"] = [[name, dtype.fields[name][0].str] for name in dtype.names]
+        description["codec"] = codec.value
+        description["chunk_size"] = chunk_size
+        description["time_field"] = time_field
+        encoded = json.dumps(description).encode("utf-8")
+        self.__file.write(COLUMNAR_HEADER.pack(COLUMNAR_MAGIC, COLUMNAR_FORMAT_VERSION, 0, len(encoded)))
+        self.__file.write(encoded)
+        self.__file.flush()
+
+    @property
+    def name(self) -> str:
+        return self.__file.name
+
+    def write(self, data) -> int:
+        """
+        Args:
+            data: bytes-like object holding whole records
+        Returns:
+            the number of bytes written
+        """
+        records = np.frombuffer(data, dtype=self.__dtype).copy()
+        self.__pending.append(records)
+        self.__pending_count += len(records)
+        if self.__pending_count >= self.__chunk_size:
+            pending = np.concatenate(self.__pending)
+            full = len(pending) - len(pending) % self.__chunk_size
+            for start in range(0, full, self.__chunk_size):
+                self.__write_chunk(pending[start : start + self.__chunk_size])
+            self.__pending = [pending[full:]]
+            self.__pending_count = len(pending) - full
+        return memoryview(data).nbytes
+
+    def close(self) -> None:
+        """
+        Writes the last partial chunk and the footer index, and closes the file.
+        """
+        if self.__file.closed:
+            return
+        if self.__pending_count > 0:
+            self.__write_chunk(np.concatenate(self.__pending))
+        self.__pending = []
+        self.__pending_count = 0
+        index = json.dumps(self.__chunks).encode("utf-8")
+        index_offset = self.__file.tell()
+        self.__file.write(index)
+        self.__file.write(COLUMNAR_FOOTER.pack(index_offset, len(index), COLUMNAR_MAGIC))
+        self.__file.close()
+
+    def __write_chunk(self, records: np.ndarray) -> None:
+        times = records[self.__time_field]
+        encoded = [encode_column(records[name], self.__codec) for name in self.__dtype.names]
+        lengths = struct.pack(f"<{len(encoded)}I", *(len(block) for block in encoded))
+        crc = 0
+        for block in encoded:
+            crc = zlib.crc32(block, crc)
+        chunk = {"count": len(records), "first_time": float(times[0]), "last_time": float(times[-1]), "blocks": {}}
+        self.__file.write(
+            COLUMNAR_CHUNK_HEADER.pack(COLUMNAR_CHUNK_MAGIC, len(records), crc, chunk["first_time"], chunk["last_time"])
+        )
+        self.__file.write(lengths)
+        for name, block in zip(self.__dtype.names, encoded):
+            chunk["blocks"][name] = [self.__file.tell(), len(block)]
+            self.__file.write(block)
+        # Complete chunks reach the file right away, so they can be recovered if the recording is never closed.
+        self.__file.flush()
+        self.__chunks.append(chunk)
+
+
+class ColumnarRecordingReader:
+    """
+    Reads selected fields of a columnar recording within a time window, decompressing only the blocks of the
+    selected fields in the chunks that overlap the window.
+
+    The chunk index of a recording that was not closed, for instance because the simulation was killed, is rebuilt
+    by scanning the chunk headers. Scanning stops at the first incomplete or corrupt chunk, so every complete chunk
+    written before is recovered.
+    """
+
+    def __init__(self, file_name: str) -> None:
+        """
+        Raises:
+            ValueError: if the file is not a columnar recording of a supported format version
+        """
+        self.__file_name = file_name
+        with open(file_name, "rb") as file:
+            prefix = file.read(COLUMNAR_HEADER.size)
+            if len(prefix) < COLUMNAR_HEADER.size or not prefix.startswith(COLUMNAR_MAGIC):
+                raise ValueError(f"{file_name} is not a columnar recording")
+            _, version, _, metadata_length = COLUMNAR_HEADER.unpack(prefix)
+            if version > COLUMNAR_FORMAT_VERSION:
+                raise ValueError(
+                    f"Recording {file_name} has format version {version}, newer than {COLUMNAR_FORMAT_VERSION}"
+                )
+            metadata = file.read(metadata_length)
+            if len(metadata) < metadata_length:
+                raise ValueError(f"Columnar recording {file_name} is truncated within its metadata")
+            self.__metadata = json.loads(metadata.decode("utf-8"))
+            self.__dtype = np.dtype([(name, type_str) for name, type_str in self.__metadata["fields"]])
+            chunks_offset = file.tell()
+            file_size = file.seek(0, 2)
+            self.__chunks = self.__read_index(file, chunks_offset, file_size)
+            self.__closed = self.__chunks is not None
+            if not self.__closed:
+                self.__chunks = self.__scan_chunks(file, chunks_offset, file_size)
+        self.__codec = ColumnarCodec(self.__metadata["codec"])
+        self.__time_field = self.__metadata["time_field"]
+        self.__chunk_starts = np.cumsum([0] + [chunk["count"] for chunk in self.__chunks], dtype=np.int64)
+
+    @staticmethod
+    def __read_index(file, chunks_offset: int, file_size: int) -> list[dict] | None:
+        """
+        Returns:
+            the chunk index from the footer, or None if the recording has no footer
+        """
+        footer_offset = file_size - COLUMNAR_FOOTER.size
+        if footer_offset < chunks_offset:
+            return None
+        file.seek(footer_offset)
+        index_offset, index_length, end_magic = COLUMNAR_FOOTER.unpack(file.read(COLUMNAR_FOOTER.size))
+        if end_magic != COLUMNAR_MAGIC or index_offset < chunks_offset or index_offset + index_length > footer_offset:
+            return None
+        file.seek(index_offset)
+        return json.loads(file.read(index_length).decode("utf-8"))
+
+    def __scan_chunks(self, file, offset: int, file_size: int) -> list[dict]:
+        """
+        Rebuilds the chunk index from the chunk headers, up to the first incomplete or corrupt chunk.
+        """
+        names = self.__dtype.names
+        lengths_struct = struct.Struct(f"<{len(names)}I")
+        chunks = []
+        while offset + COLUMNAR_CHUNK_HEADER.size + lengths_struct.size <= file_size:
+            file.seek(offset)
+            magic, count, crc, first_time, last_time = COLUMNAR_CHUNK_HEADER.unpack(
+                file.read(COLUMNAR_CHUNK_HEADER.size)
+            )
+            if magic != COLUMNAR_CHUNK_MAGIC:
+                break
+            lengths = lengths_struct.unpack(file.read(lengths_struct.size))
+            blocks_offset = offset + COLUMNAR_CHUNK_HEADER.size + lengths_struct.size
+            if blocks_offset + sum(lengths) > file_size:
+                break
+            data = file.read(sum(lengths))
+            if zlib.crc32(data) != crc:
+                break
+            blocks = {}
+            block_offset = blocks_offset
+            for name, length in zip(names, lengths):
+                blocks[name] = [block_offset, length]
+                block_offset += length
+            chunks.append({"count": count, "first_time": first_time, "last_time": last_time, "blocks": blocks})
+            offset = block_offset
+        return chunks
+
+    @property
+    def metadata(self) -> dict:
+        return self.__metadata
+
+    @property
+    def closed(self) -> bool:
+        """
+        False if the recording was never closed and its chunk index was rebuilt by scanning its chunks.
+        """
+        return self.__closed
+
+    @property
+    def dtype(self) -> np.dtype:
+        return self.__dtype
+
+    @property
+    def time_field(self) -> str:
+        return self.__time_field
+
+    @property
+    def number_of_chunks(self) -> int:
+        return len(self.__chunks)
+
+    @property
+    def number_of_samples(self) -> int:
+        return sum(chunk["count"] for chunk in self.__chunks)
+
+    def read(self, fields: list[str] = None, start_time: float = None, end_time: float = None) -> np.ndarray:
+        """
+        Args:
+            fields: names of the fields to read, or None for all fields. The time field is always read.
+            start_time: start of the time window, or None for the start of the recording
+            end_time: end of the time window, inclusive, or None for the end of the recording
+        Returns:
+            the samples in the time window, as a structured array with only the selected fields
+        """
+        names = list(self.__dtype.names) if fields is None else list(fields)
+        if self.__time_field not in names:
+            names.insert(0, self.__time_field)
+        chunks = [
+            chunk
+            for chunk in self.__chunks
+            if (start_time is None or chunk["last_time"] >= start_time)
+            and (end_time is None or chunk["first_time"] <= end_time)
+        ]
+        records = self.__read_chunks(names, chunks)
+        times = records[self.__time_field]
+        in_window = np.ones(len(records), dtype=bool)
+        if start_time is not None:
+            in_window &= times >= start_time
+        if end_time is not None:
+            in_window &= times <= end_time
+        return records if in_window.all() else records[in_window]
+
+    def read_samples(self, fields: list[str] = None, start: int = 0, stop: int = None) -> np.ndarray:
+        """
+        Args:
+            fields: names of the fields to read, or None for all fields
+            start: index of the first sample
+            stop: index after the last sample, or None for the end of the recording
+        Returns:
+            the samples from [start] up to, but not including, [stop], as a structured array with only the selected
+            fields
+        """
+        names = list(self.__dtype.names) if fields is None else list(fields)
+        number_of_samples = int(self.__chunk_starts[-1])
+        stop = number_of_samples if stop is None else min(stop, number_of_samples)
+        if start >= stop:
+            return self.__read_chunks(names, [])
+        first = int(np.searchsorted(self.__chunk_starts, start, side="right")) - 1
+        last = int(np.searchsorted(self.__chunk_starts, stop, side="left"))
+        records = self.__read_chunks(names, self.__chunks[first:last])
+        offset = int(self.__chunk_starts[first])
+        return records[start - offset : stop - offset]
+
+    def search_time(self, time: float, side: str = "left") -> int:
+        """
+        Finds where [time] would be inserted into the time field to keep it in order, like numpy.searchsorted,
+        decompressing the time field of one chunk at most.
+
+        Args:
+            time: the time to search for
+            side: "left" for the index of the first sample at or after [time], "right" for the index of the first
+            sample after it
+        """
+        for index, chunk in enumerate(self.__chunks):
+            if chunk["last_time"] > time or (side == "left" and chunk["last_time"] == time):
+                times = self.__read_chunks([self.__time_field], [chunk])[self.__time_field]
+                return int(self.__chunk_starts[index]) + int(np.searchsorted(times, time, side=side))
+        return int(self.__chunk_starts[-1])
+
+    def __read_chunks(self, names: list[str], chunks: list[dict]) -> np.ndarray:
+        """
+        Returns:
+            the samples of [chunks] as a structured array with the fields [names]
+        """
+        dtype = np.dtype([(name, self.__dtype.fields[name][0]) for name in names])
+        parts = []
+        with open(self.__file_name, "rb") as file:
+            for chunk in chunks:
+                part = np.empty(chunk["count"], dtype=dtype)
+                for name in names:
+                    offset, length = chunk["blocks"][name]
+                    file.seek(offset)
+                    part[name] = decode_column(file.read(length), dtype.fields[name][0], chunk["count"], self.__codec)
+                parts.append(part)
+        return np.concatenate(parts) if parts else np.empty(0, dtype=dtype)
@@ -1,4 +1,8 @@
 from dataclasses import dataclass
+from functools import cached_property
+import math
+
+GRAVITY = 9.81  # m/s^2
 
 
 @dataclass(frozen=True)
@@ -14,3 +18,61 @@ class EBoard:
     motor_max_amps: float
     motor_max_power_watts: float
     motor_pole_pairs: int
+
+    @cached_property
+    def constants(self) -> "EBoardConstants":
+        """
+        The constants derived from this eboard's specification, shared by every riding model.
+        """
+        return EBoardConstants(self)
+
+
+class EBoardConstants:
+    """
+    Constants derived from an EBoard. Because an EBoard is frozen, each constant is computed once, the first time
+    it is used, instead of on every time step of the riding models.
+    """
+
+    def __init__(self, eboard: EBoard) -> None:
+        self.__eboard = eboard
+
+    @cached_property
+    def wheel_radius_m(self) -> float:
+        return self.__eboard.wheel_diameter_m / 2
+
+    @cached_property
+    def force_1g_N(self) -> float:
+        """
+        Weight of the board and rider in Newtons.
+        """
+        return self.__eboard.total_weight_with_rider_kg * GRAVITY
+
+    @cached_property
+    def motor_kt_Nm_per_A(self) -> float:
+        """
+        Torque constant of the motor.
+        """
+        return 60 / (2 * math.pi * self.__eboard.motor_kv)
+
+    @cached_property
+    def velocity_m_per_s_per_erpm(self) -> float:
+        """
+        Board velocity in m/s for one ERPM of the motor.
+        """
+        eb = self.__eboard
+        return ((1 / eb.motor_pole_pairs) / eb.gear_ratio) * ((math.pi * eb.wheel_diameter_m) / 60)
+
+    @cached_property
+    def erpm_per_velocity_m_per_s(self) -> float:
+        """
+        Motor ERPM for a board velocity of one m/s.
+        """
+        eb = self.__eboard
+        return (60 / (eb.wheel_diameter_m * math.pi)) * eb.gear_ratio * eb.motor_pole_pairs
+
+    @cached_property
+    def motor_rad_per_sec_per_erpm(self) -> float:
+        """
+        Angular velocity of the motor shaft in rad/s for one ERPM of the motor.
+        """
+        return (2 * math.pi / 60) / self.__eboard.motor_pole_pairs
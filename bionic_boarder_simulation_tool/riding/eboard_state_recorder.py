@@ -1,54 +1,290 @@
 from datetime import datetime
 from .eboard_kinematic_state import EboardKinematicState
-from threading import Lock, Thread
+from .columnar_recording import ColumnarCodec, ColumnarRecordingWriter
+from .recording_format import RECORD_DTYPE, write_recording_header
+from .recording_ring_buffer import RecordingRingBuffer
+from threading import Event, Lock, Thread
+from typing import Callable
+import math
 import time
-import struct
+import numpy as np
+from bionic_boarder_simulation_tool.logger import Logger
 from bionic_boarder_simulation_tool.mission_elapsed_time import MissionElapsedTime
 
+"""
+Default number of samples buffered per board, about a minute at a 1 ms recording period.
+"""
+DEFAULT_BUFFER_CAPACITY = 65536
+
+"""
+Default period at which the flusher writes the buffered samples to the recording files.
+"""
+DEFAULT_FLUSH_PERIOD_MS = 250
+
+
+def _sample(mission_elapsed_time_sec: float, simulated_time_sec: float, eks: EboardKinematicState) -> tuple:
+    return (
+        mission_elapsed_time_sec,
+        eks.velocity,
+        eks.acceleration_x,
+        eks.acceleration_y,
+        eks.acceleration_z,
+        eks.pitch,
+        eks.roll,
+        eks.yaw,
+        eks.erpm,
+        eks.motor_current,
+        eks.input_current,
+        simulated_time_sec,
+    )
+
+
+class TickSampler:
+    """
+    Tick listener that appends every [decimation]th committed kinematic state of a board to its ring buffer, stamped
+    with the mission elapsed time and the simulated time of the tick. With envelope capture, every window of
+    [decimation] ticks is recorded as two samples instead: the minimum of every field at the times of the first
+    tick, and the maximum of every field at the times of the last tick, so no peak between the recorded samples is
+    lost.
+    """
+
+    def __init__(
+        self, buffer: RecordingRingBuffer, decimation: int, envelope: bool, is_recording: Callable[[], bool]
+    ) -> None:
+        self.__buffer = buffer
+        self.__decimation = decimation
+        self.__envelope = envelope
+        self.__is_recording = is_recording
+        self.__mission_elapsed_time = MissionElapsedTime()
+        self.__tick_count = 0
+        self.__low: list = None
+        self.__high: list = None
+
+    def __call__(self, eks: EboardKinematicState, sim_time_sec: float, time_step_sec: float) -> None:
+        if not self.__is_recording():
+            return
+        self.__tick_count += 1
+        if not self.__envelope:
+            if (self.__tick_count - 1) % self.__decimation == 0:
+                self.__buffer.append(_sample(self.__mission_elapsed_time.elapsed_time_sec, sim_time_sec, eks))
+            return
+        sample = _sample(self.__mission_elapsed_time.elapsed_time_sec, sim_time_sec, eks)
+        if self.__low is None:
+            self.__low = list(sample)
+            self.__high = list(sample)
+        else:
+            low, high = self.__low, self.__high
+            # The first and last fields are the times of the sample
+            for i in range(1, len(sample) - 1):
+                value = sample[i]
+                if value < low[i]:
+                    low[i] = value
+                elif value > high[i]:
+                    high[i] = value
+            high[0] = sample[0]
+            high[-1] = sim_time_sec
+        if self.__tick_count % self.__decimation == 0:
+            self.__buffer.append(tuple(self.__low))
+            self.__buffer.append(tuple(self.__high))
+            self.__low = None
+            self.__high = None
+
 
 class EboardStateRecorder:
+    """
+    Records the kinematic state of one or more simulated land paddle boards from a single thread. Each board
+    is recorded to its own file.
+
+    Samples are appended to a preallocated ring buffer per board, and a background flusher writes the buffered
+    samples of each board to its file in whole blocks, so recording does no file I/O per sample. When the flusher
+    falls behind by more than the capacity of a buffer, new samples are dropped and counted as overflows.
+
+    The samples are recorded as rows after a self-describing header, or, with a columnar codec, in the columnar
+    recording format that compresses every field per chunk.
+
+    Every sample is stamped with the mission elapsed time, like the logs of the simulation. By default the boards
+    are sampled on a thread every recording period, and the samples have no simulated time. With a decimation
+    factor, the recorder is tick-synchronous instead: the tick listener of every board, added to the board's
+    kinematic loop, records every [decimation]th tick together with its exact simulated time, so the samples are
+    aligned with the ticks and never torn or duplicated.
+    """
 
-    def __init__(self, eks_lock: Lock, eks: EboardKinematicState, recording_period_ms: int):
-        self.__eks: EboardKinematicState = eks
-        self.__eks_lock: Lock = eks_lock
-        timestamp = datetime.now().strftime("%Y-%m-%d_%H-%M-%S")
-        self.__record_file_name = f"sim_data_recording_{timestamp}.bin"
+    def __init__(
+        self,
+        eks_lock: Lock,
+        eks: EboardKinematicState,
+        recording_period_ms: int,
+        board_name: str = "",
+        state_refresher: Callable[[], None] = None,
+        buffer_capacity: int = DEFAULT_BUFFER_CAPACITY,
+        flush_period_ms: int = DEFAULT_FLUSH_PERIOD_MS,
+        metadata: dict = None,
+        columnar_codec: ColumnarCodec = None,
+        decimation: int = None,
+        envelope: bool = False,
+    ):
+        """
+        Args:
+            recording_period_ms: period between samples, which is the kinematic loop's time step times the
+            decimation factor for a tick-synchronous recorder
+            buffer_capacity: number of samples buffered per board
+            flush_period_ms: period at which the buffered samples are written to the recording files
+            metadata: JSON serializable description of the board written to the header of its recording file
+            columnar_codec: codec of the columnar recording format, or None to record rows of samples
+            decimation: record every [decimation]th kinematic loop tick through the tick listeners, or None to
+            sample on a thread every recording period
+            envelope: record the minimum and maximum of every window of [decimation] ticks instead of one tick
+        """
+        if decimation is not None and decimation < 1:
+            raise ValueError("The recording decimation factor must be at least 1")
+        if envelope and (decimation is None or decimation < 2):
+            raise ValueError(
+                "Envelope recording needs a tick-synchronous recorder with a decimation factor of 2 or more"
+            )
+        self.__timestamp = datetime.now().strftime("%Y-%m-%d_%H-%M-%S")
+        self.__buffer_capacity = buffer_capacity
+        self.__columnar_codec = columnar_codec
+        self.__decimation = decimation
+        self.__envelope = envelope
+        self.__recording_period_ms = recording_period_ms
+        self.__sources: list[tuple[Lock, EboardKinematicState, str, Callable[[], None]]] = []
+        self.__buffers: list[RecordingRingBuffer] = []
+        self.__metadata: list[dict] = []
+        self.add_source(eks_lock, eks, board_name, state_refresher, metadata)
         self.__recording_period_s: float = recording_period_ms / 1000.0
+        self.__flush_period_s: float = flush_period_ms / 1000.0
         self.__recording_thread = Thread(target=self.record, daemon=True)
+        self.__flusher_thread = Thread(target=self.__flush_loop, daemon=True)
+        self.__recording = False
         self.__stop_recording = False
+        self.__recording_stopped = Event()
+
+    def add_source(
+        self,
+        eks_lock: Lock,
+        eks: EboardKinematicState,
+        board_name: str,
+        state_refresher: Callable[[], None] = None,
+        metadata: dict = None,
+        recording_period_ms: float = None,
+    ) -> str:
+        """
+        Adds the kinematic state of another board to the recording. Must be called before recording starts.
+
+        Args:
+            eks_lock: lock that guards the kinematic state
+            eks: kinematic state of the board
+            board_name: name of the board, appended to the name of the board's recording file
+            state_refresher: optional function that brings the kinematic state up to date before it is recorded
+            metadata: JSON serializable description of the board written to the header of its recording file
+            recording_period_ms: period between the samples of this board if it differs from the recorder's, e.g.
+            for a board with another kinematic loop time step in a tick-synchronous recorder
+        Returns:
+            the name of the board's recording file
+        """
+        suffix = f"_{board_name}" if board_name else ""
+        extension = "bin" if self.__columnar_codec is None else "bbcol"
+        record_file_name = f"sim_data_recording_{self.__timestamp}{suffix}.{extension}"
+        self.__sources.append((eks_lock, eks, record_file_name, state_refresher))
+        self.__buffers.append(RecordingRingBuffer(RECORD_DTYPE, self.__buffer_capacity))
+        self.__metadata.append(
+            {
+                "board_name": board_name,
+                "sample_period_ms": self.__recording_period_ms if recording_period_ms is None else recording_period_ms,
+                "clock": "mission_elapsed_time",
+                "decimation": self.__decimation,
+                "envelope": self.__envelope,
+                **(metadata or {}),
+            }
+        )
+        return record_file_name
+
+    def tick_listener(self, board_index: int = 0) -> Callable[[EboardKinematicState, float, float], None]:
+        """
+        Returns:
+            the tick listener that records the board added as the [board_index]th source, to be added to the
+            board's kinematic loop. It only records while the recorder is recording.
+        """
+        if self.__decimation is None:
+            raise ValueError("Tick listeners are only available from a tick-synchronous recorder")
+        return TickSampler(self.__buffers[board_index], self.__decimation, self.__envelope, lambda: self.__recording)
 
     def start_recording(self) -> None:
-        self.__recording_thread.start()
+        self.__recording = True
+        if self.__decimation is None:
+            self.__recording_thread.start()
+        self.__flusher_thread.start()
 
     def stop_recording(self):
+        """
+        Stops recording and waits until every buffered sample is written and the recording files are closed.
+        """
+        self.__recording = False
         self.__stop_recording = True
+        if self.__recording_thread.is_alive():
+            self.__recording_thread.join()
+        if self.__decimation is not None:
+            self.__recording_stopped.set()
+        if self.__flusher_thread.is_alive():
+            self.__flusher_thread.join()
+
+    @property
+    def overflow_counts(self) -> list[int]:
+        """
+        Number of samples of every board dropped because its buffer was full.
+        """
+        return [buffer.overflow_count for buffer in self.__buffers]
 
     @property
     def record_file_name(self) -> str:
-        return self.__record_file_name
+        return self.__sources[0][2]
+
+    @property
+    def record_file_names(self) -> list[str]:
+        return [record_file_name for _, _, record_file_name, _ in self.__sources]
 
     def record(self) -> None:
-        f = open(self.__record_file_name, "wb")
         while True:
-            eks_bytes = None
-            with self.__eks_lock:
-                timestamp = MissionElapsedTime().elapsed_time_sec
-                eks_bytes = struct.pack(
-                    "d f f f f f f f i f f",
-                    timestamp,
-                    self.__eks.velocity,
-                    self.__eks.acceleration_x,
-                    self.__eks.acceleration_y,
-                    self.__eks.acceleration_z,
-                    self.__eks.pitch,
-                    self.__eks.roll,
-                    self.__eks.yaw,
-                    self.__eks.erpm,
-                    self.__eks.motor_current,
-                    self.__eks.input_current,
-                )
-            f.write(eks_bytes)
+            for (eks_lock, eks, _, state_refresher), buffer in zip(self.__sources, self.__buffers):
+                if state_refresher is not None:
+                    state_refresher()
+                with eks_lock:
+                    sample = _sample(MissionElapsedTime().elapsed_time_sec, math.nan, eks)
+                buffer.append(sample)
             if self.__stop_recording:
-                f.close()
                 break
             time.sleep(self.__recording_period_s)
+        self.__recording_stopped.set()
+
+    def __flush_loop(self) -> None:
+        """
+        Writes the buffered samples of every board to its recording file every flush period, and the last ones
+        once recording stopped.
+        """
+        files = []
+        for (_, _, record_file_name, _), metadata in zip(self.__sources, self.__metadata):
+            if self.__columnar_codec is None:
+                f = open(record_file_name, "wb")
+                write_recording_header(f, RECORD_DTYPE, metadata)
+            else:
+                f = ColumnarRecordingWriter(record_file_name, RECORD_DTYPE, metadata, self.__columnar_codec)
+            files.append(f)
+        overflow_counts = [0] * len(files)
+        try:
+            while True:
+                stopped = self.__recording_stopped.wait(self.__flush_period_s)
+                for i, (buffer, f) in enumerate(zip(self.__buffers, files)):
+                    buffer.flush(f)
+                    if buffer.overflow_count != overflow_counts[i]:
+                        Logger().logger.warning(
+                            "Recording buffer overflowed, samples were dropped",
+                            record_file_name=f.name,
+                            dropped_samples=buffer.overflow_count - overflow_counts[i],
+                            total_dropped_samples=buffer.overflow_count,
+                        )
+                        overflow_counts[i] = buffer.overflow_count
+                if stopped:
+                    break
+        finally:
+            for f in files:
+                f.close()
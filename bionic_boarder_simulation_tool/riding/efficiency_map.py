@@ -0,0 +1,130 @@
+from bisect import bisect_right
+import csv
+import numpy as np
+
+
+class EfficiencyMap:
+    """
+    Combined efficiency of the motor and motor controller, tabulated over a grid of motor ERPM and motor torque.
+
+    The efficiency between grid points is interpolated bilinearly, and ERPM and torque outside the grid are clamped
+    to its edges. The map is symmetric: it is queried with the magnitudes of the ERPM and torque, so it covers
+    reverse and regenerative operation too. A single operating point is interpolated on plain Python lists, which
+    is faster than NumPy for one value per tick, and arrays of operating points are interpolated with NumPy.
+    """
+
+    def __init__(self, erpm: np.ndarray, torque_Nm: np.ndarray, efficiency: np.ndarray) -> None:
+        """
+        Args:
+            erpm: strictly increasing motor ERPM of the grid rows
+            torque_Nm: strictly increasing motor torque of the grid columns
+            efficiency: efficiency in (0, 1] at every grid point, with one row per ERPM and one column per torque
+        Raises:
+            ValueError: if the grid is malformed
+        """
+        erpm = np.asarray(erpm, dtype=np.float64)
+        torque_Nm = np.asarray(torque_Nm, dtype=np.float64)
+        efficiency = np.asarray(efficiency, dtype=np.float64)
+        for name, axis in (("ERPM", erpm), ("torque", torque_Nm)):
+            if axis.ndim != 1 or len(axis) < 2 or np.any(np.diff(axis) <= 0):
+                raise ValueError(f"The {name} axis of an efficiency map needs at least 2 strictly increasing values")
+        if efficiency.shape != (len(erpm), len(torque_Nm)):
+            raise ValueError(
+                f"Efficiency map grid has shape {efficiency.shape} instead of {(len(erpm), len(torque_Nm))}"
+            )
+        if np.any(efficiency <= 0.0) or np.any(efficiency > 1.0):
+            raise ValueError("Efficiency map values must be in (0, 1]")
+        self.__erpm = erpm
+        self.__torque_Nm = torque_Nm
+        self.__efficiency = efficiency
+        self.__erpm_list = erpm.tolist()
+        self.__torque_list = torque_Nm.tolist()
+        self.__efficiency_list = efficiency.tolist()
+
+    @classmethod
+    def from_csv(cls, file_name: str) -> "EfficiencyMap":
+        """
+        Loads an efficiency map from a CSV file. The first row holds the torque in Nm of every column after the
+        first, whose header cell is ignored. Every other row holds an ERPM followed by the efficiency at every torque.
+
+        Args:
+            file_name: name of the CSV file
+        Returns:
+            the efficiency map
+        Raises:
+            ValueError: if the file does not hold a valid efficiency map
+        """
+        with open(file_name, "r", newline="") as file:
+            rows = [row for row in csv.reader(file) if row]
+        if len(rows) < 2:
+            raise ValueError(f"Efficiency map {file_name} has no ERPM rows")
+        try:
+            torque_Nm = [float(value) for value in rows[0][1:]]
+            erpm = [float(row[0]) for row in rows[1:]]
+            efficiency = [[float(value) for value in row[1:]] for row in rows[1:]]
+        except ValueError as e:
+            raise ValueError(f"Efficiency map {file_name} holds a value that is not a number: {e}") from e
+        if any(len(row) != len(torque_Nm) for row in efficiency):
+            raise ValueError(f"Every row of efficiency map {file_name} must have {len(torque_Nm)} efficiencies")
+        return cls(np.array(erpm), np.array(torque_Nm), np.array(efficiency))
+
+    @property
+    def erpm(self) -> np.ndarray:
+        return self.__erpm
+
+    @property
+    def torque_Nm(self) -> np.ndarray:
+        return self.__torque_Nm
+
+    @property
+    def grid(self) -> np.ndarray:
+        return self.__efficiency
+
+    def efficiency(self, erpm: float, torque_Nm: float) -> float:
+        """
+        Args:
+            erpm: motor ERPM
+            torque_Nm: motor torque
+        Returns:
+            the interpolated efficiency at one operating point
+        """
+        i, u = self.__locate(self.__erpm_list, abs(erpm))
+        j, v = self.__locate(self.__torque_list, abs(torque_Nm))
+        row, next_row = self.__efficiency_list[i], self.__efficiency_list[i + 1]
+        low = row[j] + (row[j + 1] - row[j]) * v
+        high = next_row[j] + (next_row[j + 1] - next_row[j]) * v
+        return low + (high - low) * u
+
+    def efficiency_array(self, erpm: np.ndarray, torque_Nm: np.ndarray) -> np.ndarray:
+        """
+        Args:
+            erpm: motor ERPM of every operating point
+            torque_Nm: motor torque of every operating point, broadcastable with erpm
+        Returns:
+            the interpolated efficiency at every operating point
+        """
+        i, u = self.__locate_array(self.__erpm, np.abs(np.asarray(erpm, dtype=np.float64)))
+        j, v = self.__locate_array(self.__torque_Nm, np.abs(np.asarray(torque_Nm, dtype=np.float64)))
+        grid = self.__efficiency
+        low = grid[i, j] + (grid[i, j + 1] - grid[i, j]) * v
+        high = grid[i + 1, j] + (grid[i + 1, j + 1] - grid[i + 1, j]) * v
+        return low + (high - low) * u
+
+    @staticmethod
+    def __locate(axis: list[float], x: float) -> tuple[int, float]:
+        """
+        Returns:
+            the index of the grid cell holding [x] on [axis], and the fraction of the cell [x] lies at
+        """
+        if x <= axis[0]:
+            return 0, 0.0
+        if x >= axis[-1]:
+            return len(axis) - 2, 1.0
+        i = bisect_right(axis, x) - 1
+        return i, (x - axis[i]) / (axis[i + 1] - axis[i])
+
+    @staticmethod
+    def __locate_array(axis: np.ndarray, x: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+        x = np.clip(x, axis[0], axis[-1])
+        i = np.clip(np.searchsorted(axis, x, side="right") - 1, 0, len(axis) - 2)
+        return i, (x - axis[i]) / (axis[i + 1] - axis[i])
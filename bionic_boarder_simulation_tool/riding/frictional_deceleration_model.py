@@ -1,4 +1,4 @@
-from .eboard import EBoard
+from .eboard import EBoard, GRAVITY
 
 
 class FrictionalDecelerationModel:
@@ -9,7 +9,7 @@ class FrictionalDecelerationModel:
     to subtract from current velocity of the land paddle board.
     """
 
-    GRAVITY = 9.81  # m/s^2
+    GRAVITY = GRAVITY  # m/s^2
     AIR_DENSITY = 1.225  # kg/m3
 
     def __init__(
@@ -28,7 +28,9 @@ class FrictionalDecelerationModel:
         self.__mu_rolling = mu_rolling
         self.__c_drag = c_drag
         self.eboard = eboard
-        self.__force_friction = self.__mu_rolling * self.eboard.total_weight_with_rider_kg * self.GRAVITY
+        self.__force_friction = self.__mu_rolling * self.eboard.constants.force_1g_N
+        # Drag force is this factor times the velocity squared
+        self.__drag_factor = self.__c_drag * self.AIR_DENSITY * self.eboard.frontal_area_of_rider_m2
 
     def decelerate(self, current_velocity_m_per_s: float, time_step_ms: float) -> tuple[float, float]:
         """
@@ -39,9 +41,7 @@ class FrictionalDecelerationModel:
             acceleration in m/s^2 due to friction and drag
             delta velocity in m/s due to friction and drag
         """
-        force_drag = (
-            self.__c_drag * self.AIR_DENSITY * (current_velocity_m_per_s**2) * self.eboard.frontal_area_of_rider_m2
-        )
+        force_drag = self.__drag_factor * (current_velocity_m_per_s**2)
         force_total = self.__force_friction + force_drag
         acceleration_ms2 = force_total / self.eboard.total_weight_with_rider_kg
         delta_velocity_m_per_s = acceleration_ms2 * time_step_ms / 1000
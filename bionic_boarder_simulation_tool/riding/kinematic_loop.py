@@ -1,10 +1,12 @@
 import math
-from .eboard import EBoard
+from .eboard import EBoard, GRAVITY
 from .eboard_kinematic_state import EboardKinematicState
 from .frictional_deceleration_model import FrictionalDecelerationModel
+from .motor_controller import MotorController
 from .push_model import PushModel
 import time
 from threading import Lock
+from typing import Callable
 import random
 from bionic_boarder_simulation_tool.logger import Logger
 
@@ -34,7 +36,55 @@ class KinematicLoop:
         self.__initial_theta_slope_deg = 0.0
         self.__current_theta_slope_deg = 0.0
         self.__loop_active = False
+        self.__stopped = False
         self.__slope_range_bound_deg = None
+        self.__theta_slope_time_step_sec = 0
+        self.__push_period_time_step_sec = 0
+        self.__motor_controller = None
+        self.__accel_gravity_x_m_per_s2 = 0.0
+        self.__sim_time_sec = 0.0
+        self.__random = random.Random()
+        self.__random_seed = None
+        self.__tick_listeners: list[Callable[[EboardKinematicState, float, float], None]] = []
+
+    @property
+    def motor_controller(self) -> MotorController:
+        """
+        The motor controller whose analytic ERPM ramp is brought up to date before every step, and whose motor torque
+        is integrated while it is in current control, or None.
+        """
+        return self.__motor_controller
+
+    @motor_controller.setter
+    def motor_controller(self, value: MotorController) -> None:
+        self.__motor_controller = value
+
+    def add_tick_listener(self, listener: Callable[[EboardKinematicState, float, float], None]) -> None:
+        """
+        Adds a listener called at the end of every step, including the steps where the motor controls the board,
+        as listener(eks, sim_time_sec, time_step_sec). Listeners are called with the kinematic state lock held, so
+        they see a consistent kinematic state and must not take the lock themselves.
+        """
+        self.__tick_listeners.append(listener)
+
+    @property
+    def random_seed(self) -> int:
+        return self.__random_seed
+
+    @random_seed.setter
+    def random_seed(self, value: int) -> None:
+        """
+        Seeds the random slopes and pushes, so that runs with the same seed see the same slopes and pushes.
+        """
+        self.__random_seed = value
+        self.__random.seed(value)
+
+    @property
+    def sim_time_sec(self) -> float:
+        """
+        Simulated time since the last reset, advanced by the fixed time step every step.
+        """
+        return self.__sim_time_sec
 
     @property
     def slope_range_bound_deg(self) -> float:
@@ -80,84 +130,124 @@ class KinematicLoop:
     def current_theta_slope_deg(self) -> float:
         return self.__current_theta_slope_deg
 
+    def reset(self) -> None:
+        """
+        Resets the slope and push periods so that the next step starts a new run from the initial slope.
+        """
+        self.__set_theta_slope_deg(self.__initial_theta_slope_deg)
+        self.__theta_slope_time_step_sec = 0
+        self.__push_period_time_step_sec = 0
+        self.__sim_time_sec = 0.0
+
+    def __set_theta_slope_deg(self, theta_slope_deg: float) -> None:
+        """
+        Sets the slope and the magnitude of the gravitational acceleration along it, which only changes with the slope.
+        """
+        self.__current_theta_slope_deg = theta_slope_deg
+        self.__accel_gravity_x_m_per_s2 = GRAVITY * math.sin(math.radians(abs(theta_slope_deg)))
+
     def loop(self) -> None:
         self.__loop_active = True
-        self.__current_theta_slope_deg = self.__initial_theta_slope_deg
-        theta_slope_time_step_sec = 0
-        push_period_time_step_sec = 0
+        self.reset()
         Logger().logger.info("Kinematic loop has started")
         while True:
             if not self.__loop_active:
                 break
-            if self.__eks.motor_current > 0:
-                """
-                This means that the electric motor is controlling the land paddle board because a current is
-                being injected into the motor. In this case, the land paddle board's kinematics will not be
-                adjusted due to frictional forces, gravity, and/or a user's push. Instead, just skip to
-                next iteration of the loop after the fixed time step.
-                """
-                time.sleep(self.__fixed_time_step_ms / 1000.0)
-                continue
             start_time = time.perf_counter()
-            if theta_slope_time_step_sec >= self.__theta_slope_period_sec:
-                if self.__current_theta_slope_deg == 0.0:
-                    self.__current_theta_slope_deg = random.uniform(
+            self.step()
+            elapsed_time = time.perf_counter() - start_time
+            sleep_time = max(0, self.__fixed_time_step_ms / 1000.0 - elapsed_time)
+            time.sleep(sleep_time)
+
+    def step(self) -> None:
+        """
+        Moves the land paddle board forward in time by one fixed time step and calls the tick listeners.
+        """
+        self.__integrate()
+        time_step_sec = self.__fixed_time_step_ms / 1000.0
+        self.__sim_time_sec += time_step_sec
+        if self.__tick_listeners:
+            with self.__eks_lock:
+                for listener in self.__tick_listeners:
+                    listener(self.__eks, self.__sim_time_sec, time_step_sec)
+
+    def __integrate(self) -> None:
+        mc = self.__motor_controller
+        current_control = False
+        if mc is not None:
+            mc.refresh_kinematic_state()
+            current_control = mc.current_control_active
+        if self.__eks.motor_current > 0 and not current_control:
+            """
+            This means that the electric motor is controlling the land paddle board's speed because a current is
+            being injected into the motor to hold a target ERPM. In this case, the land paddle board's kinematics
+            will not be adjusted due to frictional forces, gravity, and/or a user's push.
+            """
+            return
+        if self.__theta_slope_time_step_sec >= self.__theta_slope_period_sec:
+            if self.__current_theta_slope_deg == 0.0:
+                self.__set_theta_slope_deg(
+                    self.__random.uniform(
                         -self.__slope_range_bound_deg,
                         self.__slope_range_bound_deg,
                     )
-                    Logger().logger.info(
-                        "Calculated new theta slope value", theta_slope_deg=self.__current_theta_slope_deg
-                    )
-                else:
-                    self.__current_theta_slope_deg = 0.0
-                    Logger().logger.info(
-                        "Theta slope value is set to 0.0", theta_slope_deg=self.__current_theta_slope_deg
-                    )
-                theta_slope_time_step_sec = 0
-                with self.__eks_lock:
-                    self.__eks.pitch = self.__current_theta_slope_deg
-            theta_slope_time_step_sec += self.__fixed_time_step_ms / 1000.0
-            if push_period_time_step_sec >= self.__push_period_sec:
-                force_1g_N = self.__eb.total_weight_with_rider_kg * 9.81
-                force_push_x_N = random.uniform(force_1g_N, 2 * force_1g_N)
-                push_duration_ms = random.randint(400, 600)
-                Logger().logger.info(
-                    "Land paddle board push initiated",
-                    force_x_of_the_push=force_push_x_N,
-                    duration_of_the_push_ms=push_duration_ms,
                 )
-                self.__pm.setup(force_push_x_N, push_duration_ms)
-                push_period_time_step_sec = 0
-            push_period_time_step_sec += self.__fixed_time_step_ms / 1000.0
-            self.__eks_lock.acquire()
-            accel_friction_ms2, delta_velocity_friction_m_per_s = self.__fdm.decelerate(
-                self.__eks.velocity, self.fixed_time_step_ms
-            )
-            if self.__eks.velocity < 0.0:
-                self.__eks.velocity = min(0, self.__eks.velocity + delta_velocity_friction_m_per_s)
-                self.__eks.acceleration_x = accel_friction_ms2
-            else:
-                self.__eks.velocity = max(0, self.__eks.velocity - delta_velocity_friction_m_per_s)
-                self.__eks.acceleration_x = -accel_friction_ms2
-            accel_gravity_x_m_per_s2 = 9.81 * math.sin(math.radians(abs(self.__current_theta_slope_deg)))
-            delta_velocity_gravity_x_m_per_s = accel_gravity_x_m_per_s2 * self.__fixed_time_step_ms / 1000.0
-            if self.__current_theta_slope_deg >= 0.0:
-                self.__eks.velocity -= delta_velocity_gravity_x_m_per_s
-                self.__eks.acceleration_x -= accel_gravity_x_m_per_s2
+                Logger().logger.info("Calculated new theta slope value", theta_slope_deg=self.__current_theta_slope_deg)
             else:
-                self.__eks.velocity += delta_velocity_gravity_x_m_per_s
-                self.__eks.acceleration_x += accel_gravity_x_m_per_s2
-            if self.__pm.push_active:
-                accel_x_m_per_s2, delta_velocity_push_m_per_s = self.__pm.step(self.__fixed_time_step_ms)
-                self.__eks.acceleration_x += accel_x_m_per_s2
-                self.__eks.velocity += delta_velocity_push_m_per_s
-            wheel_rpm = (self.__eks.velocity / (self.__eb.wheel_diameter_m * math.pi)) * 60
-            motor_rpm = wheel_rpm * self.__eb.gear_ratio
-            self.__eks.erpm = int(self.__eb.motor_pole_pairs * motor_rpm)
-            self.__eks_lock.release()
-            elapsed_time = time.perf_counter() - start_time
-            sleep_time = max(0, self.__fixed_time_step_ms / 1000.0 - elapsed_time)
-            time.sleep(sleep_time)
+                self.__set_theta_slope_deg(0.0)
+                Logger().logger.info("Theta slope value is set to 0.0", theta_slope_deg=self.__current_theta_slope_deg)
+            self.__theta_slope_time_step_sec = 0
+            with self.__eks_lock:
+                self.__eks.pitch = self.__current_theta_slope_deg
+        self.__theta_slope_time_step_sec += self.__fixed_time_step_ms / 1000.0
+        if self.__push_period_time_step_sec >= self.__push_period_sec:
+            force_1g_N = self.__eb.constants.force_1g_N
+            force_push_x_N = self.__random.uniform(force_1g_N, 2 * force_1g_N)
+            push_duration_ms = self.__random.randint(400, 600)
+            Logger().logger.info(
+                "Land paddle board push initiated",
+                force_x_of_the_push=force_push_x_N,
+                duration_of_the_push_ms=push_duration_ms,
+            )
+            self.__pm.setup(force_push_x_N, push_duration_ms)
+            self.__push_period_time_step_sec = 0
+        self.__push_period_time_step_sec += self.__fixed_time_step_ms / 1000.0
+        self.__eks_lock.acquire()
+        accel_friction_ms2, delta_velocity_friction_m_per_s = self.__fdm.decelerate(
+            self.__eks.velocity, self.fixed_time_step_ms
+        )
+        if self.__eks.velocity < 0.0:
+            self.__eks.velocity = min(0, self.__eks.velocity + delta_velocity_friction_m_per_s)
+            self.__eks.acceleration_x = accel_friction_ms2
+        else:
+            self.__eks.velocity = max(0, self.__eks.velocity - delta_velocity_friction_m_per_s)
+            self.__eks.acceleration_x = -accel_friction_ms2
+        accel_gravity_x_m_per_s2 = self.__accel_gravity_x_m_per_s2
+        delta_velocity_gravity_x_m_per_s = accel_gravity_x_m_per_s2 * self.__fixed_time_step_ms / 1000.0
+        if self.__current_theta_slope_deg >= 0.0:
+            self.__eks.velocity -= delta_velocity_gravity_x_m_per_s
+            self.__eks.acceleration_x -= accel_gravity_x_m_per_s2
+        else:
+            self.__eks.velocity += delta_velocity_gravity_x_m_per_s
+            self.__eks.acceleration_x += accel_gravity_x_m_per_s2
+        if self.__pm.push_active:
+            accel_x_m_per_s2, delta_velocity_push_m_per_s = self.__pm.step(self.__fixed_time_step_ms)
+            self.__eks.acceleration_x += accel_x_m_per_s2
+            self.__eks.velocity += delta_velocity_push_m_per_s
+        if current_control:
+            accel_motor_x_m_per_s2 = mc.drive_current_control()
+            self.__eks.acceleration_x += accel_motor_x_m_per_s2
+            self.__eks.velocity += accel_motor_x_m_per_s2 * self.__fixed_time_step_ms / 1000.0
+        self.__eks.erpm = int(self.__eks.velocity * self.__eb.constants.erpm_per_velocity_m_per_s)
+        self.__eks_lock.release()
 
     def stop(self) -> None:
         self.__loop_active = False
+        self.__stopped = True
+
+    @property
+    def stopped(self) -> bool:
+        """
+        True once the kinematic loop has been stopped. A KinematicScheduler does not step a stopped kinematic loop.
+        """
+        return self.__stopped
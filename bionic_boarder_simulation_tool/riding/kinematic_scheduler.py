@@ -0,0 +1,59 @@
+from .kinematic_loop import KinematicLoop
+import time
+from typing import Callable
+from bionic_boarder_simulation_tool.logger import Logger
+
+
+class KinematicScheduler:
+    """
+    This class steps the kinematic loops of many simulated land paddle boards from a single thread, so that
+    the per board overhead of a fleet does not include a thread and a sleep per kinematic loop.
+
+    Every kinematic loop is stepped at its own fixed time step. When a step is late by more than one fixed
+    time step, the schedule of that loop is moved forward instead of trying to catch up with a burst of steps.
+    """
+
+    def __init__(self) -> None:
+        self.__kinematic_loops: list[KinematicLoop] = []
+        self.__tick_hooks: list[Callable[[], None]] = []
+        self.__active = False
+
+    @property
+    def kinematic_loops(self) -> list[KinematicLoop]:
+        return self.__kinematic_loops
+
+    def add(self, kinematic_loop: KinematicLoop) -> None:
+        self.__kinematic_loops.append(kinematic_loop)
+
+    def add_tick_hook(self, tick_hook: Callable[[], None]) -> None:
+        """
+        Adds a function that is called on the scheduler thread after every pass that stepped a kinematic loop.
+        """
+        self.__tick_hooks.append(tick_hook)
+
+    def run(self) -> None:
+        self.__active = True
+        periods_sec = [kl.fixed_time_step_ms / 1000.0 for kl in self.__kinematic_loops]
+        for kl in self.__kinematic_loops:
+            kl.reset()
+        now = time.perf_counter()
+        next_step_times = [now] * len(self.__kinematic_loops)
+        Logger().logger.info("Kinematic scheduler has started", number_of_kinematic_loops=len(self.__kinematic_loops))
+        while self.__active and self.__kinematic_loops:
+            now = time.perf_counter()
+            stepped = False
+            for i, kl in enumerate(self.__kinematic_loops):
+                if now < next_step_times[i] or kl.stopped:
+                    continue
+                kl.step()
+                stepped = True
+                next_step_times[i] += periods_sec[i]
+                if next_step_times[i] < now:
+                    next_step_times[i] = now + periods_sec[i]
+            if stepped:
+                for tick_hook in self.__tick_hooks:
+                    tick_hook()
+            time.sleep(max(0, min(next_step_times) - time.perf_counter()))
+
+    def stop(self) -> None:
+        self.__active = False
@@ -1,12 +1,30 @@
 from bionic_boarder_simulation_tool.riding.frictional_deceleration_model import FrictionalDecelerationModel
 from .eboard_kinematic_state import EboardKinematicState
-from threading import Lock, BoundedSemaphore, Thread, Event
+from threading import Lock, Thread, Event
 from .eboard import EBoard
+from .setpoint_mailbox import SetpointMailbox
+from .battery_discharge_model import BatteryDischargeModel
+from .efficiency_map import EfficiencyMap
+from .thermal_model import ThermalModel
+from enum import Enum
 import math
 import time
 from bionic_boarder_simulation_tool.logger import Logger
 
 
+class ErpmRampMode(Enum):
+    """
+    Enum class for how the motor controller ramps the ERPM of the motor toward a target ERPM.
+
+    THREAD advances the ERPM every control time step on a control thread. ANALYTIC only stores the start time,
+    start ERPM, target ERPM and ramp rate of the ramp, and computes the ERPM and the state derived from it when
+    the kinematic state is refreshed.
+    """
+
+    THREAD = "thread"
+    ANALYTIC = "analytic"
+
+
 class MotorController:
 
     def __init__(self, eb: EBoard, eks: EboardKinematicState, eks_lock: Lock, fdm: FrictionalDecelerationModel) -> None:
@@ -14,11 +32,18 @@ class MotorController:
         self.__eks_lock = eks_lock
         self.__eb = eb
         self.__fdm = fdm
+        self.__constants = eb.constants
 
         # Specify motor efficiency. This is an estimate to be used for any motor setup.
         self.__motor_efficiency = 0.90
         # Specify controller efficiency. This is an estimate for the VESC controller
         self.__controller_efficiency = 0.97
+        # Efficiency map that replaces the two estimates above when it is set
+        self.__efficiency_map: EfficiencyMap = None
+        # Thermal model of the FET and motor, which may limit the motor current when they are hot
+        self.__thermal_model: ThermalModel = None
+        # Battery whose terminal voltage the input current is drawn at, or the max battery voltage when it is not set
+        self.__battery_discharge_model: BatteryDischargeModel = None
 
         # Compute max acceleration the motor can move this particular eboard in ERPM/sec
         wheel_radius = eb.wheel_diameter_m / 2
@@ -29,46 +54,49 @@ class MotorController:
         angular_acceleration_wheel_rpm_sec = angular_acceleration_wheel_rad_per_sec2 * (60 / (2 * math.pi))
         motor_acceleration_rpm_sec = angular_acceleration_wheel_rpm_sec * eb.gear_ratio
         self.__erpm_per_sec = motor_acceleration_rpm_sec * eb.motor_pole_pairs
-        self.__target_erpm = 0
-        self.__erpm_sem = BoundedSemaphore(1)
+        # Largest motor current in either direction, limited by the motor's max current and max torque
+        self.__max_current_A = min(eb.motor_max_amps, eb.motor_max_torque / self.__constants.motor_kt_Nm_per_A)
+        self.__erpm_mailbox = SetpointMailbox(0)
         self.__erpm_thread = Thread(target=self.__erpm_control)
         self.__erpm_thread.daemon = True
-
-        self.__target_current = 0.0
-        self.__current_sem = BoundedSemaphore(1)
-        self.__current_thread = Thread(target=self.__current_control)
-        self.__current_thread.daemon = True
         self.__stop_event = Event()
 
         self.__control_time_step_sec = 0
         self.__zero_current_flag = False
+        self.__current_control_active = False
+        self.__target_current_A = 0.0
+        self.__commanded_current_A = 0.0
+        self.__erpm_ramp_mode = ErpmRampMode.THREAD
+        # (start time in seconds, start ERPM, target ERPM, signed ramp rate in ERPM/sec) of the analytic ramp
+        self.__ramp: tuple[float, int, int, float] = None
 
     def start(self) -> None:
-        # Decrement the semaphore counters by 1
-        self.__erpm_sem.acquire()
-        self.__current_sem.acquire()
-        self.__erpm_thread.start()
-        self.__current_thread.start()
+        if self.__erpm_ramp_mode == ErpmRampMode.THREAD:
+            self.__erpm_thread.start()
 
     def stop(self) -> None:
         self.__stop_event.set()
-        self.__erpm_sem.release()
-        self.__current_sem.release()
+        self.__erpm_mailbox.close()
 
     def __erpm_control(self) -> None:
         while not self.__stop_event.is_set():
-            self.__zero_current_flag = False
-            self.__erpm_sem.acquire()
-            target_erpm = self.__target_erpm
+            setpoint = self.__erpm_mailbox.take()
+            if setpoint is None:
+                break
+            if self.__zero_current_flag:
+                # A target current posted after the target ERPM has taken the motor out of ERPM control
+                continue
+            target_erpm = setpoint.value
             with self.__eks_lock:
                 starting_erpm = self.__eks.erpm
                 previous_velocity_m_per_s = self.__eks.velocity
-            if starting_erpm == self.__target_erpm:
+            if starting_erpm == target_erpm:
                 continue
             Logger().logger.info(
                 "Control loop activated to change motor's speed to target ERPM",
                 starting_erpm=starting_erpm,
-                target_erpm=self.__target_erpm,
+                target_erpm=target_erpm,
+                coalesced_setpoints=setpoint.coalesced,
             )
             erpm_step = round(self.__erpm_per_sec * self.__control_time_step_sec)
             if erpm_step == 0:
@@ -80,57 +108,173 @@ class MotorController:
                 while (time.perf_counter() - st) < self.__control_time_step_sec:
                     pass
                 with self.__eks_lock:
-                    self.__eks.erpm += erpm_step
-                    self.__eks.velocity = ((self.__eks.erpm / self.__eb.motor_pole_pairs) / self.__eb.gear_ratio) * (
-                        (math.pi * self.__eb.wheel_diameter_m) / 60
-                    )
-                    mechanical_rpm = self.__eks.erpm / self.__eb.motor_pole_pairs
-                    motor_angular_velocity_rad_per_sec = (mechanical_rpm * 2 * math.pi) / 60
-                    wheel_radius_m = self.__eb.wheel_diameter_m / 2
-                    wheel_speed_m_per_sec = (motor_angular_velocity_rad_per_sec / self.__eb.gear_ratio) * wheel_radius_m
-                    frictional_acceleration_m_per_s2 = self.__fdm.decelerate(
-                        wheel_speed_m_per_sec, self.__control_time_step_sec * 1000.0
-                    )[0]
-                    total_resistive_force_N = frictional_acceleration_m_per_s2 * self.__eb.total_weight_with_rider_kg
-                    wheel_torque_Nm = total_resistive_force_N * wheel_radius_m
-                    motor_torque_Nm = wheel_torque_Nm / self.__eb.gear_ratio
-                    motor_kt = 60 / (2 * math.pi * self.__eb.motor_kv)
-                    self.__eks.motor_current = motor_torque_Nm / motor_kt
-                    mechanical_power = motor_torque_Nm * motor_angular_velocity_rad_per_sec
-                    self.__eks.input_current = mechanical_power / (
-                        self.__eb.battery_max_voltage * self.__motor_efficiency * self.__controller_efficiency
-                    )
+                    if self.__zero_current_flag:
+                        break
+                    erpm = self.__eks.erpm + erpm_step
+                    velocity_m_per_s = erpm * self.__constants.velocity_m_per_s_per_erpm
                     motor_acceleration_m_per_s2 = (
-                        self.__eks.velocity - previous_velocity_m_per_s
+                        velocity_m_per_s - previous_velocity_m_per_s
                     ) / self.__control_time_step_sec
-                    self.__eks.acceleration_x = motor_acceleration_m_per_s2 - frictional_acceleration_m_per_s2
-                    previous_velocity_m_per_s = self.__eks.velocity
+                    self.__set_motor_driven_state(erpm, motor_acceleration_m_per_s2)
+                    previous_velocity_m_per_s = velocity_m_per_s
                 last_erpm_value += erpm_step
-                if self.__target_erpm != target_erpm:
-                    target_erpm = self.__target_erpm
-                    erpm_step = erpm_step if last_erpm_value < target_erpm else -erpm_step
-                if self.__zero_current_flag:
-                    with self.__eks_lock:
-                        self.__eks.motor_current = 0.0
-                        self.__eks.input_current = 0.0
-                    break
+                setpoint = self.__erpm_mailbox.poll()
+                if setpoint is not None:
+                    target_erpm = setpoint.value
+                    erpm_step = abs(erpm_step) if last_erpm_value < target_erpm else -abs(erpm_step)
             Logger().logger.info(
-                "ERPM control loop deactivated", target_erpm=self.__target_erpm, last_computed_erpm=last_erpm_value
+                "ERPM control loop deactivated",
+                target_erpm=target_erpm,
+                last_computed_erpm=last_erpm_value,
+                coalesced_setpoints=self.__erpm_mailbox.coalesced_count,
             )
 
-    def __current_control(self) -> None:
+    def __set_motor_driven_state(self, erpm: int, motor_acceleration_m_per_s2: float) -> None:
         """
-        At this time, the only purpose of this motor control scheme is to set the current to 0.0
-        so that the motor will disengage out of ERPM control and just coast. In the future, this scheme will
-        be replaced with a more sophisticated control scheme.
+        Sets the kinematic state of the board while the motor drives it at [erpm], with the motor current needed
+        to overcome friction and drag. The caller must hold the kinematic state lock.
         """
-        while not self.__stop_event.is_set():
-            self.__current_sem.acquire()
-            if self.__target_current == 0.0:
-                self.__zero_current_flag = True
-                Logger().logger.info("Current control has set motor current to 0")
-            else:
-                raise ValueError("Target Current must be set to 0.0")
+        c = self.__constants
+        self.__eks.erpm = erpm
+        self.__eks.velocity = erpm * c.velocity_m_per_s_per_erpm
+        motor_angular_velocity_rad_per_sec = erpm * c.motor_rad_per_sec_per_erpm
+        frictional_acceleration_m_per_s2 = self.__fdm.decelerate(
+            self.__eks.velocity, self.__control_time_step_sec * 1000.0
+        )[0]
+        total_resistive_force_N = frictional_acceleration_m_per_s2 * self.__eb.total_weight_with_rider_kg
+        wheel_torque_Nm = total_resistive_force_N * c.wheel_radius_m
+        motor_torque_Nm = wheel_torque_Nm / self.__eb.gear_ratio
+        self.__eks.motor_current = motor_torque_Nm / c.motor_kt_Nm_per_A
+        mechanical_power = motor_torque_Nm * motor_angular_velocity_rad_per_sec
+        self.__eks.input_current = mechanical_power / (
+            self.__battery_voltage() * self.__efficiency(erpm, motor_torque_Nm)
+        )
+        self.__eks.acceleration_x = motor_acceleration_m_per_s2 - frictional_acceleration_m_per_s2
+
+    def __start_ramp(self, target_erpm: int) -> int | None:
+        """
+        Starts an analytic ramp from the current ERPM toward [target_erpm]. The caller must hold the kinematic state
+        lock.
+
+        Returns:
+            the starting ERPM of the ramp, or None if the motor already runs at [target_erpm]
+        """
+        now = time.perf_counter()
+        self.__evaluate_ramp(now)
+        starting_erpm = self.__eks.erpm
+        if starting_erpm == target_erpm:
+            self.__ramp = None
+            return None
+        rate = self.__erpm_per_sec if starting_erpm < target_erpm else -self.__erpm_per_sec
+        self.__ramp = (now, starting_erpm, target_erpm, rate)
+        return starting_erpm
+
+    def __evaluate_ramp(self, now: float) -> None:
+        """
+        Sets the kinematic state of the board to the state of the analytic ramp at time [now]. The caller must hold
+        the kinematic state lock.
+        """
+        if self.__ramp is None:
+            return
+        start_time, starting_erpm, target_erpm, rate = self.__ramp
+        erpm = starting_erpm + rate * (now - start_time)
+        if (erpm >= target_erpm) == (rate > 0):
+            self.__set_motor_driven_state(target_erpm, 0.0)
+            self.__ramp = None
+            return
+        self.__set_motor_driven_state(int(erpm), rate * self.__constants.velocity_m_per_s_per_erpm)
+
+    def refresh_kinematic_state(self) -> None:
+        """
+        Brings the kinematic state of the board up to date with the analytic ERPM ramp. Readers of the kinematic
+        state call this before reading it; it does nothing when no analytic ramp is active.
+        """
+        if self.__ramp is None:
+            return
+        with self.__eks_lock:
+            self.__evaluate_ramp(time.perf_counter())
+
+    def drive_current_control(self) -> float:
+        """
+        Sets the motor current and input current of the board driven by the commanded motor current, and returns
+        the acceleration the motor's torque gives the board. The motor current is reduced by the thermal model's
+        current limit, and if its mechanical power would exceed the motor's max power. The input current is derived
+        from the electrical power drawn from, or regenerated into, the battery. The caller must hold the kinematic
+        state lock.
+
+        Returns:
+            the acceleration of the board from the motor in m/s^2
+        """
+        c = self.__constants
+        current_A = self.__commanded_current_A
+        if self.__thermal_model is not None:
+            current_A *= self.__thermal_model.snapshot.current_limit_scale
+        motor_angular_velocity_rad_per_sec = self.__eks.erpm * c.motor_rad_per_sec_per_erpm
+        mechanical_power = current_A * c.motor_kt_Nm_per_A * motor_angular_velocity_rad_per_sec
+        if abs(mechanical_power) > self.__eb.motor_max_power_watts:
+            scale = self.__eb.motor_max_power_watts / abs(mechanical_power)
+            current_A *= scale
+            mechanical_power *= scale
+        efficiency = self.__efficiency(self.__eks.erpm, current_A * c.motor_kt_Nm_per_A)
+        electrical_power = mechanical_power / efficiency if mechanical_power >= 0.0 else mechanical_power * efficiency
+        self.__eks.motor_current = current_A
+        self.__eks.input_current = electrical_power / self.__battery_voltage()
+        wheel_force_N = current_A * c.motor_kt_Nm_per_A * self.__eb.gear_ratio / c.wheel_radius_m
+        return wheel_force_N / self.__eb.total_weight_with_rider_kg
+
+    def __battery_voltage(self) -> float:
+        """
+        Returns:
+            the terminal voltage of the battery after its latest current draw, or the max battery voltage when the
+            motor controller has no battery discharge model
+        """
+        if self.__battery_discharge_model is None:
+            return self.__eb.battery_max_voltage
+        return self.__battery_discharge_model.snapshot.terminal_voltage
+
+    def __efficiency(self, erpm: float, motor_torque_Nm: float) -> float:
+        """
+        Returns:
+            the combined efficiency of the motor and motor controller at the operating point
+        """
+        if self.__efficiency_map is None:
+            return self.__motor_efficiency * self.__controller_efficiency
+        return self.__efficiency_map.efficiency(erpm, motor_torque_Nm)
+
+    @property
+    def efficiency_map(self) -> EfficiencyMap:
+        return self.__efficiency_map
+
+    @efficiency_map.setter
+    def efficiency_map(self, value: EfficiencyMap) -> None:
+        """
+        Sets the efficiency map used to derive the input current from the motor's mechanical power, or None to use
+        the fixed motor and controller efficiency estimates.
+        """
+        self.__efficiency_map = value
+
+    @property
+    def thermal_model(self) -> ThermalModel:
+        """
+        The thermal model of the FET and motor, or None. Its current limit scales the motor current in current control.
+        """
+        return self.__thermal_model
+
+    @thermal_model.setter
+    def thermal_model(self, value: ThermalModel) -> None:
+        self.__thermal_model = value
+
+    @property
+    def battery_discharge_model(self) -> BatteryDischargeModel:
+        """
+        The battery discharge model, or None. The input current is the electrical power divided by its terminal
+        voltage.
+        """
+        return self.__battery_discharge_model
+
+    @battery_discharge_model.setter
+    def battery_discharge_model(self, value: BatteryDischargeModel) -> None:
+        self.__battery_discharge_model = value
 
     @property
     def control_time_step_ms(self) -> int:
@@ -140,32 +284,86 @@ class MotorController:
     def control_time_step_ms(self, value: int) -> None:
         self.__control_time_step_sec = value / 1000.0
 
+    @property
+    def erpm_ramp_mode(self) -> ErpmRampMode:
+        return self.__erpm_ramp_mode
+
+    @erpm_ramp_mode.setter
+    def erpm_ramp_mode(self, value: ErpmRampMode) -> None:
+        """
+        Must be set before the motor controller is started.
+        """
+        self.__erpm_ramp_mode = value
+
     @property
     def erpm_per_sec(self) -> float:
         return self.__erpm_per_sec
 
     @property
     def target_erpm(self) -> int:
-        return self.__target_erpm
+        return self.__erpm_mailbox.value
 
     @target_erpm.setter
     def target_erpm(self, value: int) -> None:
-        self.__target_erpm = value
+        """
+        Posts a new target ERPM to the ERPM control thread. Targets posted faster than the thread takes them are
+        coalesced, and the latest one wins. A target ERPM takes the motor out of current control.
+
+        The control mode is changed under the kinematic state lock, together with posting the target, so target
+        ERPMs and target currents take effect in the order they are set.
+        """
+        with self.__eks_lock:
+            self.__zero_current_flag = False
+            self.__current_control_active = False
+            self.__erpm_mailbox.post(value)
+            starting_erpm = self.__start_ramp(value) if self.__erpm_ramp_mode == ErpmRampMode.ANALYTIC else None
+        if starting_erpm is not None:
+            Logger().logger.info(
+                "Analytic ramp activated to change motor's speed to target ERPM",
+                starting_erpm=starting_erpm,
+                target_erpm=value,
+            )
 
     @property
     def target_current(self) -> float:
-        return self.__target_current
+        return self.__target_current_A
 
     @target_current.setter
     def target_current(self, value: float) -> None:
-        if value != 0.0:
-            raise ValueError("Target Current must be set to 0.0")
-        self.__target_current = value
+        """
+        Sets a new target motor current in amps. The motor current is limited to the motor's max current and max
+        torque in either direction.
+
+        A target current takes the motor out of ERPM control. A non-zero target current puts the motor in current
+        control, where the kinematic loop integrates the acceleration from the motor's torque, see
+        drive_current_control. A target current of 0.0 lets the board coast. Like for target ERPMs, the control
+        mode is changed under the kinematic state lock, so target ERPMs and target currents take effect in the
+        order they are set.
+        """
+        current_A = max(-self.__max_current_A, min(self.__max_current_A, value))
+        with self.__eks_lock:
+            if self.__erpm_ramp_mode == ErpmRampMode.ANALYTIC:
+                self.__evaluate_ramp(time.perf_counter())
+                self.__ramp = None
+            self.__zero_current_flag = True
+            self.__commanded_current_A = current_A
+            self.__current_control_active = current_A != 0.0
+            if not self.__current_control_active:
+                self.__eks.motor_current = 0.0
+                self.__eks.input_current = 0.0
+            self.__target_current_A = value
+        if current_A != 0.0:
+            Logger().logger.info("Current control has set motor current", target_current=value, motor_current=current_A)
+        else:
+            Logger().logger.info("Current control has set motor current to 0")
 
     @property
-    def erpm_sem(self) -> BoundedSemaphore:
-        return self.__erpm_sem
+    def current_control_active(self) -> bool:
+        """
+        True while the motor is driven by a non-zero target current.
+        """
+        return self.__current_control_active
 
     @property
-    def current_sem(self) -> BoundedSemaphore:
-        return self.__current_sem
+    def erpm_mailbox(self) -> SetpointMailbox:
+        return self.__erpm_mailbox
@@ -0,0 +1,121 @@
+from dataclasses import dataclass, field
+import json
+import os
+import struct
+from typing import BinaryIO
+import numpy as np
+
+"""
+Layout of one sample of a headerless recording. It matches the "d f f f f f f f i f f" struct those recordings were
+written with byte for byte.
+"""
+LEGACY_RECORD_DTYPE = np.dtype(
+    [
+        ("timestamp", "<f8"),
+        ("velocity", "<f4"),
+        ("acceleration_x", "<f4"),
+        ("acceleration_y", "<f4"),
+        ("acceleration_z", "<f4"),
+        ("pitch", "<f4"),
+        ("roll", "<f4"),
+        ("yaw", "<f4"),
+        ("erpm", "<i4"),
+        ("motor_current", "<f4"),
+        ("input_current", "<f4"),
+    ]
+)
+
+"""
+Layout of one recorded sample. The timestamp is the mission elapsed time, the clock of the simulation's logs. The
+simulated time of the kinematic loop tick the sample was taken at follows the fields of the legacy layout, or NaN
+if the sample was not taken at a tick.
+"""
+RECORD_DTYPE = np.dtype(LEGACY_RECORD_DTYPE.descr + [("simulated_time", "<f8")])
+
+RECORDING_MAGIC = b"BBSREC\x00\x00"
+"""
+Version 2 appends the simulated_time field to the samples and stamps them with the mission elapsed time. The
+header lists the fields of a sample, so recordings of either version are read with the layout they were written
+with.
+"""
+RECORDING_FORMAT_VERSION = 2
+
+"""
+Magic, format version, reserved and length of the JSON metadata that follows, including its padding.
+"""
+HEADER_PREFIX = struct.Struct("<8sHHI")
+
+"""
+The payload starts at a multiple of this offset, so the records of a memory mapped recording are aligned.
+"""
+PAYLOAD_ALIGNMENT = 64
+
+
+@dataclass(frozen=True)
+class RecordingHeader:
+    """
+    Header of a recording. Legacy recordings without a header have format version 0 and no metadata.
+    """
+
+    format_version: int
+    dtype: np.dtype
+    payload_offset: int
+    metadata: dict = field(default_factory=dict)
+
+
+def write_recording_header(file: BinaryIO, dtype: np.dtype, metadata: dict) -> int:
+    """
+    Writes the header of a recording whose records have [dtype]. The records are written after it.
+
+    Args:
+        file: the recording file, positioned at its start
+        dtype: structured dtype of one record
+        metadata: JSON serializable description of the recording, e.g. the sample period, app inputs and seed
+    Returns:
+        the offset of the payload
+    """
+    description = dict(metadata)
+    description["fields"] = [[name, dtype.fields[name][0].str] for name in dtype.names]
+    description["record_size"] = dtype.itemsize
+    encoded = json.dumps(description).encode("utf-8")
+    padded_length = -(-(HEADER_PREFIX.size + len(encoded)) // PAYLOAD_ALIGNMENT) * PAYLOAD_ALIGNMENT
+    encoded += b" " * (padded_length - HEADER_PREFIX.size - len(encoded))
+    file.write(HEADER_PREFIX.pack(RECORDING_MAGIC, RECORDING_FORMAT_VERSION, 0, len(encoded)))
+    file.write(encoded)
+    return padded_length
+
+
+def read_recording_header(file_name: str) -> RecordingHeader:
+    """
+    Raises:
+        ValueError: if the recording was written with a newer format version than this reader supports
+    """
+    with open(file_name, "rb") as file:
+        prefix = file.read(HEADER_PREFIX.size)
+        if len(prefix) < HEADER_PREFIX.size or not prefix.startswith(RECORDING_MAGIC):
+            return RecordingHeader(0, LEGACY_RECORD_DTYPE, 0)
+        _, version, _, metadata_length = HEADER_PREFIX.unpack(prefix)
+        if version > RECORDING_FORMAT_VERSION:
+            raise ValueError(
+                f"Recording {file_name} has format version {version}, newer than {RECORDING_FORMAT_VERSION}"
+            )
+        metadata = json.loads(file.read(metadata_length).decode("utf-8"))
+    dtype = np.dtype([(name, type_str) for name, type_str in metadata["fields"]])
+    return RecordingHeader(version, dtype, HEADER_PREFIX.size + metadata_length, metadata)
+
+
+def open_recording(file_name: str) -> tuple[RecordingHeader, np.ndarray]:
+    """
+    Memory maps the records of a recording without copying them. A partly written last record is left out.
+
+    Returns:
+        the header of the recording and its records
+    """
+    header = read_recording_header(file_name)
+    number_of_records = (os.path.getsize(file_name) - header.payload_offset) // header.dtype.itemsize
+    if number_of_records <= 0:
+        return header, np.empty(0, dtype=header.dtype)
+    records = np.memmap(
+        file_name, dtype=header.dtype, mode="r", offset=header.payload_offset, shape=(number_of_records,)
+    )
+    return header, records
@@ -0,0 +1,80 @@
+from typing import BinaryIO
+import numpy as np
+
+
+class RecordingRingBuffer:
+    """
+    Preallocated ring buffer of structured NumPy records with a single producer that appends records and a single
+    consumer that writes them to a file in blocks. The producer only advances the write count and the consumer only
+    advances the flushed count, so neither takes a lock.
+
+    A full buffer drops the new record instead of blocking the producer or overwriting records that were not
+    flushed yet, and counts it as an overflow.
+    """
+
+    def __init__(self, dtype: np.dtype, capacity: int) -> None:
+        """
+        Args:
+            dtype: structured dtype of one record
+            capacity: number of records the buffer holds, which bounds its memory
+        """
+        if capacity < 1:
+            raise ValueError("The capacity of a recording ring buffer must be at least 1")
+        self.__records = np.zeros(capacity, dtype=dtype)
+        self.__capacity = capacity
+        self.__write_count = 0
+        self.__flush_count = 0
+        self.__overflow_count = 0
+
+    @property
+    def capacity(self) -> int:
+        return self.__capacity
+
+    @property
+    def overflow_count(self) -> int:
+        """
+        Number of records dropped because the buffer was full.
+        """
+        return self.__overflow_count
+
+    @property
+    def pending_count(self) -> int:
+        """
+        Number of records appended but not flushed yet.
+        """
+        return self.__write_count - self.__flush_count
+
+    def append(self, record: tuple) -> bool:
+        """
+        Args:
+            record: the values of the record's fields, in dtype order
+        Returns:
+            False if the buffer was full and the record was dropped
+        """
+        if self.__write_count - self.__flush_count >= self.__capacity:
+            self.__overflow_count += 1
+            return False
+        self.__records[self.__write_count % self.__capacity] = record
+        self.__write_count += 1
+        return True
+
+    def flush(self, file: BinaryIO) -> int:
+        """
+        Writes all pending records to [file] with at most two writes, one per contiguous part of the ring.
+
+        Returns:
+            the number of records written
+        """
+        write_count = self.__write_count
+        count = write_count - self.__flush_count
+        if count == 0:
+            return 0
+        start = self.__flush_count % self.__capacity
+        end = start + count
+        if end <= self.__capacity:
+            file.write(self.__records[start:end].data)
+        else:
+            file.write(self.__records[start:].data)
+            file.write(self.__records[: end - self.__capacity].data)
+        self.__flush_count = write_count
+        return count
@@ -0,0 +1,103 @@
+from threading import Condition
+from typing import Any, NamedTuple
+
+
+class Setpoint(NamedTuple):
+    """
+    A setpoint taken from a SetpointMailbox.
+    """
+
+    value: Any
+    """The posted value."""
+    sequence: int
+    """Sequence number of the setpoint. Every posted setpoint gets the next sequence number."""
+    coalesced: int
+    """Number of setpoints that were posted after the previously taken one and overwritten before being taken."""
+
+
+class SetpointMailbox:
+    """
+    A mailbox holding the latest setpoint posted to a control thread. Posting never blocks and the latest value
+    wins: setpoints posted faster than the control thread takes them are coalesced, so the control thread wakes
+    up exactly once per change it has not seen yet and always acts on the newest setpoint.
+    """
+
+    def __init__(self, value: Any = None) -> None:
+        """
+        Args:
+            value: the value returned by the value property until the first setpoint is posted
+        """
+        self.__condition = Condition()
+        self.__value = value
+        self.__sequence = 0
+        self.__taken_sequence = 0
+        self.__coalesced_count = 0
+        self.__closed = False
+
+    @property
+    def value(self) -> Any:
+        """
+        The latest posted setpoint, whether it has been taken or not.
+        """
+        return self.__value
+
+    @property
+    def sequence(self) -> int:
+        return self.__sequence
+
+    @property
+    def coalesced_count(self) -> int:
+        """
+        Total number of setpoints that were overwritten before being taken.
+        """
+        return self.__coalesced_count
+
+    def post(self, value: Any) -> int:
+        """
+        Args:
+            value: the new setpoint
+        Returns:
+            the sequence number of the setpoint
+        """
+        with self.__condition:
+            self.__value = value
+            self.__sequence += 1
+            self.__condition.notify()
+            return self.__sequence
+
+    def take(self, timeout_sec: float = None) -> Setpoint | None:
+        """
+        Waits until a setpoint that has not been taken yet is posted.
+
+        Args:
+            timeout_sec: the longest time to wait, or None to wait until a setpoint is posted or the mailbox is closed
+        Returns:
+            the latest setpoint, or None if the wait timed out or the mailbox was closed
+        """
+        with self.__condition:
+            self.__condition.wait_for(lambda: self.__sequence > self.__taken_sequence or self.__closed, timeout_sec)
+            return self.__take()
+
+    def poll(self) -> Setpoint | None:
+        """
+        Returns:
+            the latest setpoint if it has not been taken yet, otherwise None. Never blocks.
+        """
+        with self.__condition:
+            return self.__take()
+
+    def close(self) -> None:
+        """
+        Wakes up the control thread waiting in take, which returns None from now on.
+        """
+        with self.__condition:
+            self.__closed = True
+            self.__condition.notify_all()
+
+    def __take(self) -> Setpoint | None:
+        if self.__closed or self.__sequence == self.__taken_sequence:
+            return None
+        coalesced = self.__sequence - self.__taken_sequence - 1
+        self.__coalesced_count += coalesced
+        self.__taken_sequence = self.__sequence
+        return Setpoint(self.__value, self.__sequence, coalesced)
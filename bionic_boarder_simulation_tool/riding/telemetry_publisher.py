@@ -0,0 +1,235 @@
+from enum import Enum
+import socket
+import struct
+from threading import Event, Thread
+from typing import Callable
+import numpy as np
+from bionic_boarder_simulation_tool.logger import Logger
+from .eboard_kinematic_state import EboardKinematicState
+from .eboard_state_recorder import TickSampler
+from .recording_format import LEGACY_RECORD_DTYPE, RECORD_DTYPE
+from .recording_ring_buffer import RecordingRingBuffer
+
+TELEMETRY_MAGIC = b"BBSTLM\x00\x00"
+"""
+Version 2 packs the samples with RECORD_DTYPE, which appends the simulated_time field. Version 1 packed them with
+LEGACY_RECORD_DTYPE and stamped them with the simulated time.
+"""
+TELEMETRY_FORMAT_VERSION = 2
+
+"""
+Magic, format version, board index, number of samples, reserved and sequence number of the board's datagrams.
+The samples follow the header, packed with RECORD_DTYPE like the samples of a recording.
+"""
+TELEMETRY_HEADER = struct.Struct("<8sHHHHI")
+
+"""
+Largest datagram sent, which fits an unfragmented UDP datagram on an Ethernet link.
+"""
+MAX_DATAGRAM_SIZE = 1472
+
+"""
+Default number of samples buffered per board between two sends.
+"""
+DEFAULT_TELEMETRY_BUFFER_CAPACITY = 4096
+
+"""
+Default period at which the buffered samples are sent.
+"""
+DEFAULT_PUBLISH_PERIOD_MS = 20
+
+
+class TelemetryTransport(Enum):
+    """
+    Enum class for the datagram sockets the telemetry is published on.
+    """
+
+    UDP = "udp"
+    UNIX = "unix"
+
+
+def telemetry_socket_address(transport: TelemetryTransport, address: str) -> tuple[int, object]:
+    """
+    Args:
+        transport: the kind of datagram socket
+        address: "host:port" for UDP and the socket path for UNIX
+    Returns:
+        the address family and the socket address
+    """
+    if transport == TelemetryTransport.UDP:
+        host, _, port = address.rpartition(":")
+        return socket.AF_INET, (host if host else "127.0.0.1", int(port))
+    if transport == TelemetryTransport.UNIX:
+        return socket.AF_UNIX, address
+    raise ValueError(f"There is no telemetry transport matching {transport}")
+
+
+def decode_telemetry_datagram(datagram: bytes) -> tuple[int, int, np.ndarray]:
+    """
+    Returns:
+        the board index, the sequence number and the samples of a telemetry datagram
+    Raises:
+        ValueError: if the datagram is not a telemetry datagram of a supported format version
+    """
+    if len(datagram) < TELEMETRY_HEADER.size:
+        raise ValueError("The datagram is shorter than a telemetry header")
+    magic, version, board_index, count, _, sequence = TELEMETRY_HEADER.unpack_from(datagram)
+    if magic != TELEMETRY_MAGIC or version > TELEMETRY_FORMAT_VERSION:
+        raise ValueError("The datagram is not a telemetry datagram of a supported format version")
+    if version >= 2:
+        samples = np.frombuffer(datagram, dtype=RECORD_DTYPE, count=count, offset=TELEMETRY_HEADER.size)
+        return board_index, sequence, samples
+    legacy = np.frombuffer(datagram, dtype=LEGACY_RECORD_DTYPE, count=count, offset=TELEMETRY_HEADER.size)
+    samples = np.empty(count, dtype=RECORD_DTYPE)
+    for name in LEGACY_RECORD_DTYPE.names:
+        samples[name] = legacy[name]
+    # The timestamps of version 1 samples are simulated times, their mission elapsed time is unknown
+    samples["simulated_time"] = legacy["timestamp"]
+    samples["timestamp"] = np.nan
+    return board_index, sequence, samples
+
+
+class _DatagramSender:
+    """
+    File-like sink a RecordingRingBuffer flushes the samples of one board into. The samples are split into
+    datagrams that are sent without blocking; a datagram the socket cannot take right away is dropped and counted.
+    """
+
+    SAMPLES_PER_DATAGRAM = (MAX_DATAGRAM_SIZE - TELEMETRY_HEADER.size) // RECORD_DTYPE.itemsize
+
+    def __init__(self, sock: socket.socket, address: object, board_index: int) -> None:
+        self.__socket = sock
+        self.__address = address
+        self.__board_index = board_index
+        self.__sequence = 0
+        self.__sent_datagrams = 0
+        self.__dropped_datagrams = 0
+
+    @property
+    def sent_datagrams(self) -> int:
+        return self.__sent_datagrams
+
+    @property
+    def dropped_datagrams(self) -> int:
+        return self.__dropped_datagrams
+
+    def write(self, data) -> int:
+        data = memoryview(data).cast("B")
+        datagram_payload_size = self.SAMPLES_PER_DATAGRAM * RECORD_DTYPE.itemsize
+        for start in range(0, len(data), datagram_payload_size):
+            payload = data[start : start + datagram_payload_size]
+            header = TELEMETRY_HEADER.pack(
+                TELEMETRY_MAGIC,
+                TELEMETRY_FORMAT_VERSION,
+                self.__board_index,
+                len(payload) // RECORD_DTYPE.itemsize,
+                0,
+                self.__sequence,
+            )
+            # The sequence number advances for dropped datagrams too, so a client can count the lost ones.
+            self.__sequence = (self.__sequence + 1) & 0xFFFFFFFF
+            try:
+                self.__socket.sendto(header + payload, self.__address)
+                self.__sent_datagrams += 1
+            except OSError:
+                # The socket buffer is full or nobody is listening on the Unix socket.
+                self.__dropped_datagrams += 1
+        return len(data)
+
+
+class TelemetryPublisher:
+    """
+    Publishes the committed kinematic state of one or more boards as compact binary datagrams on a local UDP or
+    Unix datagram socket while the simulation runs.
+
+    The tick listener of every board, added to the board's kinematic loop, only appends every [decimation]th tick
+    to a preallocated ring buffer of the board, so publishing never blocks the kinematic loops. A sender thread
+    drains the ring buffers every publish period into non-blocking datagrams. Samples are dropped when a ring
+    buffer is full and datagrams are dropped when the socket cannot take them; both are counted.
+    """
+
+    def __init__(
+        self,
+        transport: TelemetryTransport,
+        address: str,
+        number_of_boards: int = 1,
+        decimation: int = 1,
+        buffer_capacity: int = DEFAULT_TELEMETRY_BUFFER_CAPACITY,
+        publish_period_ms: int = DEFAULT_PUBLISH_PERIOD_MS,
+    ) -> None:
+        """
+        Args:
+            transport: the kind of datagram socket
+            address: "host:port" the UDP datagrams are sent to, or the path of the Unix datagram socket
+            number_of_boards: number of boards published, each with its own tick listener
+            decimation: publish every [decimation]th kinematic loop tick
+            buffer_capacity: number of samples buffered per board
+            publish_period_ms: period at which the buffered samples are sent
+        """
+        if decimation < 1:
+            raise ValueError("The telemetry decimation factor must be at least 1")
+        family, self.__address = telemetry_socket_address(transport, address)
+        self.__socket = socket.socket(family, socket.SOCK_DGRAM)
+        self.__socket.setblocking(False)
+        self.__decimation = decimation
+        self.__buffers = [RecordingRingBuffer(RECORD_DTYPE, buffer_capacity) for _ in range(number_of_boards)]
+        self.__senders = [_DatagramSender(self.__socket, self.__address, i) for i in range(number_of_boards)]
+        self.__publish_period_s = publish_period_ms / 1000.0
+        self.__publishing = False
+        self.__stop_event = Event()
+        self.__sender_thread = Thread(target=self.__send_loop, daemon=True)
+
+    @property
+    def sent_datagrams(self) -> int:
+        return sum(sender.sent_datagrams for sender in self.__senders)
+
+    @property
+    def dropped_datagrams(self) -> int:
+        """
+        Number of datagrams dropped because the socket could not take them.
+        """
+        return sum(sender.dropped_datagrams for sender in self.__senders)
+
+    @property
+    def overflow_counts(self) -> list[int]:
+        """
+        Number of samples of every board dropped because its buffer was full.
+        """
+        return [buffer.overflow_count for buffer in self.__buffers]
+
+    def tick_listener(self, board_index: int = 0) -> Callable[[EboardKinematicState, float, float], None]:
+        """
+        Returns:
+            the tick listener that publishes board [board_index], to be added to the board's kinematic loop. It only
+            publishes while the publisher is running.
+        """
+        return TickSampler(self.__buffers[board_index], self.__decimation, False, lambda: self.__publishing)
+
+    def start(self) -> None:
+        self.__publishing = True
+        self.__sender_thread.start()
+        Logger().logger.info("Telemetry publisher is running", address=str(self.__address))
+
+    def stop(self) -> None:
+        """
+        Stops publishing, sends the samples still buffered and closes the socket.
+        """
+        self.__publishing = False
+        self.__stop_event.set()
+        if self.__sender_thread.is_alive():
+            self.__sender_thread.join()
+        self.__socket.close()
+        Logger().logger.info(
+            "Telemetry publisher stopped",
+            sent_datagrams=self.sent_datagrams,
+            dropped_datagrams=self.dropped_datagrams,
+            dropped_samples=sum(self.overflow_counts),
+        )
+
+    def __send_loop(self) -> None:
+        while True:
+            stopped = self.__stop_event.wait(self.__publish_period_s)
+            for buffer, sender in zip(self.__buffers, self.__senders):
+                buffer.flush(sender)
+            if stopped:
+                break
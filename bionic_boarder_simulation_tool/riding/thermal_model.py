@@ -0,0 +1,147 @@
+import math
+from typing import NamedTuple
+from .eboard_kinematic_state import EboardKinematicState
+
+
+class ThermalRC:
+    """
+    First-order thermal RC model of a part heated by power losses and cooled to the ambient temperature through
+    a thermal resistance. The temperature is updated with the exact solution for a constant power over the update
+    period, so it stays stable at any update period.
+    """
+
+    def __init__(self, thermal_resistance_K_per_W: float, time_constant_sec: float, ambient_temp_C: float) -> None:
+        """
+        Args:
+            thermal_resistance_K_per_W: temperature rise above ambient per watt of losses at steady state
+            time_constant_sec: thermal resistance times thermal capacitance of the part
+            ambient_temp_C: ambient temperature, which is also the starting temperature of the part
+        """
+        self.__thermal_resistance_K_per_W = thermal_resistance_K_per_W
+        self.__time_constant_sec = time_constant_sec
+        self.__ambient_temp_C = ambient_temp_C
+        self.__temp_C = ambient_temp_C
+        self.__decay_period_sec = None
+        self.__decay = 1.0
+
+    @property
+    def temp_C(self) -> float:
+        return self.__temp_C
+
+    def step(self, power_W: float, period_sec: float) -> float:
+        """
+        Advances the temperature by [period_sec] with a constant [power_W] of losses.
+
+        Returns:
+            the temperature at the end of the period
+        """
+        if period_sec != self.__decay_period_sec:
+            # The update period is normally fixed, so the exponential is only evaluated when it changes.
+            self.__decay_period_sec = period_sec
+            self.__decay = math.exp(-period_sec / self.__time_constant_sec)
+        steady_state_temp_C = self.__ambient_temp_C + power_W * self.__thermal_resistance_K_per_W
+        self.__temp_C = steady_state_temp_C + (self.__temp_C - steady_state_temp_C) * self.__decay
+        return self.__temp_C
+
+
+class ThermalSnapshot(NamedTuple):
+    temp_fet_C: float
+    temp_motor_C: float
+    current_limit_scale: float
+    """Factor in [0, 1] the motor current is limited by, 1.0 unless the FET or motor is derating."""
+
+
+class ThermalModel:
+    """
+    FET and motor temperatures driven by the I^2 R losses of the motor current. As a tick listener of the kinematic
+    loop it only accumulates the squared motor current every tick, and updates the thermal RC models at the coarser
+    update period. Like the battery, it publishes an immutable snapshot for readers on other threads.
+
+    When current derating is enabled, the motor current is scaled down linearly from the start to the end
+    temperature of the FET or the motor, like the temperature limits of the VESC motor configuration.
+    """
+
+    def __init__(
+        self,
+        fet: ThermalRC,
+        motor: ThermalRC,
+        fet_resistance_ohm: float,
+        motor_resistance_ohm: float,
+        update_period_sec: float = 0.1,
+        current_derating: bool = False,
+        derating_start_temp_C: float = 85.0,
+        derating_end_temp_C: float = 100.0,
+    ) -> None:
+        """
+        Args:
+            fet: thermal RC model of the FETs
+            motor: thermal RC model of the motor
+            fet_resistance_ohm: resistance the motor current sees in the FETs
+            motor_resistance_ohm: resistance of the motor windings
+            update_period_sec: simulated time between updates of the thermal RC models
+            current_derating: True to limit the motor current when the FET or motor is hot
+            derating_start_temp_C: temperature the motor current starts to be limited at
+            derating_end_temp_C: temperature the motor current is limited to zero at
+        """
+        self.__fet = fet
+        self.__motor = motor
+        self.__fet_resistance_ohm = fet_resistance_ohm
+        self.__motor_resistance_ohm = motor_resistance_ohm
+        self.__update_period_sec = update_period_sec
+        self.__current_derating = current_derating
+        self.__derating_start_temp_C = derating_start_temp_C
+        self.__derating_end_temp_C = derating_end_temp_C
+        self.__current_squared_time = 0.0
+        self.__elapsed_sec = 0.0
+        self.__snapshot = ThermalSnapshot(fet.temp_C, motor.temp_C, self.__current_limit_scale())
+
+    @classmethod
+    def default(cls, current_derating: bool = False) -> "ThermalModel":
+        """
+        Returns:
+            a thermal model with estimates for a VESC controller and an eboard hub or belt motor at 25 C ambient
+        """
+        return cls(
+            fet=ThermalRC(thermal_resistance_K_per_W=2.0, time_constant_sec=30.0, ambient_temp_C=25.0),
+            motor=ThermalRC(thermal_resistance_K_per_W=0.5, time_constant_sec=300.0, ambient_temp_C=25.0),
+            fet_resistance_ohm=0.002,
+            motor_resistance_ohm=0.05,
+            current_derating=current_derating,
+        )
+
+    @property
+    def snapshot(self) -> ThermalSnapshot:
+        return self.__snapshot
+
+    @property
+    def current_derating(self) -> bool:
+        return self.__current_derating
+
+    def on_kinematic_tick(self, eks: EboardKinematicState, sim_time_sec: float, time_step_sec: float) -> None:
+        """
+        Tick listener of the kinematic loop that heats the FET and motor with the motor current.
+        """
+        self.__current_squared_time += eks.motor_current * eks.motor_current * time_step_sec
+        self.__elapsed_sec += time_step_sec
+        # The tolerance keeps rounding in the sum of the time steps from delaying the update by a tick.
+        if self.__elapsed_sec >= self.__update_period_sec - 1e-9:
+            self.update(self.__current_squared_time / self.__elapsed_sec, self.__elapsed_sec)
+            self.__current_squared_time = 0.0
+            self.__elapsed_sec = 0.0
+
+    def update(self, mean_current_squared_A2: float, period_sec: float) -> None:
+        """
+        Advances the temperatures by [period_sec] with the mean squared motor current over the period.
+        """
+        self.__fet.step(mean_current_squared_A2 * self.__fet_resistance_ohm, period_sec)
+        self.__motor.step(mean_current_squared_A2 * self.__motor_resistance_ohm, period_sec)
+        self.__snapshot = ThermalSnapshot(self.__fet.temp_C, self.__motor.temp_C, self.__current_limit_scale())
+
+    def __current_limit_scale(self) -> float:
+        if not self.__current_derating:
+            return 1.0
+        hottest_temp_C = max(self.__fet.temp_C, self.__motor.temp_C)
+        scale = (self.__derating_end_temp_C - hottest_temp_C) / (
+            self.__derating_end_temp_C - self.__derating_start_temp_C
+        )
+        return min(1.0, max(0.0, scale))
@@ -0,0 +1,126 @@
+from multiprocess import shared_memory
+import numpy as np
+from bionic_boarder_simulation_tool.riding.eboard_kinematic_state import EboardKinematicState
+
+"""
+Field names of EboardKinematicState in the order they are stored in a shared kinematic state row.
+"""
+KINEMATIC_STATE_FIELDS = (
+    "velocity",
+    "acceleration_x",
+    "acceleration_y",
+    "acceleration_z",
+    "pitch",
+    "roll",
+    "yaw",
+    "erpm",
+    "input_current",
+    "motor_current",
+)
+
+"""
+One row per board. The sequence number implements a seqlock: it is odd while the publishing process is
+writing the row, so readers can detect and retry a torn row without taking a lock across processes.
+"""
+SHARED_KINEMATIC_STATE_DTYPE = np.dtype(
+    [("sequence", "<u8"), ("timestamp", "<f8")]
+    + [(name, "<i8" if name == "erpm" else "<f8") for name in KINEMATIC_STATE_FIELDS]
+)
+
+
+class SharedKinematicStateBlock:
+    """
+    A structured array with the kinematic state of every board in a fleet, held in shared memory.
+
+    Each board is published by exactly one worker process. The supervisor process reads the whole block
+    directly, so no pickling or pipes are involved in moving kinematic state between processes.
+    """
+
+    MAX_SNAPSHOT_ATTEMPTS = 100
+
+    def __init__(self, number_of_boards: int, name: str = None) -> None:
+        """
+        Args:
+            number_of_boards: number of rows in the block
+            name: name of an existing block to attach to. A new block is created when no name is given.
+        """
+        size = number_of_boards * SHARED_KINEMATIC_STATE_DTYPE.itemsize
+        self.__owner = name is None
+        self.__shm = shared_memory.SharedMemory(name=name, create=self.__owner, size=size)
+        self.__states = np.ndarray((number_of_boards,), dtype=SHARED_KINEMATIC_STATE_DTYPE, buffer=self.__shm.buf)
+        if self.__owner:
+            self.__states[:] = 0
+
+    @property
+    def name(self) -> str:
+        return self.__shm.name
+
+    @property
+    def number_of_boards(self) -> int:
+        return len(self.__states)
+
+    def publish(self, index: int, eks: EboardKinematicState, timestamp: float) -> None:
+        """
+        Writes the kinematic state of a board into its row. The caller must hold the board's kinematic state lock.
+
+        Args:
+            index: row of the board
+            eks: kinematic state of the board
+            timestamp: time of the kinematic state in seconds
+        """
+        sequence = int(self.__states["sequence"][index]) + 1
+        self.__states["sequence"][index] = sequence
+        self.__states[index] = (
+            sequence,
+            timestamp,
+            eks.velocity,
+            eks.acceleration_x,
+            eks.acceleration_y,
+            eks.acceleration_z,
+            eks.pitch,
+            eks.roll,
+            eks.yaw,
+            eks.erpm,
+            eks.input_current,
+            eks.motor_current,
+        )
+        self.__states["sequence"][index] = sequence + 1
+
+    def snapshot(self) -> np.ndarray:
+        """
+        Returns:
+            a copy of the block in which no row was being written while it was copied
+        Raises:
+            RuntimeError: if a consistent copy could not be taken
+        """
+        sequence_before = self.__states["sequence"].copy()
+        states = self.__states.copy()
+        sequence_after = self.__states["sequence"].copy()
+        torn = (sequence_before != sequence_after) | ((sequence_before & 1) == 1)
+        for _ in range(self.MAX_SNAPSHOT_ATTEMPTS):
+            if not torn.any():
+                return states
+            # Only the rows that were being written while they were copied are copied again.
+            rows = np.flatnonzero(torn)
+            sequence_before = self.__states["sequence"][rows]
+            states[rows] = self.__states[rows]
+            sequence_after = self.__states["sequence"][rows]
+            torn[rows] = (sequence_before != sequence_after) | ((sequence_before & 1) == 1)
+        raise RuntimeError("A consistent snapshot of the shared kinematic state could not be taken.")
+
+    @staticmethod
+    def copy_to_kinematic_state(row: np.void, eks: EboardKinematicState) -> None:
+        """
+        Copies one row of a snapshot into a kinematic state. The caller must hold the kinematic state lock.
+        """
+        for field_name in KINEMATIC_STATE_FIELDS:
+            setattr(eks, field_name, row[field_name].item())
+
+    def close(self) -> None:
+        """
+        Detaches from the block. The process that created the block also removes it.
+        """
+        del self.__states
+        self.__shm.close()
+        if self.__owner:
+            self.__shm.unlink()
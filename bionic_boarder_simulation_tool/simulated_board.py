@@ -0,0 +1,208 @@
+from datetime import datetime
+from threading import Lock, Thread
+from bionic_boarder_simulation_tool.app_input_arguments import AppInputArguments
+from bionic_boarder_simulation_tool.logger import Logger
+from bionic_boarder_simulation_tool.riding.battery_discharge_model import BatteryDischargeModel
+from bionic_boarder_simulation_tool.riding.eboard import EBoard
+from bionic_boarder_simulation_tool.riding.eboard_kinematic_state import EboardKinematicState
+from bionic_boarder_simulation_tool.riding.efficiency_map import EfficiencyMap
+from bionic_boarder_simulation_tool.riding.frictional_deceleration_model import FrictionalDecelerationModel
+from bionic_boarder_simulation_tool.riding.kinematic_loop import KinematicLoop
+from bionic_boarder_simulation_tool.riding.motor_controller import ErpmRampMode, MotorController
+from bionic_boarder_simulation_tool.riding.push_model import PushModel
+from bionic_boarder_simulation_tool.riding.thermal_model import ThermalModel
+from bionic_boarder_simulation_tool.vesc import fw_6_00, fw_6_02, fw_6_05
+from bionic_boarder_simulation_tool.vesc.command_message_processor import CommandMessageProcessor
+from bionic_boarder_simulation_tool.vesc.fw import FirmwareVersion
+from bionic_boarder_simulation_tool.vesc.heartbeat_watchdog import HeartbeatTimeoutPolicy
+from bionic_boarder_simulation_tool.vesc.traffic_capture import CapturingTransport
+from bionic_boarder_simulation_tool.vesc.transport import Transport, TransportKind, create_transport
+
+COMMAND_MESSAGE_PROCESSORS = {
+    FirmwareVersion.FW_6_00: fw_6_00.FW6_00CMP,
+    FirmwareVersion.FW_6_02: fw_6_02.FW6_02CMP,
+    FirmwareVersion.FW_6_05: fw_6_05.FW6_05CMP,
+}
+
+
+class SimulatedBoard:
+    """
+    This class builds every model of one simulated electric land paddle board, together with the VESC command
+    message processor that the Bionic Boarder app talks to, from the board's app input arguments.
+    """
+
+    def __init__(
+        self,
+        app_input_arguments: AppInputArguments,
+        name: str = "",
+        capture_traffic: bool = False,
+        transport: Transport = None,
+        exit_on_heartbeat_expiry: bool = True,
+    ) -> None:
+        """
+        Args:
+            app_input_arguments: app input arguments of the board
+            name: name of the board, used in log messages and recording file names
+            capture_traffic: if True, every frame received and sent by the VESC command message processor is
+            written to a traffic capture file
+            transport: transport to use instead of the one selected in the app input arguments
+            exit_on_heartbeat_expiry: if True, a missed heartbeat terminates the process. Set to False when the
+            process simulates other boards as well, so a missed heartbeat only stops this board.
+        Raises:
+            ValueError: if there is no VESC firmware version or transport matching the app input arguments
+        """
+        a = app_input_arguments
+        self.__name = name
+        self.__app_input_arguments = a
+        self.__eboard = EBoard(
+            a.total_weight_with_rider_kg,
+            a.frontal_area_of_rider_m2,
+            a.wheel_diameter_m,
+            a.battery_max_capacity_Ah,
+            a.battery_max_voltage,
+            a.gear_ratio,
+            a.motor_kv,
+            a.motor_max_torque,
+            a.motor_max_amps,
+            a.motor_max_power_watts,
+            a.motor_pole_pairs,
+        )
+        self.__eks = EboardKinematicState()
+        self.__eks_lock = Lock()
+        self.__battery_discharge_model = BatteryDischargeModel(
+            a.battery_max_voltage, a.battery_max_capacity_Ah, a.battery_internal_resistance_ohm
+        )
+        self.__frictional_deceleration_model = FrictionalDecelerationModel(a.mu_rolling, a.c_drag, self.__eboard)
+        self.__push_model = PushModel(self.__eboard)
+        self.__motor_controller = MotorController(
+            self.__eboard, self.__eks, self.__eks_lock, self.__frictional_deceleration_model
+        )
+        self.__motor_controller.control_time_step_ms = int(a.control_time_step_sec * 1000)
+        self.__motor_controller.erpm_ramp_mode = ErpmRampMode(a.erpm_ramp_mode)
+        if a.efficiency_map_csv:
+            self.__motor_controller.efficiency_map = EfficiencyMap.from_csv(a.efficiency_map_csv)
+        self.__kinematic_loop = KinematicLoop(
+            self.__eboard, self.__eks, self.__eks_lock, self.__frictional_deceleration_model, self.__push_model
+        )
+        self.__kinematic_loop.fixed_time_step_ms = a.fixed_time_step_ms
+        self.__kinematic_loop.theta_slope_period_sec = a.theta_slope_period_sec
+        self.__kinematic_loop.slope_range_bound_deg = a.slope_range_bound_deg
+        self.__kinematic_loop.push_period_sec = a.push_period_sec
+        self.__kinematic_loop.motor_controller = self.__motor_controller
+        if a.random_seed is not None:
+            self.__kinematic_loop.random_seed = a.random_seed
+        self.__kinematic_loop.add_tick_listener(self.__battery_discharge_model.on_kinematic_tick)
+        self.__thermal_model = ThermalModel.default(a.thermal_current_derating)
+        self.__motor_controller.thermal_model = self.__thermal_model
+        self.__motor_controller.battery_discharge_model = self.__battery_discharge_model
+        self.__kinematic_loop.add_tick_listener(self.__thermal_model.on_kinematic_tick)
+        try:
+            cmp_class = COMMAND_MESSAGE_PROCESSORS[FirmwareVersion(a.vesc_fw)]
+        except ValueError:
+            raise ValueError(f"There is no VESC firmware version matching {a.vesc_fw}")
+        if transport is None:
+            transport = create_transport(TransportKind(a.transport), a.com_port, a.baud_rate)
+        self.__transport = transport
+        if capture_traffic:
+            timestamp = datetime.now().strftime("%Y-%m-%d_%H-%M-%S")
+            suffix = f"_{name}" if name else ""
+            self.__transport = CapturingTransport(self.__transport, f"sim_traffic_capture_{timestamp}{suffix}.bin")
+        self.__cmp = cmp_class(
+            self.__transport,
+            a.baud_rate,
+            256,
+            self.__eboard,
+            self.__eks,
+            self.__eks_lock,
+            self.__battery_discharge_model,
+            self.__motor_controller,
+        )
+        self.__cmp.set_heartbeat_timeout_sec(a.heartbeat_timeout_sec)
+        self.__cmp.set_heartbeat_timeout_policy(
+            HeartbeatTimeoutPolicy(a.heartbeat_timeout_policy), a.heartbeat_grace_sec
+        )
+        if not exit_on_heartbeat_expiry:
+            self.__cmp.set_heartbeat_expired_callback(self.__on_heartbeat_expired)
+        self.__cmp_thread = Thread(target=self.__cmp.handle_command, daemon=True)
+        self.__kinematic_loop_thread = Thread(target=self.__kinematic_loop.loop, daemon=True)
+        Logger().logger.info(
+            "Simulated board is ready",
+            board=name,
+            vesc_fw=a.vesc_fw,
+            transport=a.transport,
+            address=self.__transport.address,
+        )
+
+    def start(self, run_kinematic_loop: bool = True) -> None:
+        """
+        Starts the VESC command message processor and motor controller threads.
+
+        Args:
+            run_kinematic_loop: if True, the kinematic loop runs on a thread of its own. Set to False when the
+            kinematic loop is stepped by a KinematicScheduler instead.
+        """
+        self.__cmp_thread.start()
+        self.__motor_controller.start()
+        if run_kinematic_loop:
+            self.__kinematic_loop_thread.start()
+
+    def stop(self) -> None:
+        self.__kinematic_loop.stop()
+        self.__motor_controller.stop()
+        if isinstance(self.__transport, CapturingTransport):
+            self.__transport.stop_capture()
+
+    def __on_heartbeat_expired(self) -> None:
+        Logger().logger.error(
+            "Board has stopped because its heartbeat command was not received in time", board=self.__name
+        )
+        self.stop()
+
+    def join(self) -> None:
+        if self.__kinematic_loop_thread.is_alive():
+            self.__kinematic_loop_thread.join()
+        self.__cmp_thread.join()
+
+    @property
+    def name(self) -> str:
+        return self.__name
+
+    @property
+    def app_input_arguments(self) -> AppInputArguments:
+        return self.__app_input_arguments
+
+    @property
+    def eboard(self) -> EBoard:
+        return self.__eboard
+
+    @property
+    def eks(self) -> EboardKinematicState:
+        return self.__eks
+
+    @property
+    def eks_lock(self) -> Lock:
+        return self.__eks_lock
+
+    @property
+    def battery_discharge_model(self) -> BatteryDischargeModel:
+        return self.__battery_discharge_model
+
+    @property
+    def thermal_model(self) -> ThermalModel:
+        return self.__thermal_model
+
+    @property
+    def motor_controller(self) -> MotorController:
+        return self.__motor_controller
+
+    @property
+    def kinematic_loop(self) -> KinematicLoop:
+        return self.__kinematic_loop
+
+    @property
+    def transport(self) -> Transport:
+        return self.__transport
+
+    @property
+    def vesc_command_message_processor(self) -> CommandMessageProcessor:
+        return self.__cmp
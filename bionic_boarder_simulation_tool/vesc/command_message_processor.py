@@ -1,9 +1,24 @@
 from abc import ABC, abstractmethod
-from threading import Timer
-import serial
+from dataclasses import dataclass
 from bionic_boarder_simulation_tool.logger import Logger
-import os
 from functools import reduce
+from threading import Lock
+import time
+from typing import Callable
+from .heartbeat_watchdog import HeartbeatTimeoutPolicy, HeartbeatWatchdog
+from .transport import SerialTransport, Transport
+from .values_message import ValuesMessage
+
+
+@dataclass
+class CommandCounters:
+    """
+    Counters of one command handled by a command message processor.
+    """
+
+    calls: int = 0
+    errors: int = 0
+    handler_time_sec: float = 0.0
 
 
 class CommandMessageProcessor(ABC):
@@ -11,7 +26,8 @@ class CommandMessageProcessor(ABC):
     Abstract base class for processing command messages.
 
     This class defines an interface for handling various command messages received
-    through a serial port. It includes both state change commands and message request commands.
+    through a transport, which is a serial port by default. It includes both state change commands and message
+    request commands.
     """
 
     # State change commands
@@ -23,6 +39,11 @@ class CommandMessageProcessor(ABC):
     FIRMWARE = "FIRMWARE"
     MOTOR_CONTROLLER_CONFIGURATION = "MOTOR CONTROLLER CONFIGURATION"
     BIONIC_BOARDER = "BIONIC BOARDER"
+    VALUES = "VALUES"
+    VALUES_SELECTIVE = "VALUES SELECTIVE"
+
+    # Pause before reading again from a transport whose read failed
+    READ_ERROR_PAUSE_SEC = 0.1
 
     # CRC-16-CCITT (XMODEM) table for VESC
     CRC16_TABLE = (
@@ -71,18 +92,22 @@ class CommandMessageProcessor(ABC):
         Initializes a new instance of CommandMessageProcessor.
 
         Args:
-            com_port (str): The COM port to use for serial communication.
+            com_port (str | Transport): The COM port to use for serial communication, or the transport to
+                communicate over.
+            baud_rate (int): The baud rate of the COM port. Ignored when a transport is provided.
             command_byte_size (int): The size of the command byte.
         """
-        self.serial = serial.Serial(
-            port=com_port,
-            baudrate=baud_rate,
-            parity=serial.PARITY_NONE,
-            stopbits=serial.STOPBITS_ONE,
-            bytesize=serial.EIGHTBITS,
-        )
+        self.transport = com_port if isinstance(com_port, Transport) else SerialTransport(com_port, baud_rate)
         self.__command_byte_size = command_byte_size
-        self.__heartbeat_timer = None
+        self.__heartbeat_watchdog = None
+        self.__heartbeat_timeout_policy = HeartbeatTimeoutPolicy.EXIT
+        self.__heartbeat_grace_sec = 0.0
+        self.__heartbeat_on_expired = None
+        self.__dispatch_table = None
+        self.__command_counters: dict[str, CommandCounters] = {}
+        self.__counters_lock = Lock()
+        self.__unknown_command_count = 0
+        self.__receive_error_count = 0
 
     def set_heartbeat_timeout_sec(self, timeout_sec):
         """
@@ -93,29 +118,139 @@ class CommandMessageProcessor(ABC):
         """
         self.__heartbeat_timeout_sec = timeout_sec
 
+    def set_heartbeat_timeout_policy(self, policy: HeartbeatTimeoutPolicy, grace_sec: float = 0.0):
+        """
+        Set what happens when the heartbeat command is not received in time.
+
+        Args:
+            policy (HeartbeatTimeoutPolicy): Exit immediately, or coast the motor and exit after the grace period.
+            grace_sec (float): The grace period in seconds used by the coast then exit policy.
+        """
+        self.__heartbeat_timeout_policy = policy
+        self.__heartbeat_grace_sec = grace_sec
+
+    def set_heartbeat_expired_callback(self, on_expired: Callable[[], None]):
+        """
+        Set what the heartbeat watchdog does when it expires, instead of terminating the process.
+
+        Args:
+            on_expired (Callable[[], None]): Called on the watchdog thread when the heartbeat watchdog expires.
+        """
+        self.__heartbeat_on_expired = on_expired
+
+    @property
+    def heartbeat_watchdog(self) -> HeartbeatWatchdog:
+        """
+        The heartbeat watchdog, or None if no heartbeat command has been received yet.
+        """
+        return self.__heartbeat_watchdog
+
+    def command_counters(self) -> dict[str, CommandCounters]:
+        """
+        Returns:
+            a copy of the counters of every command, by command name
+        """
+        with self.__counters_lock:
+            return {
+                name: CommandCounters(c.calls, c.errors, c.handler_time_sec)
+                for name, c in self.__command_counters.items()
+            }
+
+    @property
+    def unknown_command_count(self) -> int:
+        """
+        The number of received commands whose command ID is not handled by this command message processor.
+        """
+        return self.__unknown_command_count
+
+    @property
+    def receive_error_count(self) -> int:
+        """
+        The number of commands that could not be read from the transport or whose command ID could not be decoded.
+        """
+        return self.__receive_error_count
+
+    def _command_handlers(self) -> dict[str, tuple[Callable, bool]]:
+        """
+        Returns a dictionary mapping command names to their handler and whether the handler takes the command bytes.
+
+        Subclasses that handle more commands extend this dictionary.
+        """
+        return {
+            CommandMessageProcessor.BIONIC_BOARDER: (self._publish_bionic_boarder, False),
+            CommandMessageProcessor.FIRMWARE: (self._publish_firmware, False),
+            CommandMessageProcessor.MOTOR_CONTROLLER_CONFIGURATION: (
+                self._publish_motor_controller_configuration,
+                False,
+            ),
+            CommandMessageProcessor.CURRENT: (self._update_current, True),
+            CommandMessageProcessor.RPM: (self._update_rpm, True),
+            CommandMessageProcessor.HEARTBEAT: (self.heartbeat, False),
+            CommandMessageProcessor.VALUES: (self._publish_values, False),
+            CommandMessageProcessor.VALUES_SELECTIVE: (self._publish_values_selective, True),
+        }
+
+    def __build_dispatch_table(self) -> list:
+        """
+        Builds the table indexed by command ID. Each entry holds the command name, its handler, whether the handler
+        takes the command bytes and the counters of the command, or None for a command ID that is not handled.
+        """
+        handlers = self._command_handlers()
+        table = [None] * 256
+        for command_id, command_name in self._command_id_name.items():
+            handler, takes_command = handlers[command_name]
+            counters = self.__command_counters.setdefault(command_name, CommandCounters())
+            table[command_id] = (command_name, handler, takes_command, counters)
+        return table
+
     def handle_command(self):
         """
-        Continuously reads command bytes from the serial port and handles them using
+        Continuously reads command bytes from the transport and handles them using
         the appropriate method based on the command type.
+
+        The dispatch table is built once, when this method starts, because subclasses set up their command IDs
+        after the base class constructor has run.
         """
-        command_bytes = None
-        handler = {
-            CommandMessageProcessor.BIONIC_BOARDER: lambda: self._publish_bionic_boarder(),
-            CommandMessageProcessor.FIRMWARE: lambda: self._publish_firmware(),
-            CommandMessageProcessor.MOTOR_CONTROLLER_CONFIGURATION: lambda: self._publish_motor_controller_configuration(),
-            CommandMessageProcessor.CURRENT: lambda: self._update_current(command_bytes),
-            CommandMessageProcessor.RPM: lambda: self._update_rpm(command_bytes),
-            CommandMessageProcessor.HEARTBEAT: lambda: self.heartbeat(),
-        }
+        if self.__dispatch_table is None:
+            self.__dispatch_table = self.__build_dispatch_table()
+        dispatch_table = self.__dispatch_table
+        counters_lock = self.__counters_lock
         while True:
-            command_bytes = self.serial.read(self.__command_byte_size)
             try:
-                command_id = self._get_command_id(command_bytes)
-                command_name = self._command_id_name[command_id]
-                Logger().logger.info("VESC received command", command=command_name)
-                handler[command_name]()
+                command_bytes = self.transport.read(self.__command_byte_size)
+            except OSError as e:
+                # The transport may recover, e.g. a serial device that is plugged back in, so the error is only
+                # counted and the next read is tried after a short pause instead of spinning on a failed transport.
+                self.__receive_error_count += 1
+                Logger().logger.error("Command could not be read from the transport", error=e)
+                time.sleep(CommandMessageProcessor.READ_ERROR_PAUSE_SEC)
+                continue
+            try:
+                entry = dispatch_table[self._get_command_id(command_bytes)]
             except Exception as e:
+                self.__receive_error_count += 1
+                Logger().logger.error("Command ID could not be decoded", error=e)
+                continue
+            if entry is None:
+                self.__unknown_command_count += 1
+                continue
+            # The received commands are counted per command instead of logged, which would slow down every command
+            command_name, handler, takes_command, counters = entry
+            st = time.perf_counter()
+            failed = False
+            try:
+                if takes_command:
+                    handler(command_bytes)
+                else:
+                    handler()
+            except Exception as e:
+                failed = True
                 Logger().logger.error("Received command was not processed correctly", error=e, command=command_name)
+            handler_time_sec = time.perf_counter() - st
+            with counters_lock:
+                counters.calls += 1
+                counters.errors += failed
+                counters.handler_time_sec += handler_time_sec
 
     @abstractmethod
     def _get_command_id(self, command: bytes) -> int:
@@ -151,6 +286,44 @@ class CommandMessageProcessor(ABC):
         """
         pass
 
+    @abstractmethod
+    def _values_message(self) -> ValuesMessage:
+        """
+        Abstract method to get the 'values' message filled with the current state of the board.
+        """
+        pass
+
+    def _publish_values(self):
+        """
+        Publish the 'values' message with all fields.
+        """
+        msg_data = self._values_message().buffer
+        self.transport.write(self.__short_packet(msg_data))
+
+    def _publish_values_selective(self, command):
+        """
+        Publish the 'values' message with the fields selected by the mask in the command.
+
+        Args:
+            command: The command containing the 32-bit mask of the requested fields.
+        """
+        mask = int.from_bytes(command[3:7], byteorder="big")
+        msg_data = self._values_message().selective_buffer(mask)
+        self.transport.write(self.__short_packet(msg_data))
+        Logger().logger.info("Publishing selected values", mask=hex(mask), CMP=self.__class__.__name__)
+
+    def __short_packet(self, payload: bytes) -> bytes:
+        """
+        Frames a payload of less than 256 bytes as a VESC packet: start byte, length, payload, CRC and end byte.
+        """
+        return (
+            int.to_bytes(2)
+            + int.to_bytes(len(payload))
+            + payload
+            + int.to_bytes(self.crc16(payload), 2)
+            + int.to_bytes(3)
+        )
+
     @abstractmethod
     def _update_current(self, command):
         """
@@ -171,30 +344,24 @@ class CommandMessageProcessor(ABC):
         """
         pass
 
+    def _coast_motor(self):
+        """
+        Set the motor current to zero so that the board coasts. Used by the heartbeat watchdog's grace policy.
+        """
+        pass
+
     def heartbeat(self):
         """
         Handle the 'heartbeat' command.
+
+        The first heartbeat starts the watchdog; every heartbeat after that only records its arrival time.
         """
-        if self.__heartbeat_timer == None:
-            self.__heartbeat_timer = Timer(
-                self.__heartbeat_timeout_sec,
-                self.__heartbeat_not_receieved,
-            )
-            self.__heartbeat_timer.start()
-        else:
-            self.__heartbeat_timer.cancel()
-            self.__heartbeat_timer = Timer(
+        if self.__heartbeat_watchdog is None:
+            self.__heartbeat_watchdog = HeartbeatWatchdog(
                 self.__heartbeat_timeout_sec,
-                self.__heartbeat_not_receieved,
+                self.__heartbeat_timeout_policy,
+                self.__heartbeat_grace_sec,
+                self._coast_motor,
+                self.__heartbeat_on_expired,
             )
-            self.__heartbeat_timer.start()
-
-    def __heartbeat_not_receieved(self):
-        """
-        If heartbeat message has not been received within the specified timeout, terminate the simulation.
-        """
-        Logger().logger.error(
-            "Heartbeat command was not received in time. Simulation has terminated.",
-            command=CommandMessageProcessor.HEARTBEAT,
-        )
-        os._exit(1)
+        self.__heartbeat_watchdog.kick()
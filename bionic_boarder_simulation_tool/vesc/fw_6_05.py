@@ -1,10 +1,12 @@
 from enum import IntEnum
 from . import fw
 from .command_message_processor import CommandMessageProcessor
+from .values_message import ValuesMessage, build_values_message
 import struct
 from threading import Lock
 import math
 from bionic_boarder_simulation_tool.riding.battery_discharge_model import BatteryDischargeModel
+from bionic_boarder_simulation_tool.riding.thermal_model import ThermalSnapshot
 from bionic_boarder_simulation_tool.riding.eboard_kinematic_state import EboardKinematicState
 from bionic_boarder_simulation_tool.riding.motor_controller import MotorController
 from bionic_boarder_simulation_tool.logger import Logger
@@ -957,6 +959,8 @@ class FW6_05CMP(CommandMessageProcessor):
             0: CommandMessageProcessor.FIRMWARE,
             14: CommandMessageProcessor.MOTOR_CONTROLLER_CONFIGURATION,
             152: CommandMessageProcessor.BIONIC_BOARDER,
+            4: CommandMessageProcessor.VALUES,
+            50: CommandMessageProcessor.VALUES_SELECTIVE,
         }
         self.__packet_header = lambda l: int.to_bytes(2) + int.to_bytes(l)
         # crc value + end_byte
@@ -982,14 +986,27 @@ class FW6_05CMP(CommandMessageProcessor):
 
     def _publish_bionic_boarder(self):
         bb = BionicBoarderMessage()
+        if self.__mc is not None:
+            self.__mc.refresh_kinematic_state()
         with self.__eks_lock:
             bb.motor_current = self.__eks.motor_current
             bb.rpm = self.__eks.erpm
             bb.acc[0] = self.__eks.acceleration_x
             bb.rpy[1] = self.__eks.pitch * (math.pi / 180.0)
+        thermal = self.__thermal_snapshot()
+        if thermal is not None:
+            bb.temp_fet = thermal.temp_fet_C
+            bb.temp_motor = thermal.temp_motor_C
+        if self.__bdm is not None:
+            battery = self.__bdm.snapshot
+            bb.input_voltage = battery.terminal_voltage
+            bb.amp_hours = battery.amp_hours
+            bb.amp_hours_charged = battery.amp_hours_charged
+            bb.watt_hours = battery.watt_hours
+            bb.watt_hours_charged = battery.watt_hours_charged
         msg_data = bb.buffer
         packet = self.__packet_header(len(msg_data)) + msg_data + self.__packet_footer(msg_data)
-        self.serial.write(packet)
+        self.transport.write(packet)
         Logger().logger.info(
             "Publishing Bionic Boarder message",
             motor_current=bb.motor_current,
@@ -1003,7 +1020,7 @@ class FW6_05CMP(CommandMessageProcessor):
     def _publish_firmware(self):
         fw = FirmwareMessage()
         packet = self.__packet_header(len(fw.buffer)) + fw.buffer + self.__packet_footer(fw.buffer)
-        self.serial.write(packet)
+        self.transport.write(packet)
 
     def _publish_motor_controller_configuration(self):
         mcc = MotorControllerConfigurationMessage()
@@ -1016,7 +1033,7 @@ class FW6_05CMP(CommandMessageProcessor):
         mcc.l_max_vin = self.__eboard.battery_max_voltage
         msg_data = mcc.buffer
         packet = int.to_bytes(3) + int.to_bytes(len(msg_data), 2) + msg_data + self.__packet_footer(msg_data)
-        self.serial.write(packet)
+        self.transport.write(packet)
         Logger().logger.info(
             "Publishing motor controller configuration message",
             wheel_diameter_m=mcc.si_wheel_diameter,
@@ -1029,22 +1046,26 @@ class FW6_05CMP(CommandMessageProcessor):
             CMP=self.__class__.__name__,
         )
 
+    def __thermal_snapshot(self) -> ThermalSnapshot | None:
+        if self.__mc is None or self.__mc.thermal_model is None:
+            return None
+        return self.__mc.thermal_model.snapshot
+
+    def _values_message(self) -> ValuesMessage:
+        return build_values_message(self.__eboard, self.__eks, self.__eks_lock, self.__bdm, self.__mc)
+
+    def _coast_motor(self):
+        self.__mc.target_current = 0.0
+        Logger().logger.info("Motor is coasting with zero current", CMP=self.__class__.__name__)
+
     def _update_current(self, command):
-        motor_current_commanded = int.from_bytes(command[3:7], byteorder="big") / 1000.0
+        motor_current_commanded = int.from_bytes(command[3:7], byteorder="big", signed=True) / 1000.0
         self.__mc.target_current = motor_current_commanded
-        try:
-            self.__mc.current_sem.release()
-        except ValueError as e:
-            pass
         Logger().logger.info(
             "Processing set current command", motor_current=motor_current_commanded, CMP=self.__class__.__name__
         )
 
     def _update_rpm(self, command):
-        erpm_commanded = int.from_bytes(command[3:7], byteorder="big")
+        erpm_commanded = int.from_bytes(command[3:7], byteorder="big", signed=True)
         self.__mc.target_erpm = erpm_commanded
-        try:
-            self.__mc.erpm_sem.release()
-        except ValueError as e:
-            pass
         Logger().logger.info("Processing set ERPM command", erpm=erpm_commanded, CMP=self.__class__.__name__)
@@ -0,0 +1,157 @@
+from enum import Enum
+from threading import Event, Thread
+from typing import Callable, Optional
+import os
+import time
+from bionic_boarder_simulation_tool.logger import Logger
+
+
+class HeartbeatTimeoutPolicy(Enum):
+    """
+    Enum class for what the simulation does when the heartbeat command is not received in time.
+    """
+
+    EXIT = "exit"
+    COAST_THEN_EXIT = "coast_then_exit"
+
+
+class HeartbeatWatchdog:
+    """
+    Supervises the heartbeat command with a single long-lived thread.
+
+    Receiving a heartbeat only records the monotonic timestamp of its arrival, so no thread is created or
+    destroyed per heartbeat. The watchdog thread sleeps until the current deadline and re-checks it, which
+    means a heartbeat that arrives in the meantime simply pushes the deadline further out.
+
+    On a missed deadline the watchdog applies its timeout policy:
+        EXIT: the expiry callback is invoked immediately.
+        COAST_THEN_EXIT: the coast callback is invoked so the motor current goes to zero, then the expiry
+        callback is invoked if no heartbeat is received within the grace period.
+
+    A heartbeat that arrives after more than NEAR_MISS_FRACTION of the timeout has elapsed is counted as a
+    near miss.
+    """
+
+    NEAR_MISS_FRACTION = 0.8
+
+    def __init__(
+        self,
+        timeout_sec: float,
+        policy: HeartbeatTimeoutPolicy = HeartbeatTimeoutPolicy.EXIT,
+        grace_sec: float = 0.0,
+        coast: Optional[Callable[[], None]] = None,
+        on_expired: Optional[Callable[[], None]] = None,
+    ) -> None:
+        """
+        Args:
+            timeout_sec: maximum time in seconds allowed between two heartbeat commands
+            policy: what to do when the heartbeat deadline is missed
+            grace_sec: time in seconds to wait after coasting before expiring, used by COAST_THEN_EXIT
+            coast: callback that sets the motor current to zero, used by COAST_THEN_EXIT
+            on_expired: callback invoked when the watchdog expires. Terminates the process by default.
+        """
+        self.__timeout_sec = timeout_sec
+        self.__policy = policy
+        self.__grace_sec = grace_sec
+        self.__coast = coast
+        self.__on_expired = on_expired if on_expired is not None else lambda: os._exit(1)
+        self.__last_heartbeat_sec: Optional[float] = None
+        self.__heartbeat_count = 0
+        self.__near_miss_count = 0
+        self.__coast_count = 0
+        self.__expired = False
+        self.__stop_event = Event()
+        self.__thread = Thread(target=self.__watch, daemon=True)
+
+    @property
+    def timeout_sec(self) -> float:
+        return self.__timeout_sec
+
+    @property
+    def policy(self) -> HeartbeatTimeoutPolicy:
+        return self.__policy
+
+    @property
+    def heartbeat_count(self) -> int:
+        return self.__heartbeat_count
+
+    @property
+    def near_miss_count(self) -> int:
+        return self.__near_miss_count
+
+    @property
+    def coast_count(self) -> int:
+        return self.__coast_count
+
+    @property
+    def expired(self) -> bool:
+        return self.__expired
+
+    @property
+    def running(self) -> bool:
+        return self.__thread.is_alive()
+
+    def kick(self) -> None:
+        """
+        Record the arrival of a heartbeat. The watchdog thread is started on the first heartbeat.
+        """
+        now = time.monotonic()
+        last = self.__last_heartbeat_sec
+        if last is not None and (now - last) > self.NEAR_MISS_FRACTION * self.__timeout_sec:
+            self.__near_miss_count += 1
+            Logger().logger.info(
+                "Heartbeat near miss",
+                interval_sec=now - last,
+                timeout_sec=self.__timeout_sec,
+                near_miss_count=self.__near_miss_count,
+            )
+        self.__last_heartbeat_sec = now
+        self.__heartbeat_count += 1
+        if last is None:
+            self.__thread.start()
+
+    def stop(self) -> None:
+        self.__stop_event.set()
+
+    def __watch(self) -> None:
+        while not self.__stop_event.is_set():
+            deadline = self.__last_heartbeat_sec + self.__timeout_sec
+            remaining = deadline - time.monotonic()
+            if remaining > 0:
+                self.__stop_event.wait(remaining)
+                continue
+            if self.__policy == HeartbeatTimeoutPolicy.COAST_THEN_EXIT and self.__grace_period_recovered(deadline):
+                continue
+            self.__expire()
+            return
+
+    def __grace_period_recovered(self, deadline: float) -> bool:
+        """
+        Coast the motor and wait out the grace period.
+
+        Returns:
+            True if a heartbeat was received during the grace period, False otherwise.
+        """
+        missed_heartbeat_sec = self.__last_heartbeat_sec
+        self.__coast_count += 1
+        Logger().logger.error(
+            "Heartbeat command was not received in time. Motor is coasting for the grace period.",
+            grace_sec=self.__grace_sec,
+        )
+        if self.__coast is not None:
+            self.__coast()
+        grace_deadline = deadline + self.__grace_sec
+        while not self.__stop_event.is_set():
+            if self.__last_heartbeat_sec != missed_heartbeat_sec:
+                Logger().logger.info("Heartbeat command resumed within the grace period.")
+                return True
+            remaining = grace_deadline - time.monotonic()
+            if remaining <= 0:
+                return False
+            self.__stop_event.wait(min(remaining, self.__timeout_sec / 10))
+        return True
+
+    def __expire(self) -> None:
+        self.__expired = True
+        Logger().logger.error("Heartbeat command was not received in time. Heartbeat watchdog has expired.")
+        self.__on_expired()
@@ -0,0 +1,133 @@
+from dataclasses import dataclass
+from enum import IntEnum
+import mmap
+import struct
+from threading import Lock
+import time
+from typing import Iterator
+from bionic_boarder_simulation_tool.vesc.transport import Transport
+
+"""
+A capture file starts with a header holding the magic bytes and the format version. It is followed by one
+record per frame: a record header holding the monotonic timestamp in seconds, the direction and the length of
+the frame, followed by the frame bytes.
+"""
+CAPTURE_MAGIC = b"BBSCAP"
+CAPTURE_VERSION = 1
+CAPTURE_HEADER = struct.Struct("<6sH")
+CAPTURE_RECORD_HEADER = struct.Struct("<dBI")
+
+
+class TrafficDirection(IntEnum):
+    """
+    Direction of a captured frame, seen from the command message processor.
+    """
+
+    INBOUND = 0
+    OUTBOUND = 1
+
+
+@dataclass(frozen=True)
+class CapturedFrame:
+    timestamp_sec: float
+    direction: TrafficDirection
+    data: memoryview
+
+
+class CapturingTransport(Transport):
+    """
+    Transport that writes every inbound and outbound frame of another transport to a capture file, so the exact
+    command stream an app sent to the command message processor can be replayed later. The capture file is
+    buffered, so capturing a frame does not cost a system call; the buffered frames are written when the capture
+    is stopped.
+    """
+
+    def __init__(self, transport: Transport, capture_file_name: str) -> None:
+        """
+        Args:
+            transport: the transport to capture the traffic of
+            capture_file_name: name of the capture file to create
+        """
+        self.__transport = transport
+        self.__capture_file_name = capture_file_name
+        self.__capture_file = open(capture_file_name, "wb")
+        self.__capture_file.write(CAPTURE_HEADER.pack(CAPTURE_MAGIC, CAPTURE_VERSION))
+        self.__lock = Lock()
+        self.__frame_count = 0
+
+    @property
+    def transport(self) -> Transport:
+        return self.__transport
+
+    @property
+    def capture_file_name(self) -> str:
+        return self.__capture_file_name
+
+    @property
+    def frame_count(self) -> int:
+        return self.__frame_count
+
+    @property
+    def address(self) -> str:
+        return self.__transport.address
+
+    def read(self, size: int) -> bytes:
+        data = self.__transport.read(size)
+        self.__capture(TrafficDirection.INBOUND, data)
+        return data
+
+    def write(self, data: bytes) -> int:
+        self.__capture(TrafficDirection.OUTBOUND, data)
+        return self.__transport.write(data)
+
+    def stop_capture(self) -> None:
+        """
+        Closes the capture file, which writes the frames still buffered. The traffic of the transport is not
+        captured from now on, but the transport stays open.
+        """
+        with self.__lock:
+            self.__capture_file.close()
+
+    def close(self) -> None:
+        self.stop_capture()
+        self.__transport.close()
+
+    def __capture(self, direction: TrafficDirection, data: bytes) -> None:
+        record_header = CAPTURE_RECORD_HEADER.pack(time.monotonic(), direction, len(data))
+        with self.__lock:
+            if self.__capture_file.closed:
+                return
+            self.__capture_file.write(record_header)
+            self.__capture_file.write(data)
+            self.__frame_count += 1
+
+
+def read_capture(capture_file_name: str) -> Iterator[CapturedFrame]:
+    """
+    Reads the frames of a capture file through a memory map, without copying the frame bytes.
+
+    Args:
+        capture_file_name: name of the capture file
+    Returns:
+        the captured frames in the order they were captured. The data of a frame is only valid while iterating.
+    Raises:
+        ValueError: if the file is not a capture file of a supported version
+    """
+    with open(capture_file_name, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as capture:
+        magic, version = CAPTURE_HEADER.unpack_from(capture, 0)
+        if magic != CAPTURE_MAGIC or version != CAPTURE_VERSION:
+            raise ValueError(f"{capture_file_name} is not a version {CAPTURE_VERSION} traffic capture file")
+        view = memoryview(capture)
+        offset = CAPTURE_HEADER.size
+        try:
+            # A record cut short by the simulation terminating is ignored.
+            while offset + CAPTURE_RECORD_HEADER.size <= len(capture):
+                timestamp_sec, direction, length = CAPTURE_RECORD_HEADER.unpack_from(capture, offset)
+                offset += CAPTURE_RECORD_HEADER.size
+                if offset + length > len(capture):
+                    break
+                with view[offset : offset + length] as data:
+                    yield CapturedFrame(timestamp_sec, TrafficDirection(direction), data)
+                offset += length
+        finally:
+            view.release()
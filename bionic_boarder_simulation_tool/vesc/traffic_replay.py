@@ -0,0 +1,141 @@
+import argparse
+import json
+import os
+import socket
+from threading import Thread
+import time
+import tty
+from bionic_boarder_simulation_tool.vesc.traffic_capture import TrafficDirection, read_capture
+
+
+class ReplayTarget:
+    """
+    Client side of the transport the simulation listens on. The target is either "tcp:<host>:<port>",
+    "unix:<path>" or the path of a PTY slave device.
+    """
+
+    def __init__(self, target: str) -> None:
+        kind, _, address = target.partition(":")
+        self.__socket = None
+        self.__fd = None
+        if kind == "tcp":
+            host, _, port = address.rpartition(":")
+            self.__socket = socket.create_connection((host, int(port)))
+            self.__socket.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        elif kind == "unix":
+            self.__socket = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+            self.__socket.connect(address)
+        else:
+            self.__fd = os.open(target, os.O_RDWR | os.O_NOCTTY)
+            tty.setraw(self.__fd)
+
+    def write(self, data: memoryview) -> None:
+        if self.__socket is not None:
+            self.__socket.sendall(data)
+            return
+        while data:
+            data = data[os.write(self.__fd, data) :]
+
+    def read(self) -> bytes:
+        """
+        Returns:
+            the bytes available, or no bytes once the target is closed
+        """
+        try:
+            if self.__socket is not None:
+                return self.__socket.recv(4096)
+            return os.read(self.__fd, 4096)
+        except OSError:
+            return b""
+
+    def close(self) -> None:
+        if self.__socket is not None:
+            self.__socket.shutdown(socket.SHUT_RDWR)
+            self.__socket.close()
+        else:
+            os.close(self.__fd)
+
+
+class TrafficReplayClient:
+    """
+    Re-sends the inbound frames of a traffic capture to a running simulation, either with the captured timing
+    scaled by a speed factor or as fast as possible. The responses of the simulation are drained and counted on
+    a separate thread.
+    """
+
+    def __init__(self, capture_file_name: str, speed: float = 1.0) -> None:
+        """
+        Args:
+            capture_file_name: name of the capture file
+            speed: factor the captured timing is sped up by, where 0 replays at maximum speed
+        """
+        self.__capture_file_name = capture_file_name
+        self.__speed = speed
+        self.__bytes_received = 0
+
+    def replay(self, target: ReplayTarget, response_timeout_sec: float = 0.5) -> dict:
+        """
+        Args:
+            target: the target to replay the capture against
+            response_timeout_sec: time to wait for the last responses after the last frame was sent
+        Returns:
+            the replay statistics
+        """
+        self.__bytes_received = 0
+        reader_thread = Thread(target=self.__drain, args=(target,), daemon=True)
+        reader_thread.start()
+        frames_sent = 0
+        bytes_sent = 0
+        first_timestamp_sec = None
+        start = time.perf_counter()
+        for frame in read_capture(self.__capture_file_name):
+            if frame.direction != TrafficDirection.INBOUND:
+                continue
+            if first_timestamp_sec is None:
+                first_timestamp_sec = frame.timestamp_sec
+            if self.__speed > 0:
+                due = start + (frame.timestamp_sec - first_timestamp_sec) / self.__speed
+                delay = due - time.perf_counter()
+                if delay > 0:
+                    time.sleep(delay)
+            target.write(frame.data)
+            frames_sent += 1
+            bytes_sent += len(frame.data)
+        elapsed_sec = time.perf_counter() - start
+        reader_thread.join(timeout=response_timeout_sec)
+        return {
+            "capture_file_name": self.__capture_file_name,
+            "speed": self.__speed,
+            "frames_sent": frames_sent,
+            "bytes_sent": bytes_sent,
+            "bytes_received": self.__bytes_received,
+            "elapsed_sec": elapsed_sec,
+            "frames_per_sec": frames_sent / elapsed_sec if elapsed_sec > 0 else 0.0,
+        }
+
+    def __drain(self, target: ReplayTarget) -> None:
+        while True:
+            data = target.read()
+            if not data:
+                return
+            self.__bytes_received += len(data)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Replay a VESC traffic capture against a running simulation.")
+    parser.add_argument("capture_file", type=str, help="This is the path to the traffic capture file.")
+    parser.add_argument(
+        "target", type=str, help='This is "tcp:<host>:<port>", "unix:<path>" or the path of a PTY slave device.'
+    )
+    parser.add_argument(
+        "--speed",
+        type=str,
+        default="1",
+        help='Factor the captured timing is sped up by, or "max" to replay as fast as possible.',
+    )
+    args = parser.parse_args()
+    speed = 0.0 if args.speed == "max" else float(args.speed)
+    target = ReplayTarget(args.target)
+    stats = TrafficReplayClient(args.capture_file, speed).replay(target)
+    target.close()
+    print(json.dumps(stats, indent=2))
@@ -0,0 +1,262 @@
+from abc import ABC, abstractmethod
+from enum import Enum
+import os
+import socket
+import tty
+import serial
+from bionic_boarder_simulation_tool.logger import Logger
+
+
+class TransportKind(Enum):
+    """
+    Enum class for the byte stream transports the command message processor can communicate over.
+    """
+
+    SERIAL = "serial"
+    PTY = "pty"
+    TCP = "tcp"
+    UNIX = "unix"
+
+
+class Transport(ABC):
+    """
+    Abstract base class for the byte stream that carries VESC command and response packets.
+
+    The read method blocks until exactly the requested number of bytes has been received, which matches
+    the behavior of a serial port opened without a read timeout.
+    """
+
+    @abstractmethod
+    def read(self, size: int) -> bytes:
+        """
+        Args:
+            size: number of bytes to read
+        Returns:
+            exactly [size] bytes
+        """
+        pass
+
+    @abstractmethod
+    def write(self, data: bytes) -> int:
+        """
+        Args:
+            data: bytes to write
+        Returns:
+            number of bytes written
+        """
+        pass
+
+    @abstractmethod
+    def close(self) -> None:
+        pass
+
+    @property
+    @abstractmethod
+    def address(self) -> str:
+        """
+        The address a client uses to connect to this transport.
+        """
+        pass
+
+
+class SerialTransport(Transport):
+    """
+    Transport over a physical or BLE-bridged serial device.
+    """
+
+    def __init__(self, com_port: str, baud_rate: int) -> None:
+        self.__com_port = com_port
+        self.__serial = serial.Serial(
+            port=com_port,
+            baudrate=baud_rate,
+            parity=serial.PARITY_NONE,
+            stopbits=serial.STOPBITS_ONE,
+            bytesize=serial.EIGHTBITS,
+        )
+
+    def read(self, size: int) -> bytes:
+        return self.__serial.read(size)
+
+    def write(self, data: bytes) -> int:
+        return self.__serial.write(data)
+
+    def close(self) -> None:
+        self.__serial.close()
+
+    @property
+    def address(self) -> str:
+        return self.__com_port
+
+
+class PtyTransport(Transport):
+    """
+    Transport over a pseudo-terminal pair. The simulation owns the master side; a client opens the slave
+    device exactly like it would open a serial port.
+
+    The slave side is also held open by the simulation so that reads on the master block while no client is
+    attached, instead of failing.
+    """
+
+    def __init__(self, link_path: str = "") -> None:
+        """
+        Args:
+            link_path: optional path of a symbolic link to create to the slave device, so clients can use a
+            stable device name across runs.
+        """
+        self.__master_fd, self.__slave_fd = os.openpty()
+        tty.setraw(self.__slave_fd)
+        self.__slave_name = os.ttyname(self.__slave_fd)
+        self.__link_path = link_path
+        if link_path:
+            if os.path.islink(link_path):
+                os.unlink(link_path)
+            os.symlink(self.__slave_name, link_path)
+        Logger().logger.info("PTY transport is open", slave_device=self.__slave_name, link_path=link_path)
+
+    def read(self, size: int) -> bytes:
+        data = bytearray()
+        while len(data) < size:
+            data += os.read(self.__master_fd, size - len(data))
+        return bytes(data)
+
+    def write(self, data: bytes) -> int:
+        view = memoryview(data)
+        while view:
+            view = view[os.write(self.__master_fd, view) :]
+        return len(data)
+
+    def close(self) -> None:
+        os.close(self.__master_fd)
+        os.close(self.__slave_fd)
+        if self.__link_path and os.path.islink(self.__link_path):
+            os.unlink(self.__link_path)
+
+    @property
+    def slave_name(self) -> str:
+        return self.__slave_name
+
+    @property
+    def address(self) -> str:
+        return self.__link_path if self.__link_path else self.__slave_name
+
+
+class _StreamSocketTransport(Transport):
+    """
+    Transport over a listening stream socket. One client is served at a time; when the client disconnects,
+    the next read waits for a new client to connect.
+    """
+
+    def __init__(self, listener: socket.socket) -> None:
+        self.__listener = listener
+        self.__listener.listen(1)
+        self.__connection = None
+
+    def __accept(self) -> socket.socket:
+        if self.__connection is None:
+            self.__connection, peer = self.__listener.accept()
+            Logger().logger.info("Transport client connected", address=self.address, peer=str(peer))
+        return self.__connection
+
+    def __disconnect(self) -> None:
+        if self.__connection is not None:
+            self.__connection.close()
+            self.__connection = None
+            Logger().logger.info("Transport client disconnected", address=self.address)
+
+    def read(self, size: int) -> bytes:
+        data = bytearray()
+        while len(data) < size:
+            connection = self.__accept()
+            try:
+                chunk = connection.recv(size - len(data))
+            except OSError:
+                # A reset connection is a disconnect like an orderly shutdown
+                chunk = b""
+            if not chunk:
+                self.__disconnect()
+                data.clear()
+                continue
+            data += chunk
+        return bytes(data)
+
+    def write(self, data: bytes) -> int:
+        try:
+            self.__accept().sendall(data)
+        except OSError:
+            self.__disconnect()
+            return 0
+        return len(data)
+
+    def close(self) -> None:
+        self.__disconnect()
+        self.__listener.close()
+
+    @property
+    def listener(self) -> socket.socket:
+        return self.__listener
+
+
+class TcpTransport(_StreamSocketTransport):
+    """
+    Transport over a TCP socket, listening on localhost by default.
+    """
+
+    def __init__(self, host: str = "127.0.0.1", port: int = 0) -> None:
+        listener = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        listener.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        listener.bind((host, port))
+        super().__init__(listener)
+        Logger().logger.info("TCP transport is listening", address=self.address)
+
+    @property
+    def address(self) -> str:
+        host, port = self.listener.getsockname()
+        return f"{host}:{port}"
+
+
+class UnixSocketTransport(_StreamSocketTransport):
+    """
+    Transport over a Unix domain stream socket.
+    """
+
+    def __init__(self, path: str) -> None:
+        if os.path.exists(path):
+            os.unlink(path)
+        listener = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        listener.bind(path)
+        self.__path = path
+        super().__init__(listener)
+        Logger().logger.info("Unix socket transport is listening", address=path)
+
+    def close(self) -> None:
+        super().close()
+        if os.path.exists(self.__path):
+            os.unlink(self.__path)
+
+    @property
+    def address(self) -> str:
+        return self.__path
+
+
+def create_transport(kind: TransportKind, com_port: str, baud_rate: int) -> Transport:
+    """
+    Create the transport selected in the app inputs.
+
+    Args:
+        kind: the kind of transport
+        com_port: serial device for SERIAL, optional slave device link path for PTY, "host:port" for TCP and
+        socket path for UNIX
+        baud_rate: baud rate of the serial device, ignored by the other transports
+    Returns:
+        the transport
+    """
+    if kind == TransportKind.SERIAL:
+        return SerialTransport(com_port, baud_rate)
+    if kind == TransportKind.PTY:
+        return PtyTransport(com_port)
+    if kind == TransportKind.TCP:
+        host, _, port = com_port.rpartition(":")
+        return TcpTransport(host if host else "127.0.0.1", int(port))
+    if kind == TransportKind.UNIX:
+        return UnixSocketTransport(com_port)
+    raise ValueError(f"There is no transport matching {kind}")
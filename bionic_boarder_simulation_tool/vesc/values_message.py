@@ -0,0 +1,149 @@
+import struct
+from threading import Lock
+from bionic_boarder_simulation_tool.riding.battery_discharge_model import BatteryDischargeModel
+from bionic_boarder_simulation_tool.riding.eboard import EBoard
+from bionic_boarder_simulation_tool.riding.eboard_kinematic_state import EboardKinematicState
+from bionic_boarder_simulation_tool.riding.motor_controller import MotorController
+
+
+class ValuesMessage:
+    """
+    See the "COMM_GET_VALUES" and "COMM_GET_VALUES_SELECTIVE" message specification in [commands.c](https://github.com/vedderb/bldc/blob/6.00/comm/commands.c)
+    in VESC bldc-6.00 source code on Github. The message is the same in every supported VESC firmware version.
+
+    Every field is selected by one bit of a 32-bit mask. COMM_GET_VALUES sends all fields; COMM_GET_VALUES_SELECTIVE
+    sends the mask it was requested with, followed by the selected fields only.
+    """
+
+    ID = 4
+    SELECTIVE_ID = 50
+    ALL_FIELDS_MASK = 0xFFFFFFFF
+
+    # (mask bit, field name, struct format, scale) in the order the fields are serialized
+    FIELDS = (
+        (0, "temp_fet", "h", 1e1),
+        (1, "temp_motor", "h", 1e1),
+        (2, "avg_motor_current", "i", 1e2),
+        (3, "avg_input_current", "i", 1e2),
+        (4, "avg_id", "i", 1e2),
+        (5, "avg_iq", "i", 1e2),
+        (6, "duty_cycle", "h", 1e3),
+        (7, "rpm", "i", 1e0),
+        (8, "input_voltage", "h", 1e1),
+        (9, "amp_hours", "i", 1e4),
+        (10, "amp_hours_charged", "i", 1e4),
+        (11, "watt_hours", "i", 1e4),
+        (12, "watt_hours_charged", "i", 1e4),
+        (13, "tachometer", "i", 1),
+        (14, "tachometer_abs", "i", 1),
+        (15, "fault", "B", 1),
+        (16, "pid_pos", "i", 1e6),
+        (17, "controller_id", "B", 1),
+        (18, "temp_mos1", "h", 1e1),
+        (18, "temp_mos2", "h", 1e1),
+        (18, "temp_mos3", "h", 1e1),
+        (19, "avg_vd", "i", 1e3),
+        (20, "avg_vq", "i", 1e3),
+        (21, "status", "B", 1),
+    )
+
+    # Compiled packer and selected fields of every mask that has been requested
+    __packers: dict[int, tuple[struct.Struct, tuple]] = {}
+
+    def __init__(self) -> None:
+        self.temp_fet: float = 0.0
+        self.temp_motor: float = 0.0
+        self.avg_motor_current: float = 0.0
+        self.avg_input_current: float = 0.0
+        self.avg_id: float = 0.0
+        self.avg_iq: float = 0.0
+        self.duty_cycle: float = 0.0
+        self.rpm: float = 0.0
+        self.input_voltage: float = 0.0
+        self.amp_hours: float = 0.0
+        self.amp_hours_charged: float = 0.0
+        self.watt_hours: float = 0.0
+        self.watt_hours_charged: float = 0.0
+        self.tachometer: int = 0
+        self.tachometer_abs: int = 0
+        self.fault: int = 0
+        self.pid_pos: float = 0.0
+        self.controller_id: int = 0
+        self.temp_mos1: float = 0.0
+        self.temp_mos2: float = 0.0
+        self.temp_mos3: float = 0.0
+        self.avg_vd: float = 0.0
+        self.avg_vq: float = 0.0
+        self.status: int = 0
+
+    @classmethod
+    def packer(cls, mask: int) -> tuple[struct.Struct, tuple]:
+        """
+        Returns the compiled packer of the fields selected by [mask], together with the name and scale of every
+        selected field. Packers are compiled once per mask.
+        """
+        packer = cls.__packers.get(mask)
+        if packer is None:
+            selected = tuple((name, scale) for bit, name, _, scale in cls.FIELDS if mask & (1 << bit))
+            fmt = ">" + "".join(fmt for bit, _, fmt, _ in cls.FIELDS if mask & (1 << bit))
+            packer = (struct.Struct(fmt), selected)
+            cls.__packers[mask] = packer
+        return packer
+
+    def __pack_fields(self, mask: int) -> bytes:
+        packer, selected = ValuesMessage.packer(mask)
+        return packer.pack(*[int(getattr(self, name) * scale) for name, scale in selected])
+
+    @property
+    def buffer(self) -> bytes:
+        """
+        Returns:
+            bytes: the COMM_GET_VALUES response with all fields
+        """
+        return ValuesMessage.ID.to_bytes(1) + self.__pack_fields(ValuesMessage.ALL_FIELDS_MASK)
+
+    def selective_buffer(self, mask: int) -> bytes:
+        """
+        Args:
+            mask (int): the 32-bit mask of the fields to send
+        Returns:
+            bytes: the COMM_GET_VALUES_SELECTIVE response with the mask and the selected fields
+        """
+        return ValuesMessage.SELECTIVE_ID.to_bytes(1) + struct.pack(">I", mask) + self.__pack_fields(mask)
+
+
+def build_values_message(
+    eboard: EBoard,
+    eks: EboardKinematicState,
+    eks_lock: Lock,
+    bdm: BatteryDischargeModel = None,
+    mc: MotorController = None,
+) -> ValuesMessage:
+    """
+    Fills a values message with the current state of a board. The battery fields are left at zero when the board
+    has no battery discharge model, and the duty cycle is then relative to the battery's max voltage.
+    """
+    vm = ValuesMessage()
+    if mc is not None:
+        mc.refresh_kinematic_state()
+    with eks_lock:
+        vm.avg_motor_current = eks.motor_current
+        vm.avg_input_current = eks.input_current
+        vm.rpm = eks.erpm
+    if mc is not None and mc.thermal_model is not None:
+        thermal = mc.thermal_model.snapshot
+        vm.temp_fet = thermal.temp_fet_C
+        vm.temp_motor = thermal.temp_motor_C
+        vm.temp_mos1 = vm.temp_mos2 = vm.temp_mos3 = thermal.temp_fet_C
+    voltage = eboard.battery_max_voltage
+    if bdm is not None:
+        battery = bdm.snapshot
+        vm.input_voltage = battery.terminal_voltage
+        vm.amp_hours = battery.amp_hours
+        vm.amp_hours_charged = battery.amp_hours_charged
+        vm.watt_hours = battery.watt_hours
+        vm.watt_hours_charged = battery.watt_hours_charged
+        voltage = battery.terminal_voltage
+    max_erpm = eboard.motor_kv * voltage * eboard.motor_pole_pairs
+    vm.duty_cycle = vm.rpm / max_erpm if max_erpm > 0 else 0.0
+    return vm
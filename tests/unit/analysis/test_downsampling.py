@@ -0,0 +1,95 @@
+import numpy as np
+import pytest
+from analysis.downsampling import MinMaxPyramid, downsample, lttb_indexes, minmax_indexes, window_indexes
+
+
+def test_window_indexes():
+    timestamps = np.arange(100) * 0.1
+    assert window_indexes(timestamps) == (0, 100)
+    assert window_indexes(timestamps, 1.0, 2.0) == (10, 21)
+    assert window_indexes(timestamps, 20.0, 30.0) == (100, 100)
+
+
+def test_minmax_envelope_keeps_every_peak():
+    values = np.random.default_rng(0).normal(0.0, 1.0, 1000003)
+    values[123457] = 50.0
+    values[876543] = -50.0
+    indexes = minmax_indexes(values, 1000)
+    assert len(indexes) <= 1000
+    assert np.all(np.diff(indexes) >= 0)
+    assert 123457 in indexes and 876543 in indexes
+    assert np.array_equal(minmax_indexes(values[:10], 1000), np.arange(10))
+
+
+def test_lttb_keeps_the_shape():
+    x = np.arange(10000, dtype=np.float64)
+    y = np.where(x == 5000, 100.0, np.sin(x / 500.0))
+    indexes = lttb_indexes(x, y, 200)
+    assert len(indexes) == 200
+    assert indexes[0] == 0 and indexes[-1] == 9999
+    assert np.all(np.diff(indexes) > 0)
+    assert 5000 in indexes
+    assert np.array_equal(lttb_indexes(x[:50], y[:50], 200), np.arange(50))
+
+
+def test_downsample_a_time_window():
+    timestamps = np.arange(100000) * 0.001
+    values = np.arange(100000, dtype=np.float32)
+    t, v = downsample(timestamps, values, 100, "lttb", 10.0, 20.0)
+    assert len(t) == 100
+    assert t[0] == pytest.approx(10.0) and t[-1] == pytest.approx(20.0)
+    assert np.array_equal(v, values[np.round(t * 1000).astype(int)])
+    with pytest.raises(ValueError):
+        downsample(timestamps, values, method="decimate")
+
+
+def test_minmax_pyramid_keeps_every_peak_of_a_window():
+    values = np.random.default_rng(0).normal(0.0, 1.0, 1000003).astype(np.float32)
+    values[123457] = 50.0
+    values[876543] = -50.0
+    pyramid = MinMaxPyramid(values, base_block_size=64, window_size=100000)
+    assert pyramid.levels == 14
+    for start, stop in ((0, 1000003), (123, 999999), (100000, 900001), (123400, 123500), (876000, 877000)):
+        indexes = pyramid.indexes(start, stop, 1000)
+        assert len(indexes) <= 1004
+        assert np.all(np.diff(indexes) >= 0)
+        assert indexes[0] >= start and indexes[-1] < stop
+        window = values[start:stop]
+        assert values[indexes].min() == window.min() and values[indexes].max() == window.max()
+    assert 123457 in pyramid.indexes(0, 1000003, 1000) and 876543 in pyramid.indexes(0, 1000003, 1000)
+    assert np.array_equal(pyramid.indexes(10, 20, 1000), np.arange(10, 20))
+    # Buckets of whole blocks give the envelope of every sample of the window
+    start, stop = 64 * 100, 64 * 100 + 128 * 1024
+    assert np.array_equal(pyramid.indexes(start, stop, 2048), start + minmax_indexes(values[start:stop], 2048))
+
+
+def test_minmax_pyramid_is_built_for_the_zoomed_window_only():
+    values = np.random.default_rng(1).normal(0.0, 1.0, 1000003).astype(np.float32)
+    pyramid = MinMaxPyramid(values, base_block_size=64, window_size=100000)
+    # Tiles hold 1024 blocks of 64 samples, and creating the pyramid builds none of them
+    assert pyramid.built_tiles == 0
+    start, stop = 200000, 260000
+    indexes = pyramid.indexes(start, stop, 1000)
+    assert pyramid.built_tiles == 1
+    window = values[start:stop]
+    assert values[indexes].min() == window.min() and values[indexes].max() == window.max()
+    indexes = pyramid.indexes(0, len(values), 1000)
+    assert pyramid.built_tiles == 16
+    assert values[indexes].min() == values.min() and values[indexes].max() == values.max()
+    # Levels coarser than the tiles are reduced from the tiles, and give the same envelope
+    small_tiles = MinMaxPyramid(values, base_block_size=64, window_size=256)
+    for start, stop in ((0, len(values)), (123, 999999), (200000, 260000)):
+        assert np.array_equal(small_tiles.indexes(start, stop, 1000), pyramid.indexes(start, stop, 1000))
+
+
+def test_downsample_with_a_pyramid():
+    timestamps = np.arange(100000) * 0.001
+    values = np.sin(np.arange(100000) / 1000.0).astype(np.float32)
+    values[54321] = 10.0
+    pyramid = MinMaxPyramid(values, base_block_size=16)
+    t, v = downsample(timestamps, values, 100, "minmax", 10.0, 90.0, pyramid)
+    assert 54.321 in t.tolist() and v.max() == 10.0
+    assert np.all((t >= 10.0) & (t <= 90.0))
+    t, v = downsample(timestamps, values, 100, "lttb", 10.0, 90.0, pyramid)
+    assert len(t) == 100 and 54.321 in t.tolist()
+    assert np.array_equal(v, values[np.round(t * 1000).astype(int)])
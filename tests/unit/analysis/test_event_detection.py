@@ -0,0 +1,114 @@
+import numpy as np
+from analysis.data import ColumnarColumn, load_recording
+from analysis.event_detection import (
+    EVENT_DTYPE,
+    detect_ramps,
+    detect_spikes,
+    detect_steps,
+    detect_threshold,
+    event_stats,
+    merge_runs,
+    runs,
+    threshold_runs,
+)
+from bionic_boarder_simulation_tool.riding.columnar_recording import ColumnarRecordingWriter
+from bionic_boarder_simulation_tool.riding.recording_format import RECORD_DTYPE
+
+
+def test_runs():
+    starts, ends = runs(np.array([True, True, False, False, True, False, True]))
+    assert starts.tolist() == [0, 4, 6]
+    assert ends.tolist() == [2, 5, 7]
+    starts, ends = runs(np.zeros(5, dtype=bool))
+    assert len(starts) == 0 and len(ends) == 0
+    starts, ends = merge_runs(np.array([0, 4, 6, 20]), np.array([2, 5, 7, 21]), max_gap=2, min_length=2)
+    assert starts.tolist() == [0]
+    assert ends.tolist() == [7]
+
+
+def test_windowed_threshold_runs_continue_across_windows():
+    values = np.array([0.0, 5.0, 7.0, 3.0, 0.0, 6.0, 6.0, 6.0, 6.0, 0.0, 9.0])
+    expected = threshold_runs(values, 1.0)
+    assert expected[0].tolist() == [1, 5, 10]
+    assert expected[1].tolist() == [4, 9, 11]
+    for window_size in (1, 2, 3, 4, 7, 100):
+        starts, ends = threshold_runs(values, 1.0, window_size=window_size)
+        assert starts.tolist() == expected[0].tolist()
+        assert ends.tolist() == expected[1].tolist()
+    starts, ends = threshold_runs(values, 1.0, above=False, window_size=3)
+    assert starts.tolist() == [0, 4, 9]
+    assert ends.tolist() == [1, 5, 10]
+
+
+def test_event_stats_of_overlapping_events():
+    values = np.array([1.0, 4.0, 2.0, 8.0, 3.0])
+    events = event_stats(values, np.array([0, 1, 3]), np.array([3, 5, 5]))
+    assert events["start_time"].tolist() == [0.0, 1.0, 3.0]
+    assert events["end_time"].tolist() == [2.0, 4.0, 4.0]
+    assert events["minimum"].tolist() == [1.0, 2.0, 3.0]
+    assert events["maximum"].tolist() == [4.0, 8.0, 8.0]
+    assert events["mean"].tolist() == [7.0 / 3.0, 17.0 / 4.0, 5.5]
+    assert events["delta"].tolist() == [1.0, -1.0, -5.0]
+
+
+def test_threshold_events_and_their_stats():
+    values = np.array([0.0, 5.0, 7.0, 0.0, 0.0, 6.0, 0.0, 9.0])
+    timestamps = np.arange(len(values)) * 0.5
+    events = detect_threshold(values, 1.0, timestamps=timestamps)
+    assert events.dtype == EVENT_DTYPE
+    assert events["start"].tolist() == [1, 5, 7]
+    assert events["end"].tolist() == [3, 6, 8]
+    assert events["start_time"].tolist() == [0.5, 2.5, 3.5]
+    assert events["end_time"].tolist() == [1.0, 2.5, 3.5]
+    assert events["maximum"].tolist() == [7.0, 6.0, 9.0]
+    assert events["minimum"].tolist() == [5.0, 6.0, 9.0]
+    assert events["mean"].tolist() == [6.0, 6.0, 9.0]
+    assert events["delta"].tolist() == [2.0, 0.0, 0.0]
+    assert len(detect_threshold(values, 100.0)) == 0
+
+
+def test_push_spikes():
+    accelerations_x = np.random.default_rng(0).normal(0.0, 0.1, 100000)
+    accelerations_x[1000:1050] += 20.0
+    accelerations_x[50000:50030] += 15.0
+    spikes = detect_spikes(accelerations_x)
+    assert spikes["start"].tolist() == [1000, 50000]
+    assert spikes["end"].tolist() == [1050, 50030]
+    # Windows that split the spikes find the same spikes
+    windowed_spikes = detect_spikes(accelerations_x, window_size=1024)
+    assert np.array_equal(windowed_spikes, spikes)
+
+
+def test_push_spikes_in_a_columnar_recording(tmp_path, mocker):
+    records = np.zeros(20000, dtype=RECORD_DTYPE)
+    records["timestamp"] = np.arange(len(records)) * 0.01
+    records["acceleration_x"] = np.random.default_rng(0).normal(0.0, 0.1, len(records))
+    records["acceleration_x"][1000:1050] += 20.0
+    file_name = str(tmp_path / "recording.bbcol")
+    writer = ColumnarRecordingWriter(file_name, RECORD_DTYPE, {}, chunk_size=512)
+    writer.write(records.data)
+    writer.close()
+    recording = load_recording(file_name)
+    expected = detect_spikes(records["acceleration_x"], timestamps=records["timestamp"], median=0.0, mad=0.1)
+    # The channel is compared with the threshold a window at a time and never converted to an array as a whole
+    to_array = mocker.spy(ColumnarColumn, "__array__")
+    spikes = detect_spikes(recording["acceleration_x"], 10.0, recording["timestamp"], 0.0, 0.1, window_size=4096)
+    assert to_array.call_count == 0
+    assert np.array_equal(spikes, expected)
+
+
+def test_slope_changes_and_current_steps():
+    pitch = np.repeat([0.0, 3.0, 3.0, -2.0], 100)
+    changes = detect_steps(pitch, 0.5)
+    assert changes["start"].tolist() == [99, 299]
+    assert changes["delta"].tolist() == [3.0, -5.0]
+
+
+def test_erpm_ramps():
+    timestamps = np.arange(0.0, 10.0, 0.01)
+    erpm = np.interp(timestamps, [0.0, 2.0, 4.0, 6.0, 7.0, 10.0], [0, 0, 10000, 10000, 0, 0]).astype(np.int32)
+    ramps = detect_ramps(erpm, timestamps, min_rate=1000.0, min_duration=0.5)
+    assert len(ramps) == 2
+    assert np.allclose(ramps["start_time"], [2.0, 6.0])
+    assert np.allclose(ramps["end_time"], [4.0, 7.0])
+    assert ramps["delta"][0] > 9000 and ramps["delta"][1] < -9000
@@ -0,0 +1,80 @@
+import os
+import numpy as np
+import pytest
+from analysis.data import load_recording
+from bionic_boarder_simulation_tool.riding.columnar_recording import ColumnarRecordingWriter, decode_column
+from bionic_boarder_simulation_tool.riding.recording_format import (
+    LEGACY_RECORD_DTYPE,
+    RECORD_DTYPE,
+    write_recording_header,
+)
+
+LEGACY_RECORDING = os.path.join(
+    os.path.dirname(__file__), "..", "..", "..", "analysis", "data", "sim_data_recording_2025-03-25_16-39-53.bin"
+)
+
+
+def make_records(count):
+    records = np.zeros(count, dtype=RECORD_DTYPE)
+    records["timestamp"] = np.arange(count) * 0.01
+    records["erpm"] = np.arange(count)
+    records["velocity"] = np.arange(count) / 10.0
+    return records
+
+
+@pytest.mark.parametrize("columnar", [False, True])
+def test_columns_and_windows(tmp_path, columnar):
+    records = make_records(500)
+    file_name = str(tmp_path / "recording")
+    if columnar:
+        writer = ColumnarRecordingWriter(file_name, RECORD_DTYPE, {"sample_period_ms": 10}, chunk_size=64)
+        writer.write(records.data)
+        writer.close()
+    else:
+        with open(file_name, "wb") as file:
+            write_recording_header(file, RECORD_DTYPE, {"sample_period_ms": 10})
+            file.write(records.tobytes())
+    recording = load_recording(file_name)
+    assert len(recording) == 500
+    assert recording.metadata["sample_period_ms"] == 10
+    assert recording.fields == RECORD_DTYPE.names
+    assert np.array_equal(recording["erpm"], records["erpm"])
+    window = recording.window(1.0, 1.995, ["velocity"])
+    assert window.dtype.names == ("timestamp", "velocity")
+    assert np.array_equal(window["velocity"], records["velocity"][100:200])
+    with pytest.raises(KeyError):
+        recording.column("speed")
+
+
+def test_columnar_columns_are_read_a_window_at_a_time(tmp_path, mocker):
+    records = make_records(500)
+    file_name = str(tmp_path / "recording.bbcol")
+    writer = ColumnarRecordingWriter(file_name, RECORD_DTYPE, {}, chunk_size=64)
+    writer.write(records.data)
+    writer.close()
+    recording = load_recording(file_name)
+    decode = mocker.patch(
+        "bionic_boarder_simulation_tool.riding.columnar_recording.decode_column", side_effect=decode_column
+    )
+    erpm = recording["erpm"]
+    assert len(erpm) == 500
+    assert decode.call_count == 0
+    assert np.array_equal(erpm[100:120], records["erpm"][100:120])
+    assert decode.call_count == 1
+    assert erpm[-1] == 499
+    assert np.array_equal(erpm[10:200:7], records["erpm"][10:200:7])
+    indexes = np.array([[450, 3], [70, 450]])
+    assert np.array_equal(erpm[indexes], records["erpm"][indexes])
+    assert np.searchsorted(recording["timestamp"], 2.0) == 200
+    # Nothing is kept, every access decompresses the chunks it needs again
+    decode.reset_mock()
+    assert np.array_equal(erpm[100:120], records["erpm"][100:120])
+    assert decode.call_count == 1
+    assert np.array_equal(np.asarray(erpm), records["erpm"])
+
+
+def test_legacy_recording():
+    recording = load_recording(LEGACY_RECORDING)
+    assert recording.metadata == {}
+    assert len(recording) == os.path.getsize(LEGACY_RECORDING) // LEGACY_RECORD_DTYPE.itemsize
+    assert np.all(np.diff(recording["timestamp"]) > 0)
@@ -0,0 +1,91 @@
+import numpy as np
+import pytest
+from analysis.streaming_stats import (
+    QuantileSketch,
+    RunningMoments,
+    StreamingHistogram,
+    StreamingSummary,
+    median_and_mad,
+    summarize_recording,
+    windows,
+)
+from bionic_boarder_simulation_tool.riding.recording_format import RECORD_DTYPE, write_recording_header
+
+
+def test_running_moments_match_numpy():
+    values = np.random.default_rng(0).normal(3.0, 2.0, 100000)
+    moments = RunningMoments()
+    for window in windows(values, 7777):
+        moments.update(window)
+    assert moments.count == len(values)
+    assert moments.minimum == values.min()
+    assert moments.maximum == values.max()
+    assert moments.mean == pytest.approx(values.mean())
+    assert moments.variance == pytest.approx(values.var())
+    merged = RunningMoments()
+    halves = [RunningMoments(), RunningMoments()]
+    halves[0].update(values[:30000])
+    halves[1].update(values[30000:])
+    for half in halves:
+        merged.merge(half)
+    assert merged.variance == pytest.approx(values.var())
+
+
+def test_histogram_matches_numpy():
+    values = np.random.default_rng(1).normal(0.0, 1.0, 50000)
+    histogram = StreamingHistogram(-2.0, 2.0, 40)
+    for window in windows(values, 4096):
+        histogram.update(window)
+    assert np.array_equal(histogram.counts, np.histogram(values[(values >= -2.0) & (values < 2.0)], histogram.edges)[0])
+    assert histogram.underflow == np.sum(values < -2.0)
+    assert histogram.overflow == np.sum(values >= 2.0)
+    with pytest.raises(ValueError):
+        histogram.merge(StreamingHistogram(-1.0, 1.0, 40))
+
+
+def test_quantile_sketch_is_bounded_and_accurate():
+    values = np.random.default_rng(2).exponential(1.0, 400000)
+    sketch = QuantileSketch(compression=200)
+    for window in windows(values, 10000):
+        sketch.update(window)
+    assert sketch.count == len(values)
+    assert sketch.number_of_centroids <= 101
+    for q in (0.01, 0.5, 0.99):
+        assert np.mean(values <= sketch.quantile(q)) == pytest.approx(q, abs=0.005)
+    assert sketch.quantile(0.0) == values.min()
+    assert sketch.quantile(1.0) == values.max()
+    assert np.isnan(QuantileSketch().median())
+
+
+def write_recording(file_name, accelerations_x):
+    records = np.zeros(len(accelerations_x), dtype=RECORD_DTYPE)
+    records["timestamp"] = np.arange(len(records)) * 0.001
+    records["acceleration_x"] = accelerations_x
+    with open(file_name, "wb") as file:
+        write_recording_header(file, RECORD_DTYPE, {})
+        file.write(records.tobytes())
+
+
+def test_median_and_mad_of_a_recording(tmp_path):
+    accelerations_x = np.random.default_rng(3).laplace(0.5, 1.0, 60000).astype(np.float32)
+    file_name = str(tmp_path / "recording.bin")
+    write_recording(file_name, accelerations_x)
+    exact_median = np.median(accelerations_x)
+    exact_mad = np.median(np.abs(accelerations_x - exact_median))
+    for processes in (0, 2):
+        median, mad = median_and_mad(file_name, "acceleration_x", window_size=8192, processes=processes)
+        assert median == pytest.approx(exact_median, abs=0.02)
+        assert mad == pytest.approx(exact_mad, rel=0.02)
+
+
+def test_summaries_of_worker_processes_are_merged(tmp_path):
+    accelerations_x = np.arange(10000, dtype=np.float32)
+    file_name = str(tmp_path / "recording.bin")
+    write_recording(file_name, accelerations_x)
+    summary = summarize_recording(
+        file_name, "acceleration_x", window_size=1000, processes=3, histogram_range=(0, 10000, 10)
+    )
+    assert isinstance(summary, StreamingSummary)
+    assert summary.moments.count == 10000
+    assert summary.moments.mean == pytest.approx(4999.5)
+    assert np.all(summary.histogram.counts == 1000)
@@ -0,0 +1,68 @@
+import socket
+import numpy as np
+from analysis.telemetry_client import TelemetryClient
+from bionic_boarder_simulation_tool.riding.eboard_kinematic_state import EboardKinematicState
+from bionic_boarder_simulation_tool.riding.recording_format import RECORD_DTYPE
+from bionic_boarder_simulation_tool.riding.telemetry_publisher import (
+    TELEMETRY_FORMAT_VERSION,
+    TELEMETRY_HEADER,
+    TELEMETRY_MAGIC,
+    TelemetryPublisher,
+    TelemetryTransport,
+)
+
+
+def test_client_keeps_the_latest_samples():
+    client = TelemetryClient(TelemetryTransport.UDP, "127.0.0.1:0", window_size=50)
+    host, port = client.address
+    publisher = TelemetryPublisher(TelemetryTransport.UDP, f"{host}:{port}", publish_period_ms=5)
+    listener = publisher.tick_listener()
+    eks = EboardKinematicState()
+    publisher.start()
+    for i in range(200):
+        eks.erpm = i
+        listener(eks, (i + 1) * 0.001, 0.001)
+    publisher.stop()
+    while client.poll(0.5) > 0:
+        pass
+    samples = client.samples()
+    assert np.array_equal(samples["erpm"], np.arange(150, 200))
+    assert client.lost_datagrams == 0
+    assert len(client.samples(1)) == 0
+    client.close()
+
+
+def test_client_over_a_unix_socket(tmp_path):
+    path = str(tmp_path / "telemetry.sock")
+    client = TelemetryClient(TelemetryTransport.UNIX, path)
+    publisher = TelemetryPublisher(TelemetryTransport.UNIX, path)
+    listener = publisher.tick_listener()
+    publisher.start()
+    listener(EboardKinematicState(velocity=2.5), 0.01, 0.01)
+    publisher.stop()
+    assert client.poll(0.5) == 1
+    assert client.samples()["velocity"][0] == 2.5
+    client.close()
+
+
+def test_client_counts_gaps_but_not_stale_datagrams():
+    client = TelemetryClient(TelemetryTransport.UDP, "127.0.0.1:0")
+    sender = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+    sequences = [(0, 0), (0, 1), (0, 3), (0, 2), (0, 3), (1, 0xFFFFFFFE), (1, 0xFFFFFFFF), (1, 0), (1, 2)]
+    for board_index, sequence in sequences:
+        sample = np.zeros(1, dtype=RECORD_DTYPE)
+        sample["erpm"] = sequence & 0xFF
+        header = TELEMETRY_HEADER.pack(TELEMETRY_MAGIC, TELEMETRY_FORMAT_VERSION, board_index, 1, 0, sequence)
+        sender.sendto(header + sample.tobytes(), client.address)
+    sender.close()
+    received = 0
+    while received < 7 and client.poll(0.5) > 0:
+        received = len(client.samples(0)) + len(client.samples(1))
+    # The reordered datagram 2 and the duplicate datagram 3 of board 0 are stale, the sequence numbers of board 1
+    # wrap around
+    assert client.received_datagrams == 9
+    assert client.stale_datagrams == 2
+    assert client.lost_datagrams == 2
+    assert client.samples(0)["erpm"].tolist() == [0, 1, 3]
+    assert client.samples(1)["erpm"].tolist() == [0xFE, 0xFF, 0, 2]
+    client.close()
@@ -0,0 +1,61 @@
+import json
+import os
+import numpy as np
+import pytest
+from analysis.time_index import TimeIndex, build_time_index, time_index_file_name
+from bionic_boarder_simulation_tool.riding.recording_format import RECORD_DTYPE, write_recording_header
+
+
+def write_recording(file_name, count):
+    records = np.zeros(count, dtype=RECORD_DTYPE)
+    records["timestamp"] = 0.5 + np.arange(count) * 0.002
+    records["erpm"] = np.arange(count)
+    with open(file_name, "wb") as file:
+        payload_offset = write_recording_header(file, RECORD_DTYPE, {})
+        file.write(records.tobytes())
+    return payload_offset
+
+
+def test_time_windows(tmp_path):
+    file_name = str(tmp_path / "recording.bin")
+    payload_offset = write_recording(file_name, 10000)
+    assert build_time_index(file_name, stride=100) == time_index_file_name(file_name)
+    index = TimeIndex(file_name)
+    assert index.stride == 100
+    assert index.offsets[3] == payload_offset + 300 * RECORD_DTYPE.itemsize
+    window = index.window(10.0, 10.999)
+    assert window["erpm"][0] == 4750
+    assert window["erpm"][-1] == 5249
+    assert index.sample_range(0.0, 0.1) == (0, 0)
+    assert index.sample_range(100.0) == (10000, 10000)
+    assert index.sample_range() == (0, 10000)
+
+
+def test_log_events_are_linked_to_samples(tmp_path):
+    file_name = str(tmp_path / "recording.bin")
+    write_recording(file_name, 10000)
+    log_file_name = str(tmp_path / "sim.log")
+    with open(log_file_name, "w") as file:
+        file.write(json.dumps({"event": "Land paddle board push initiated", "timestamp": 12.0011}) + "\n")
+        file.write("not a log event\n")
+        file.write(json.dumps({"event": "Kinematic loop has started", "timestamp": 0.0}) + "\n")
+    build_time_index(file_name, log_file_name, stride=64)
+    index = TimeIndex(file_name)
+    events = index.log_events()
+    assert [event["event"] for event in events] == ["Kinematic loop has started", "Land paddle board push initiated"]
+    assert events[0]["sample_index"] == 0
+    assert events[1]["sample_index"] == 5751
+    assert index.log_events(11.0, 13.0) == events[1:]
+
+
+def test_stale_time_index_is_rejected(tmp_path):
+    file_name = str(tmp_path / "recording.bin")
+    write_recording(file_name, 1000)
+    build_time_index(file_name)
+    with open(file_name, "ab") as file:
+        file.write(np.zeros(1, dtype=RECORD_DTYPE).tobytes())
+    with pytest.raises(ValueError):
+        TimeIndex(file_name)
+    os.remove(time_index_file_name(file_name))
+    with pytest.raises(FileNotFoundError):
+        TimeIndex(file_name)
@@ -1,7 +1,9 @@
+import numpy as np
 import pytest
 from bionic_boarder_simulation_tool.riding.battery_discharge_model import (
     BatteryDischargeModel,
 )
+from bionic_boarder_simulation_tool.riding.eboard_kinematic_state import EboardKinematicState
 
 
 class TestBatteryDischargeModel:
@@ -11,6 +13,8 @@ class TestBatteryDischargeModel:
 
     def test_initialization(self, model: BatteryDischargeModel):
         assert model.get_watt_hours_consumed() == 0, "Initial watt-hours consumed should be 0"
+        assert model.snapshot.state_of_charge == 1.0
+        assert model.snapshot.terminal_voltage == pytest.approx(37)
 
     def test_current_draw_property(self, model: BatteryDischargeModel):
         assert model.current_draw == 1.0, "Initial current draw should be 1.0"
@@ -22,27 +26,78 @@ class TestBatteryDischargeModel:
         model.discharge(time_duration_ms=1000)  # Discharge for 1 second
         assert model.get_watt_hours_consumed() > initial_energy, "Energy consumed should increase after discharge"
 
-    def test_energy_consumed_calculation(self, model: BatteryDischargeModel):
+    def test_energy_consumed_calculation(self):
+        model = BatteryDischargeModel(battery_max_nominal_voltage=37, internal_resistance_ohm=0.0)
         model.current_draw = 2  # Set current draw to 2A
-        model.discharge(time_duration_ms=3600000)  # Discharge for 1 hour
-        expected_energy_consumed = 2 * 37  # P=IV, so E = Pt where t is 1 hour
-        assert model.get_watt_hours_consumed() == expected_energy_consumed, "Energy consumed calculation is incorrect"
+        model.discharge(time_duration_ms=1000)
+        expected_energy_consumed = 2 * 37 / 3600  # P=IV at full charge, so E = Pt where t is 1 second
+        assert model.get_watt_hours_consumed() == pytest.approx(expected_energy_consumed)
+        assert model.snapshot.amp_hours == pytest.approx(2 / 3600)
 
     def test_thread_safety(self, model: BatteryDischargeModel):
         from threading import Thread
 
-        initial_energy = model.get_watt_hours_consumed()
-
+        # One writer draws current while readers on other threads take snapshots without a lock. Every snapshot
+        # is consistent, and the energy drawn never goes backwards.
         def discharge_model():
-            model.discharge(time_duration_ms=500)  # Discharge for 0.5 second
-
-        threads = [Thread(target=discharge_model) for _ in range(10)]
-        for thread in threads:
-            thread.start()
-        for thread in threads:
-            thread.join()
-
-        # Check if the energy consumed is correctly updated after concurrent discharges
-        assert (
-            model.get_watt_hours_consumed() > initial_energy
-        ), "Concurrent discharge should increase energy consumed correctly"
+            for _ in range(2000):
+                model.discharge(time_duration_ms=500)
+
+        errors = []
+
+        def read_snapshots():
+            last_watt_hours = 0.0
+            for _ in range(2000):
+                snapshot = model.snapshot
+                sag = 0.0 if snapshot.amp_hours == 0.0 else 0.1
+                if snapshot.terminal_voltage != pytest.approx(snapshot.open_circuit_voltage - sag):
+                    errors.append(snapshot)
+                if snapshot.watt_hours < last_watt_hours:
+                    errors.append(snapshot)
+                last_watt_hours = snapshot.watt_hours
+
+        writer = Thread(target=discharge_model)
+        readers = [Thread(target=read_snapshots) for _ in range(4)]
+        writer.start()
+        for reader in readers:
+            reader.start()
+        writer.join()
+        for reader in readers:
+            reader.join()
+        assert errors == []
+        assert model.snapshot.amp_hours == pytest.approx(2000 * 0.5 / 3600)
+
+    def test_voltage_sags_with_current_and_state_of_charge(self):
+        model = BatteryDischargeModel(
+            battery_max_nominal_voltage=42, battery_capacity_Ah=10, internal_resistance_ohm=0.1
+        )
+        model.draw(20.0, 0.01)
+        assert model.snapshot.terminal_voltage == pytest.approx(model.snapshot.open_circuit_voltage - 2.0)
+        model.draw(10.0, 1800)
+        assert model.snapshot.state_of_charge == pytest.approx(0.5, abs=1e-3)
+        assert model.snapshot.open_circuit_voltage == pytest.approx(42 * 3.8 / 4.2)
+
+    def test_regeneration_charges_the_battery(self, model: BatteryDischargeModel):
+        model.draw(10.0, 360)
+        state_of_charge = model.snapshot.state_of_charge
+        model.draw(-5.0, 360)
+        assert model.snapshot.amp_hours == pytest.approx(1.0)
+        assert model.snapshot.amp_hours_charged == pytest.approx(0.5)
+        assert model.snapshot.watt_hours_charged > 0
+        assert model.snapshot.state_of_charge > state_of_charge
+
+    def test_draw_batch_matches_draw(self):
+        currents_A = np.random.default_rng(0).uniform(-10, 30, 5000)
+        model = BatteryDischargeModel(battery_max_nominal_voltage=42, battery_capacity_Ah=1)
+        batch_model = BatteryDischargeModel(battery_max_nominal_voltage=42, battery_capacity_Ah=1)
+        for current_A in currents_A:
+            model.draw(current_A, 0.1)
+        voltages = batch_model.draw_batch(currents_A, 0.1)
+        assert len(voltages) == len(currents_A)
+        assert np.allclose(batch_model.snapshot, model.snapshot)
+
+    def test_kinematic_tick_draws_input_current(self, model: BatteryDischargeModel):
+        eks = EboardKinematicState(0, 0, 0, 0, 0, 0, 0, 0, 0, 0)
+        eks.input_current = 36.0
+        model.on_kinematic_tick(eks, 0.1, 0.1)
+        assert model.snapshot.amp_hours == pytest.approx(0.001)
@@ -0,0 +1,127 @@
+import numpy as np
+import pytest
+from bionic_boarder_simulation_tool.riding.columnar_recording import (
+    ColumnarCodec,
+    ColumnarRecordingReader,
+    ColumnarRecordingWriter,
+    decode_column,
+    encode_column,
+)
+from bionic_boarder_simulation_tool.riding.recording_format import RECORD_DTYPE
+
+
+def make_records(count):
+    records = np.zeros(count, dtype=RECORD_DTYPE)
+    records["timestamp"] = np.arange(count) * 0.01
+    records["velocity"] = np.sin(np.arange(count) / 50.0).astype(np.float32)
+    records["erpm"] = 10000 + np.arange(count) % 300
+    records["motor_current"] = -np.arange(count, dtype=np.float32)
+    return records
+
+
+@pytest.mark.parametrize("codec", list(ColumnarCodec))
+def test_encode_decode_column(codec):
+    for column in (np.array([5, -3, 2**31 - 1, -(2**31), 0], dtype=np.int32), np.linspace(-1.0, 1.0, 100)):
+        decoded = decode_column(encode_column(column, codec), column.dtype, len(column), codec)
+        assert decoded.dtype == column.dtype
+        assert np.array_equal(decoded, column)
+
+
+@pytest.mark.parametrize("codec", list(ColumnarCodec))
+def test_write_and_read_all_samples(tmp_path, codec):
+    records = make_records(1000)
+    file_name = str(tmp_path / "recording.bbcol")
+    writer = ColumnarRecordingWriter(file_name, RECORD_DTYPE, {"sample_period_ms": 10}, codec, chunk_size=128)
+    # Writes of odd sizes, like the flushes of a ring buffer, are chunked the same way.
+    for start in range(0, len(records), 77):
+        assert writer.write(records[start : start + 77].data) == records[start : start + 77].nbytes
+    writer.close()
+    reader = ColumnarRecordingReader(file_name)
+    assert reader.metadata["sample_period_ms"] == 10
+    assert reader.dtype == RECORD_DTYPE
+    assert reader.number_of_chunks == 8
+    assert reader.number_of_samples == 1000
+    assert np.array_equal(reader.read(), records)
+
+
+def test_read_fields_in_a_time_window(tmp_path, mocker):
+    records = make_records(1000)
+    file_name = str(tmp_path / "recording.bbcol")
+    writer = ColumnarRecordingWriter(file_name, RECORD_DTYPE, {}, chunk_size=100)
+    writer.write(records.data)
+    writer.close()
+    reader = ColumnarRecordingReader(file_name)
+    decode = mocker.patch(
+        "bionic_boarder_simulation_tool.riding.columnar_recording.decode_column", side_effect=decode_column
+    )
+    window = reader.read(["erpm"], start_time=2.5, end_time=3.49)
+    assert window.dtype.names == ("timestamp", "erpm")
+    assert np.array_equal(window["erpm"], records["erpm"][250:350])
+    # Only the timestamp and erpm blocks of the two overlapping chunks are decompressed.
+    assert decode.call_count == 4
+    assert len(reader.read(start_time=100.0)) == 0
+
+
+def test_read_samples_and_search_time(tmp_path, mocker):
+    records = make_records(1000)
+    file_name = str(tmp_path / "recording.bbcol")
+    writer = ColumnarRecordingWriter(file_name, RECORD_DTYPE, {}, chunk_size=100)
+    writer.write(records.data)
+    writer.close()
+    reader = ColumnarRecordingReader(file_name)
+    decode = mocker.patch(
+        "bionic_boarder_simulation_tool.riding.columnar_recording.decode_column", side_effect=decode_column
+    )
+    samples = reader.read_samples(["erpm"], 250, 350)
+    assert samples.dtype.names == ("erpm",)
+    assert np.array_equal(samples["erpm"], records["erpm"][250:350])
+    # Only the erpm blocks of the two chunks holding the samples are decompressed.
+    assert decode.call_count == 2
+    assert len(reader.read_samples(["erpm"], 990, 2000)) == 10
+    assert len(reader.read_samples(["erpm"], 500, 500)) == 0
+    decode.reset_mock()
+    timestamps = records["timestamp"]
+    for time in (-1.0, 0.0, 2.5, 2.505, 9.99, 20.0):
+        for side in ("left", "right"):
+            assert reader.search_time(time, side) == np.searchsorted(timestamps, time, side=side)
+    assert decode.call_count <= 12
+
+
+def test_unclosed_recording_is_recovered(tmp_path):
+    records = make_records(25)
+    file_name = str(tmp_path / "recording.bbcol")
+    writer = ColumnarRecordingWriter(file_name, RECORD_DTYPE, {"sample_period_ms": 10}, chunk_size=10)
+    writer.write(records.data)
+    # The two complete chunks are on disk before the writer is closed, the partial one is not.
+    reader = ColumnarRecordingReader(file_name)
+    assert reader.closed == False
+    assert reader.metadata["sample_period_ms"] == 10
+    assert reader.number_of_chunks == 2
+    assert np.array_equal(reader.read(), records[:20])
+    assert np.array_equal(reader.read(["erpm"], start_time=0.1)["erpm"], records["erpm"][10:20])
+    writer.close()
+    reader = ColumnarRecordingReader(file_name)
+    assert reader.closed == True
+    assert reader.number_of_samples == 25
+
+
+def test_truncated_recording_recovers_complete_chunks(tmp_path):
+    records = make_records(30)
+    file_name = str(tmp_path / "recording.bbcol")
+    writer = ColumnarRecordingWriter(file_name, RECORD_DTYPE, {}, chunk_size=10)
+    writer.write(records.data)
+    writer.close()
+    with open(file_name, "r+b") as file:
+        # Cut the file within the blocks of the last chunk, like a write interrupted by a crash.
+        file.truncate(ColumnarRecordingReader(file_name)._ColumnarRecordingReader__chunks[2]["blocks"]["erpm"][0])
+    reader = ColumnarRecordingReader(file_name)
+    assert reader.closed == False
+    assert np.array_equal(reader.read(), records[:20])
+
+
+def test_empty_unclosed_recording_has_no_samples(tmp_path):
+    file_name = str(tmp_path / "recording.bbcol")
+    ColumnarRecordingWriter(file_name, RECORD_DTYPE, {})
+    reader = ColumnarRecordingReader(file_name)
+    assert reader.number_of_samples == 0
+    assert len(reader.read()) == 0
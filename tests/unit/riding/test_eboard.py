@@ -0,0 +1,41 @@
+import math
+import pytest
+from bionic_boarder_simulation_tool.riding.eboard import EBoard
+
+
+@pytest.fixture
+def eboard():
+    return EBoard(
+        total_weight_with_rider_kg=80.0,
+        frontal_area_of_rider_m2=0.5,
+        wheel_diameter_m=0.1,
+        battery_max_capacity_Ah=10.0,
+        battery_max_voltage=36.0,
+        gear_ratio=2.0,
+        motor_kv=190,
+        motor_max_torque=6.0,
+        motor_max_amps=50.0,
+        motor_max_power_watts=500.0,
+        motor_pole_pairs=7,
+    )
+
+
+def test_constants_are_built_once(eboard):
+    assert eboard.constants is eboard.constants
+
+
+def test_constants(eboard):
+    c = eboard.constants
+    assert c.wheel_radius_m == 0.05
+    assert c.force_1g_N == pytest.approx(80.0 * 9.81)
+    assert c.motor_kt_Nm_per_A == pytest.approx(60 / (2 * math.pi * 190))
+    assert c.velocity_m_per_s_per_erpm * c.erpm_per_velocity_m_per_s == pytest.approx(1.0)
+    # 1 m/s at a 0.1 m wheel is 190.99 wheel RPM, 381.97 motor RPM and 2673.8 ERPM
+    assert c.erpm_per_velocity_m_per_s == pytest.approx(2673.8, abs=0.1)
+
+
+def test_constants_are_computed_when_used():
+    eboard = EBoard(0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0)
+    assert eboard.constants.wheel_radius_m == 0
+    with pytest.raises(ZeroDivisionError):
+        eboard.constants.motor_kt_Nm_per_A
@@ -1,9 +1,14 @@
-from bionic_boarder_simulation_tool.riding.eboard_state_recorder import EboardStateRecorder
+from bionic_boarder_simulation_tool.riding.eboard_state_recorder import RECORD_DTYPE, EboardStateRecorder
+from bionic_boarder_simulation_tool.riding.recording_format import open_recording, read_recording_header
+from bionic_boarder_simulation_tool.riding.columnar_recording import ColumnarCodec, ColumnarRecordingReader
 from threading import Lock
 from bionic_boarder_simulation_tool.riding.eboard_kinematic_state import EboardKinematicState
+from bionic_boarder_simulation_tool.mission_elapsed_time import MissionElapsedTime
 import time
 import os
 import struct
+import numpy as np
+import pytest
 
 
 def test_record():
@@ -14,14 +19,17 @@ def test_record():
     recording_period_ms = 20
     duration_sec = 1.0
     eboard_state_recorder = EboardStateRecorder(Lock(), eks, recording_period_ms)
+    start_timestamp = MissionElapsedTime().elapsed_time_sec
     eboard_state_recorder.start_recording()
     time.sleep(duration_sec)
     eboard_state_recorder.stop_recording()
     time.sleep(0.02)
     assert os.path.exists(eboard_state_recorder.record_file_name)
-    format_string = "d f f f f f f f i f f"
+    format_string = "d f f f f f f f i f f d"
     previous_timestamp = 0.0
+    payload_offset = read_recording_header(eboard_state_recorder.record_file_name).payload_offset
     with open(eboard_state_recorder.record_file_name, "rb") as file:
+        file.seek(payload_offset)
         while True:
             # Read the number of bytes corresponding to the format string
             data = file.read(struct.calcsize(format_string))
@@ -35,5 +43,118 @@ def test_record():
             timestamp = unpacked_data[0]
             assert timestamp > previous_timestamp, "Timestamps are not in increasing order"
             previous_timestamp = timestamp
-    assert previous_timestamp <= (duration_sec + 2 * recording_period_ms / 1000.0)
+    assert previous_timestamp <= (start_timestamp + duration_sec + 2 * recording_period_ms / 1000.0)
     os.remove(eboard_state_recorder.record_file_name)
+
+
+def test_record_multiple_boards():
+    states = [EboardKinematicState(velocity=float(i)) for i in range(3)]
+    recorder = EboardStateRecorder(Lock(), states[0], 20, "board0", metadata={"random_seed": 3})
+    recorder.add_source(Lock(), states[1], "board1")
+    recorder.add_source(Lock(), states[2], "board2")
+    assert len(set(recorder.record_file_names)) == 3
+    assert recorder.record_file_name.endswith("_board0.bin")
+    recorder.start_recording()
+    time.sleep(0.1)
+    recorder.stop_recording()
+    time.sleep(0.05)
+    format_string = "d f f f f f f f i f f d"
+    for i, file_name in enumerate(recorder.record_file_names):
+        with open(file_name, "rb") as file:
+            file.seek(read_recording_header(file_name).payload_offset)
+            data = file.read(struct.calcsize(format_string))
+        assert struct.unpack(format_string, data)[1] == float(i)
+        assert read_recording_header(file_name).metadata["board_name"] == f"board{i}"
+        os.remove(file_name)
+
+
+def test_stop_recording_flushes_all_samples():
+    eks = EboardKinematicState(erpm=1234)
+    recorder = EboardStateRecorder(Lock(), eks, 1, buffer_capacity=1024, flush_period_ms=50)
+    recorder.start_recording()
+    time.sleep(0.2)
+    recorder.stop_recording()
+    header, records = open_recording(recorder.record_file_name)
+    assert header.metadata["sample_period_ms"] == 1
+    assert len(records) > 10
+    assert np.all(records["erpm"] == 1234)
+    assert np.all(np.diff(records["timestamp"]) > 0)
+    assert np.all(np.isnan(records["simulated_time"]))
+    assert recorder.overflow_counts == [0]
+    os.remove(recorder.record_file_name)
+
+
+def test_buffer_overflow_is_counted():
+    recorder = EboardStateRecorder(Lock(), EboardKinematicState(), 1, buffer_capacity=4, flush_period_ms=10000)
+    recorder.start_recording()
+    time.sleep(0.1)
+    recorder.stop_recording()
+    assert len(open_recording(recorder.record_file_name)[1]) == 4
+    assert recorder.overflow_counts[0] > 0
+    os.remove(recorder.record_file_name)
+
+
+def test_columnar_recording():
+    eks = EboardKinematicState(erpm=4321)
+    recorder = EboardStateRecorder(Lock(), eks, 1, flush_period_ms=20, columnar_codec=ColumnarCodec.LZMA)
+    assert recorder.record_file_name.endswith(".bbcol")
+    recorder.start_recording()
+    time.sleep(0.1)
+    recorder.stop_recording()
+    reader = ColumnarRecordingReader(recorder.record_file_name)
+    assert reader.metadata["codec"] == "lzma"
+    records = reader.read(["erpm"])
+    assert len(records) > 10
+    assert np.all(records["erpm"] == 4321)
+    os.remove(recorder.record_file_name)
+
+
+def tick(listener, eks, ticks, time_step_sec=0.01, velocities=None):
+    for i in range(ticks):
+        if velocities is not None:
+            eks.velocity = velocities[i]
+        listener(eks, (i + 1) * time_step_sec, time_step_sec)
+
+
+def test_tick_synchronous_recording_with_decimation():
+    eks = EboardKinematicState(erpm=100)
+    recorder = EboardStateRecorder(Lock(), eks, 30, decimation=3)
+    listener = recorder.tick_listener()
+    tick(listener, eks, 5)
+    recorder.start_recording()
+    start = MissionElapsedTime().elapsed_time_sec
+    tick(listener, eks, 10)
+    end = MissionElapsedTime().elapsed_time_sec
+    recorder.stop_recording()
+    tick(listener, eks, 5)
+    header, records = open_recording(recorder.record_file_name)
+    assert header.metadata["clock"] == "mission_elapsed_time"
+    assert header.metadata["decimation"] == 3
+    # Ticks 1, 4, 7 and 10 of the recording are recorded with the simulated time of the tick.
+    assert np.allclose(records["simulated_time"], [0.01, 0.04, 0.07, 0.10])
+    # The timestamps are the mission elapsed times the ticks were recorded at, the clock of the logs.
+    assert np.all((records["timestamp"] >= start) & (records["timestamp"] <= end))
+    assert np.all(np.diff(records["timestamp"]) >= 0)
+    assert np.all(records["erpm"] == 100)
+    os.remove(recorder.record_file_name)
+
+
+def test_envelope_recording_keeps_the_peaks():
+    eks = EboardKinematicState()
+    recorder = EboardStateRecorder(Lock(), eks, 40, decimation=4, envelope=True)
+    listener = recorder.tick_listener()
+    recorder.start_recording()
+    tick(listener, eks, 8, velocities=[1.0, 9.0, 2.0, 3.0, 4.0, 4.0, -5.0, 4.0])
+    recorder.stop_recording()
+    records = open_recording(recorder.record_file_name)[1]
+    assert np.allclose(records["simulated_time"], [0.01, 0.04, 0.05, 0.08])
+    assert np.all(np.diff(records["timestamp"]) >= 0)
+    assert np.allclose(records["velocity"], [1.0, 9.0, -5.0, 4.0])
+    os.remove(recorder.record_file_name)
+
+
+def test_tick_listener_needs_a_tick_synchronous_recorder():
+    with pytest.raises(ValueError):
+        EboardStateRecorder(Lock(), EboardKinematicState(), 20).tick_listener()
+    with pytest.raises(ValueError):
+        EboardStateRecorder(Lock(), EboardKinematicState(), 20, decimation=1, envelope=True)
@@ -0,0 +1,58 @@
+import numpy as np
+import pytest
+from bionic_boarder_simulation_tool.riding.efficiency_map import EfficiencyMap
+
+
+@pytest.fixture
+def efficiency_map() -> EfficiencyMap:
+    return EfficiencyMap(
+        np.array([0.0, 10000.0, 20000.0]),
+        np.array([0.0, 1.0, 2.0]),
+        np.array(
+            [
+                [0.50, 0.60, 0.70],
+                [0.60, 0.80, 0.85],
+                [0.70, 0.90, 0.80],
+            ]
+        ),
+    )
+
+
+class TestEfficiencyMap:
+    def test_grid_points(self, efficiency_map: EfficiencyMap):
+        assert efficiency_map.efficiency(10000, 1.0) == pytest.approx(0.80)
+        assert efficiency_map.efficiency(20000, 2.0) == pytest.approx(0.80)
+
+    def test_bilinear_interpolation(self, efficiency_map: EfficiencyMap):
+        assert efficiency_map.efficiency(5000, 0.5) == pytest.approx((0.50 + 0.60 + 0.60 + 0.80) / 4)
+        assert efficiency_map.efficiency(15000, 1.0) == pytest.approx(0.85)
+
+    def test_negative_and_out_of_range_operating_points(self, efficiency_map: EfficiencyMap):
+        assert efficiency_map.efficiency(-10000, -1.0) == pytest.approx(0.80)
+        assert efficiency_map.efficiency(50000, 5.0) == pytest.approx(0.80)
+
+    def test_array_matches_scalar(self, efficiency_map: EfficiencyMap):
+        rng = np.random.default_rng(0)
+        erpm = rng.uniform(-25000, 25000, 1000)
+        torque_Nm = rng.uniform(-3, 3, 1000)
+        expected = [efficiency_map.efficiency(e, t) for e, t in zip(erpm, torque_Nm)]
+        assert np.allclose(efficiency_map.efficiency_array(erpm, torque_Nm), expected)
+
+    def test_from_csv(self, tmp_path):
+        csv_file = tmp_path / "efficiency_map.csv"
+        csv_file.write_text("erpm\\torque_Nm,0,2\n0,0.5,0.7\n20000,0.7,0.9\n")
+        efficiency_map = EfficiencyMap.from_csv(str(csv_file))
+        assert efficiency_map.grid.shape == (2, 2)
+        assert efficiency_map.efficiency(10000, 1.0) == pytest.approx(0.7)
+
+    def test_malformed_grids_raise(self, tmp_path):
+        with pytest.raises(ValueError):
+            EfficiencyMap(np.array([0.0, 0.0]), np.array([0.0, 1.0]), np.full((2, 2), 0.9))
+        with pytest.raises(ValueError):
+            EfficiencyMap(np.array([0.0, 1.0]), np.array([0.0, 1.0]), np.full((2, 3), 0.9))
+        with pytest.raises(ValueError):
+            EfficiencyMap(np.array([0.0, 1.0]), np.array([0.0, 1.0]), np.full((2, 2), 1.5))
+        csv_file = tmp_path / "efficiency_map.csv"
+        csv_file.write_text("erpm,0,2\n0,0.5\n20000,0.7,0.9\n")
+        with pytest.raises(ValueError):
+            EfficiencyMap.from_csv(str(csv_file))
@@ -163,3 +163,55 @@ class TestKinematicLoop:
         kloop.stop()
         assert eks.velocity == 2.5
         assert eks.motor_current > 0
+
+    def test_motor_torque_is_integrated_in_current_control(self, kloop: KinematicLoop, eks: EboardKinematicState):
+        mc_mock = MagicMock()
+        mc_mock.current_control_active = True
+        mc_mock.drive_current_control.return_value = 1.0
+        kloop.motor_controller = mc_mock
+        kloop.fixed_time_step_ms = 10
+        kloop.slope_range_bound_deg = 0
+        kloop.push_period_sec = 100
+        kloop.theta_slope_period_sec = 100
+        kloop.reset()
+        eks.motor_current = 20.0
+        eks.velocity = 2.5
+        kloop.step()
+        mc_mock.refresh_kinematic_state.assert_called_once()
+        mc_mock.drive_current_control.assert_called_once()
+        assert eks.velocity == pytest.approx(2.5 - 0.02 + 0.01)
+        assert eks.acceleration_x == pytest.approx(-0.1 + 1.0)
+        assert eks.erpm > 0
+
+    def test_tick_listeners_are_called_every_step(self, kloop: KinematicLoop, eks: EboardKinematicState):
+        ticks = []
+        kloop.add_tick_listener(lambda eks, sim_time_sec, time_step_sec: ticks.append((sim_time_sec, time_step_sec)))
+        kloop.fixed_time_step_ms = 10
+        kloop.slope_range_bound_deg = 0
+        kloop.push_period_sec = 100
+        kloop.theta_slope_period_sec = 100
+        kloop.reset()
+        kloop.step()
+        eks.motor_current = 20.0
+        kloop.step()
+        assert ticks == [(pytest.approx(0.01), 0.01), (pytest.approx(0.02), 0.01)]
+        assert kloop.sim_time_sec == pytest.approx(0.02)
+
+    def test_random_seed_repeats_slopes_and_pushes(self, eboard, eks, fdm_mock, pm_mock):
+        def run(seed: int) -> list:
+            kloop = KinematicLoop(eboard, eks, Lock(), fdm_mock, pm_mock)
+            kloop.random_seed = seed
+            kloop.fixed_time_step_ms = 10
+            kloop.slope_range_bound_deg = 10
+            kloop.push_period_sec = 0.05
+            kloop.theta_slope_period_sec = 0.05
+            kloop.reset()
+            slopes = []
+            for _ in range(20):
+                kloop.step()
+                slopes.append(kloop.current_theta_slope_deg)
+            return slopes + [call.args for call in pm_mock.setup.call_args_list]
+
+        first = run(42)
+        pm_mock.setup.reset_mock()
+        assert run(42) == first
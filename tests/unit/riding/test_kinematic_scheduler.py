@@ -0,0 +1,56 @@
+from bionic_boarder_simulation_tool.riding.kinematic_loop import KinematicLoop
+from bionic_boarder_simulation_tool.riding.kinematic_scheduler import KinematicScheduler
+from bionic_boarder_simulation_tool.riding.eboard import EBoard
+from bionic_boarder_simulation_tool.riding.frictional_deceleration_model import FrictionalDecelerationModel
+from bionic_boarder_simulation_tool.riding.push_model import PushModel
+from bionic_boarder_simulation_tool.riding.eboard_kinematic_state import EboardKinematicState
+from threading import Lock, Thread
+import time
+
+
+def create_kinematic_loop(eks: EboardKinematicState, fixed_time_step_ms: int) -> KinematicLoop:
+    eboard = EBoard(80, 0.5, 0.0508, 0, 0, 2, 0, 0, 0, 0, 7)
+    fdm = FrictionalDecelerationModel(0.01, 0.8, eboard)
+    kl = KinematicLoop(eboard, eks, Lock(), fdm, PushModel(eboard))
+    kl.fixed_time_step_ms = fixed_time_step_ms
+    kl.slope_range_bound_deg = 10
+    kl.push_period_sec = 100.0
+    kl.theta_slope_period_sec = 100.0
+    return kl
+
+
+def test_scheduler_steps_every_kinematic_loop():
+    states = [EboardKinematicState(velocity=10.0) for _ in range(5)]
+    scheduler = KinematicScheduler()
+    for eks in states:
+        scheduler.add(create_kinematic_loop(eks, 10))
+    assert len(scheduler.kinematic_loops) == 5
+    t = Thread(target=scheduler.run)
+    t.start()
+    time.sleep(0.2)
+    scheduler.stop()
+    t.join()
+    for eks in states:
+        assert eks.velocity < 10.0
+        assert eks.erpm > 0
+
+
+def test_scheduler_honors_each_fixed_time_step(mocker):
+    fast = mocker.MagicMock(spec=KinematicLoop)
+    fast.fixed_time_step_ms = 5
+    fast.stopped = False
+    slow = mocker.MagicMock(spec=KinematicLoop)
+    slow.fixed_time_step_ms = 20
+    slow.stopped = False
+    scheduler = KinematicScheduler()
+    scheduler.add(fast)
+    scheduler.add(slow)
+    t = Thread(target=scheduler.run)
+    t.start()
+    time.sleep(0.3)
+    scheduler.stop()
+    t.join()
+    fast.reset.assert_called_once()
+    slow.reset.assert_called_once()
+    assert fast.step.call_count > 3 * slow.step.call_count
+    assert 10 <= slow.step.call_count <= 17
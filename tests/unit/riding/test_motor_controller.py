@@ -1,9 +1,14 @@
 import pytest
+from bionic_boarder_simulation_tool.riding.battery_discharge_model import BatteryDischargeModel
 from bionic_boarder_simulation_tool.riding.frictional_deceleration_model import FrictionalDecelerationModel
-from bionic_boarder_simulation_tool.riding.motor_controller import MotorController
+from bionic_boarder_simulation_tool.riding.motor_controller import ErpmRampMode, MotorController
 from bionic_boarder_simulation_tool.riding.eboard import EBoard
+from bionic_boarder_simulation_tool.riding.efficiency_map import EfficiencyMap
+from bionic_boarder_simulation_tool.riding.thermal_model import ThermalModel, ThermalRC
+import numpy as np
 from bionic_boarder_simulation_tool.riding.eboard_kinematic_state import EboardKinematicState
 from threading import Lock
+import math
 import time
 
 
@@ -48,7 +53,7 @@ class TestMotorController:
         erpm_per_sec_2 = mc.erpm_per_sec
         assert erpm_per_sec_1 < erpm_per_sec_2
 
-    def test_erpm_and_current_control_threads_started_properly(self, eks: EboardKinematicState):
+    def test_erpm_control_thread_started_properly(self, eks: EboardKinematicState):
         eboard = EBoard(
             total_weight_with_rider_kg=80.0,
             frontal_area_of_rider_m2=0.5,
@@ -64,13 +69,10 @@ class TestMotorController:
         )
         fdm = FrictionalDecelerationModel(0.3, 0.5, eboard)
         mc = MotorController(eboard, eks, Lock(), fdm)
-        assert mc.current_sem._value == 1
-        assert mc.erpm_sem._value == 1
-        assert mc._MotorController__current_thread.is_alive() == False
+        assert mc.erpm_mailbox.sequence == 0
         assert mc._MotorController__erpm_thread.is_alive() == False
         mc.start()
         time.sleep(0.1)
-        assert mc._MotorController__current_thread.is_alive() == True
         assert mc._MotorController__erpm_thread.is_alive() == True
 
     def test_stop(self, eks: EboardKinematicState):
@@ -92,11 +94,9 @@ class TestMotorController:
         mc.control_time_step_ms = 20
         mc.start()
         time.sleep(0.1)
-        assert mc._MotorController__current_thread.is_alive() == True
         assert mc._MotorController__erpm_thread.is_alive() == True
         mc.stop()
         time.sleep(0.1)
-        assert mc._MotorController__current_thread.is_alive() == False
         assert mc._MotorController__erpm_thread.is_alive() == False
 
     def test_increase_motor_erpm(self, eks: EboardKinematicState):
@@ -120,7 +120,6 @@ class TestMotorController:
         mc.start()
         mc.target_erpm = 2000
         assert eks.erpm == 0
-        mc.erpm_sem.release()
         while eks.erpm < mc.target_erpm:
             pass
         assert eks.erpm >= mc.target_erpm
@@ -148,7 +147,6 @@ class TestMotorController:
         mc.start()
         mc.target_erpm = 2000
         assert eks.erpm == 0
-        mc.erpm_sem.release()
         while eks.erpm < mc.target_erpm:
             pass
         assert eks.erpm >= mc.target_erpm
@@ -156,7 +154,6 @@ class TestMotorController:
         time.sleep(0.1)
         assert eks.velocity == velocity_before
         mc.target_erpm = 1000
-        mc.erpm_sem.release()
         while eks.erpm > mc.target_erpm:
             pass
         assert eks.erpm <= mc.target_erpm
@@ -183,7 +180,205 @@ class TestMotorController:
         eks.motor_current = 10.0
         mc.target_current = 0.0
         mc.start()
-        mc.current_sem.release()
         time.sleep(0.1)
         assert eks.input_current == mc.target_current
         mc.stop()
+
+    def test_current_control_drives_motor(self, eks: EboardKinematicState):
+        eboard = EBoard(
+            total_weight_with_rider_kg=80.0,
+            frontal_area_of_rider_m2=0.5,
+            wheel_diameter_m=0.1,
+            battery_max_capacity_Ah=10.0,
+            battery_max_voltage=36.0,
+            gear_ratio=2.0,
+            motor_kv=190,
+            motor_max_torque=6.0,
+            motor_max_amps=50.0,
+            motor_max_power_watts=500.0,
+            motor_pole_pairs=7,
+        )
+        eks_lock = Lock()
+        fdm = FrictionalDecelerationModel(0.3, 0.5, eboard)
+        mc = MotorController(eboard, eks, eks_lock, fdm)
+        assert mc.current_control_active == False
+        mc.target_current = 20.0
+        assert mc.current_control_active == True
+        eks.erpm = 10000
+        with eks_lock:
+            acceleration_m_per_s2 = mc.drive_current_control()
+        kt_Nm_per_A = 60 / (2 * math.pi * eboard.motor_kv)
+        assert acceleration_m_per_s2 == pytest.approx(20.0 * kt_Nm_per_A * 2.0 / 0.05 / 80.0)
+        assert eks.motor_current == 20.0
+        mechanical_power = 20.0 * kt_Nm_per_A * 10000 * (2 * math.pi / 60) / 7
+        assert eks.input_current == pytest.approx(mechanical_power / (36.0 * 0.90 * 0.97))
+        mc.target_current = -1000.0
+        eks.erpm = 0
+        with eks_lock:
+            mc.drive_current_control()
+        assert eks.motor_current == -50.0
+        mc.target_erpm = 0
+        assert mc.current_control_active == False
+
+    def test_efficiency_map_sets_input_current(self, eks: EboardKinematicState):
+        eboard = EBoard(
+            total_weight_with_rider_kg=80.0,
+            frontal_area_of_rider_m2=0.5,
+            wheel_diameter_m=0.1,
+            battery_max_capacity_Ah=10.0,
+            battery_max_voltage=36.0,
+            gear_ratio=2.0,
+            motor_kv=190,
+            motor_max_torque=6.0,
+            motor_max_amps=50.0,
+            motor_max_power_watts=500.0,
+            motor_pole_pairs=7,
+        )
+        eks_lock = Lock()
+        fdm = FrictionalDecelerationModel(0.3, 0.5, eboard)
+        mc = MotorController(eboard, eks, eks_lock, fdm)
+        mc.efficiency_map = EfficiencyMap(np.array([0.0, 20000.0]), np.array([0.0, 5.0]), np.full((2, 2), 0.5))
+        mc.target_current = 20.0
+        eks.erpm = 10000
+        with eks_lock:
+            mc.drive_current_control()
+        kt_Nm_per_A = 60 / (2 * math.pi * eboard.motor_kv)
+        mechanical_power = 20.0 * kt_Nm_per_A * 10000 * (2 * math.pi / 60) / 7
+        assert eks.input_current == pytest.approx(mechanical_power / (36.0 * 0.5))
+        mc.efficiency_map = None
+        with eks_lock:
+            mc.drive_current_control()
+        assert eks.input_current == pytest.approx(mechanical_power / (36.0 * 0.90 * 0.97))
+
+    def test_input_current_is_drawn_at_the_battery_terminal_voltage(self, eks: EboardKinematicState):
+        eboard = EBoard(
+            total_weight_with_rider_kg=80.0,
+            frontal_area_of_rider_m2=0.5,
+            wheel_diameter_m=0.1,
+            battery_max_capacity_Ah=10.0,
+            battery_max_voltage=36.0,
+            gear_ratio=2.0,
+            motor_kv=190,
+            motor_max_torque=6.0,
+            motor_max_amps=50.0,
+            motor_max_power_watts=500.0,
+            motor_pole_pairs=7,
+        )
+        eks_lock = Lock()
+        fdm = FrictionalDecelerationModel(0.3, 0.5, eboard)
+        mc = MotorController(eboard, eks, eks_lock, fdm)
+        bdm = BatteryDischargeModel(36.0, 10.0, 0.1)
+        bdm.draw(10.0, 1800)
+        mc.battery_discharge_model = bdm
+        mc.target_current = 20.0
+        eks.erpm = 10000
+        with eks_lock:
+            mc.drive_current_control()
+        kt_Nm_per_A = 60 / (2 * math.pi * eboard.motor_kv)
+        mechanical_power = 20.0 * kt_Nm_per_A * 10000 * (2 * math.pi / 60) / 7
+        terminal_voltage = bdm.snapshot.terminal_voltage
+        assert terminal_voltage < 36.0
+        assert eks.input_current == pytest.approx(mechanical_power / (terminal_voltage * 0.90 * 0.97))
+
+    def test_thermal_derating_limits_motor_current(self, eks: EboardKinematicState):
+        eboard = EBoard(
+            total_weight_with_rider_kg=80.0,
+            frontal_area_of_rider_m2=0.5,
+            wheel_diameter_m=0.1,
+            battery_max_capacity_Ah=10.0,
+            battery_max_voltage=36.0,
+            gear_ratio=2.0,
+            motor_kv=190,
+            motor_max_torque=6.0,
+            motor_max_amps=50.0,
+            motor_max_power_watts=500.0,
+            motor_pole_pairs=7,
+        )
+        eks_lock = Lock()
+        fdm = FrictionalDecelerationModel(0.3, 0.5, eboard)
+        mc = MotorController(eboard, eks, eks_lock, fdm)
+        mc.thermal_model = ThermalModel(
+            ThermalRC(1.0, 1.0, 25.0), ThermalRC(1.0, 1.0, 92.5), 0.0, 0.0, current_derating=True
+        )
+        mc.target_current = 20.0
+        eks.erpm = 10000
+        with eks_lock:
+            mc.drive_current_control()
+        assert eks.motor_current == pytest.approx(10.0)
+        mc.thermal_model = None
+        with eks_lock:
+            mc.drive_current_control()
+        assert eks.motor_current == 20.0
+
+    def test_analytic_erpm_ramp(self, eks: EboardKinematicState):
+        eboard = EBoard(
+            total_weight_with_rider_kg=80.0,
+            frontal_area_of_rider_m2=0.5,
+            wheel_diameter_m=0.1,
+            battery_max_capacity_Ah=10.0,
+            battery_max_voltage=36.0,
+            gear_ratio=2.0,
+            motor_kv=190,
+            motor_max_torque=6.0,
+            motor_max_amps=50.0,
+            motor_max_power_watts=500.0,
+            motor_pole_pairs=7,
+        )
+        eks_lock = Lock()
+        fdm = FrictionalDecelerationModel(0.3, 0.5, eboard)
+        mc = MotorController(eboard, eks, eks_lock, fdm)
+        mc.control_time_step_ms = 20
+        mc.erpm_ramp_mode = ErpmRampMode.ANALYTIC
+        mc.start()
+        assert mc._MotorController__erpm_thread.is_alive() == False
+        target_erpm = int(mc.erpm_per_sec * 0.2)
+        mc.target_erpm = target_erpm
+        time.sleep(0.1)
+        mc.refresh_kinematic_state()
+        assert 0 < eks.erpm < target_erpm
+        assert eks.velocity > 0
+        assert eks.acceleration_x > 0
+        assert eks.motor_current > 0
+        time.sleep(0.15)
+        mc.refresh_kinematic_state()
+        assert eks.erpm == target_erpm
+        velocity_before = eks.velocity
+        time.sleep(0.05)
+        mc.refresh_kinematic_state()
+        assert eks.velocity == velocity_before
+        mc.target_current = 0.0
+        time.sleep(0.05)
+        assert eks.motor_current == 0.0
+        mc.stop()
+
+    @pytest.mark.parametrize("erpm_ramp_mode", [ErpmRampMode.THREAD, ErpmRampMode.ANALYTIC])
+    def test_target_erpm_after_target_current_takes_effect(
+        self, eks: EboardKinematicState, erpm_ramp_mode: ErpmRampMode
+    ):
+        eboard = EBoard(
+            total_weight_with_rider_kg=80.0,
+            frontal_area_of_rider_m2=0.5,
+            wheel_diameter_m=0.1,
+            battery_max_capacity_Ah=10.0,
+            battery_max_voltage=36.0,
+            gear_ratio=2.0,
+            motor_kv=190,
+            motor_max_torque=6.0,
+            motor_max_amps=50.0,
+            motor_max_power_watts=500.0,
+            motor_pole_pairs=7,
+        )
+        eks_lock = Lock()
+        fdm = FrictionalDecelerationModel(0.3, 0.5, eboard)
+        mc = MotorController(eboard, eks, eks_lock, fdm)
+        mc.control_time_step_ms = 20
+        mc.erpm_ramp_mode = erpm_ramp_mode
+        mc.start()
+        mc.target_current = 20.0
+        mc.target_erpm = 3000
+        deadline = time.monotonic() + 5.0
+        while eks.erpm < 3000 and time.monotonic() < deadline:
+            mc.refresh_kinematic_state()
+        assert mc.current_control_active == False
+        assert eks.erpm >= 3000
+        mc.stop()
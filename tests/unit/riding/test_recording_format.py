@@ -0,0 +1,80 @@
+import json
+import os
+import numpy as np
+import pytest
+from bionic_boarder_simulation_tool.riding.recording_format import (
+    HEADER_PREFIX,
+    LEGACY_RECORD_DTYPE,
+    PAYLOAD_ALIGNMENT,
+    RECORD_DTYPE,
+    RECORDING_FORMAT_VERSION,
+    RECORDING_MAGIC,
+    open_recording,
+    read_recording_header,
+    write_recording_header,
+)
+
+LEGACY_RECORDING = os.path.join(
+    os.path.dirname(__file__), "..", "..", "..", "analysis", "data", "sim_data_recording_2025-03-25_16-39-53.bin"
+)
+
+
+def write_recording(file_name, records, metadata):
+    with open(file_name, "wb") as file:
+        payload_offset = write_recording_header(file, records.dtype, metadata)
+        file.write(records.tobytes())
+    return payload_offset
+
+
+def test_header_describes_the_recording(tmp_path):
+    records = np.zeros(10, dtype=RECORD_DTYPE)
+    records["erpm"] = np.arange(10)
+    file_name = str(tmp_path / "recording.bin")
+    payload_offset = write_recording(file_name, records, {"sample_period_ms": 20, "random_seed": 7})
+    assert payload_offset % PAYLOAD_ALIGNMENT == 0
+    header = read_recording_header(file_name)
+    assert header.format_version == RECORDING_FORMAT_VERSION
+    assert header.dtype == RECORD_DTYPE
+    assert header.payload_offset == payload_offset
+    assert header.metadata["sample_period_ms"] == 20
+    assert header.metadata["random_seed"] == 7
+    assert header.metadata["record_size"] == RECORD_DTYPE.itemsize
+    _, mapped = open_recording(file_name)
+    assert isinstance(mapped, np.memmap)
+    assert mapped["erpm"].tolist() == list(range(10))
+
+
+def test_any_record_layout_is_read_from_the_header(tmp_path):
+    records = np.array([(1.5, 3), (2.5, 4)], dtype=[("time", "<f8"), ("count", "<i2")])
+    file_name = str(tmp_path / "recording.bin")
+    write_recording(file_name, records, {})
+    _, mapped = open_recording(file_name)
+    assert mapped.dtype.names == ("time", "count")
+    assert mapped["count"].tolist() == [3, 4]
+
+
+def test_partial_last_record_and_empty_payload(tmp_path):
+    file_name = str(tmp_path / "recording.bin")
+    write_recording(file_name, np.zeros(0, dtype=RECORD_DTYPE), {})
+    assert len(open_recording(file_name)[1]) == 0
+    with open(file_name, "ab") as file:
+        file.write(np.zeros(2, dtype=RECORD_DTYPE).tobytes()[:-5])
+    assert len(open_recording(file_name)[1]) == 1
+
+
+def test_legacy_recording_without_header():
+    header, records = open_recording(LEGACY_RECORDING)
+    assert header.format_version == 0
+    assert header.payload_offset == 0
+    assert header.dtype == LEGACY_RECORD_DTYPE
+    assert len(records) == os.path.getsize(LEGACY_RECORDING) // LEGACY_RECORD_DTYPE.itemsize
+    assert np.all(np.diff(records["timestamp"]) > 0)
+
+
+def test_newer_format_version_raises(tmp_path):
+    file_name = str(tmp_path / "recording.bin")
+    metadata = json.dumps({"fields": [["timestamp", "<f8"]]}).encode()
+    with open(file_name, "wb") as file:
+        file.write(HEADER_PREFIX.pack(RECORDING_MAGIC, RECORDING_FORMAT_VERSION + 1, 0, len(metadata)) + metadata)
+    with pytest.raises(ValueError):
+        read_recording_header(file_name)
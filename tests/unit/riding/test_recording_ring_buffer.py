@@ -0,0 +1,37 @@
+import io
+import numpy as np
+import pytest
+from bionic_boarder_simulation_tool.riding.recording_ring_buffer import RecordingRingBuffer
+
+DTYPE = np.dtype([("timestamp", "<f8"), ("erpm", "<i4"), ("velocity", "<f4")])
+
+
+def test_flush_writes_records_in_order_across_the_wrap():
+    buffer = RecordingRingBuffer(DTYPE, 4)
+    file = io.BytesIO()
+    for i in range(3):
+        assert buffer.append((i, i, i))
+    assert buffer.flush(file) == 3
+    for i in range(3, 7):
+        assert buffer.append((i, i, i))
+    assert buffer.pending_count == 4
+    assert buffer.flush(file) == 4
+    assert buffer.flush(file) == 0
+    records = np.frombuffer(file.getvalue(), dtype=DTYPE)
+    assert records["erpm"].tolist() == list(range(7))
+
+
+def test_full_buffer_drops_and_counts_records():
+    buffer = RecordingRingBuffer(DTYPE, 2)
+    assert buffer.append((0, 0, 0))
+    assert buffer.append((1, 1, 1))
+    assert not buffer.append((2, 2, 2))
+    assert buffer.overflow_count == 1
+    file = io.BytesIO()
+    buffer.flush(file)
+    assert np.frombuffer(file.getvalue(), dtype=DTYPE)["erpm"].tolist() == [0, 1]
+
+
+def test_capacity_must_be_positive():
+    with pytest.raises(ValueError):
+        RecordingRingBuffer(DTYPE, 0)
@@ -0,0 +1,43 @@
+from threading import Thread
+import time
+from bionic_boarder_simulation_tool.riding.setpoint_mailbox import SetpointMailbox
+
+
+def test_latest_setpoint_wins():
+    mailbox = SetpointMailbox(0)
+    assert mailbox.poll() is None
+    mailbox.post(1000)
+    mailbox.post(2000)
+    assert mailbox.post(3000) == 3
+    setpoint = mailbox.take()
+    assert setpoint.value == 3000
+    assert setpoint.sequence == 3
+    assert setpoint.coalesced == 2
+    assert mailbox.coalesced_count == 2
+    assert mailbox.poll() is None
+    assert mailbox.value == 3000
+
+
+def test_take_wakes_once_per_change():
+    mailbox = SetpointMailbox()
+    taken = []
+
+    def control():
+        while (setpoint := mailbox.take()) is not None:
+            taken.append(setpoint.value)
+
+    thread = Thread(target=control)
+    thread.start()
+    mailbox.post(1)
+    time.sleep(0.05)
+    mailbox.post(2)
+    time.sleep(0.05)
+    mailbox.close()
+    thread.join(timeout=1.0)
+    assert not thread.is_alive()
+    assert taken == [1, 2]
+
+
+def test_take_times_out():
+    mailbox = SetpointMailbox()
+    assert mailbox.take(timeout_sec=0.01) is None
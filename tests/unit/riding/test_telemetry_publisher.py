@@ -0,0 +1,100 @@
+import socket
+import numpy as np
+import pytest
+from bionic_boarder_simulation_tool.riding.eboard_kinematic_state import EboardKinematicState
+from bionic_boarder_simulation_tool.riding.recording_format import LEGACY_RECORD_DTYPE
+from bionic_boarder_simulation_tool.riding.telemetry_publisher import (
+    TELEMETRY_HEADER,
+    TELEMETRY_MAGIC,
+    TelemetryPublisher,
+    TelemetryTransport,
+    decode_telemetry_datagram,
+)
+
+
+def receive_all(client):
+    datagrams = []
+    client.settimeout(0.5)
+    try:
+        while True:
+            datagrams.append(decode_telemetry_datagram(client.recv(65536)))
+    except socket.timeout:
+        pass
+    return datagrams
+
+
+def tick(listener, eks, ticks):
+    for i in range(ticks):
+        eks.erpm = i
+        listener(eks, (i + 1) * 0.001, 0.001)
+
+
+def test_publish_over_udp():
+    client = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+    client.bind(("127.0.0.1", 0))
+    host, port = client.getsockname()
+    publisher = TelemetryPublisher(TelemetryTransport.UDP, f"{host}:{port}", number_of_boards=2, decimation=2)
+    listeners = [publisher.tick_listener(0), publisher.tick_listener(1)]
+    publisher.start()
+    tick(listeners[0], EboardKinematicState(), 200)
+    tick(listeners[1], EboardKinematicState(), 10)
+    publisher.stop()
+    datagrams = receive_all(client)
+    client.close()
+    board0 = [(sequence, samples) for board_index, sequence, samples in datagrams if board_index == 0]
+    assert [sequence for sequence, _ in board0] == list(range(len(board0)))
+    samples = np.concatenate([samples for _, samples in board0])
+    assert np.array_equal(samples["erpm"], np.arange(0, 200, 2))
+    assert np.allclose(samples["simulated_time"], np.arange(1, 201, 2) * 0.001)
+    assert sum(len(samples) for board_index, _, samples in datagrams if board_index == 1) == 5
+    assert publisher.sent_datagrams == len(datagrams)
+    assert publisher.dropped_datagrams == 0
+
+
+def test_publish_over_a_unix_socket(tmp_path):
+    path = str(tmp_path / "telemetry.sock")
+    client = socket.socket(socket.AF_UNIX, socket.SOCK_DGRAM)
+    client.bind(path)
+    publisher = TelemetryPublisher(TelemetryTransport.UNIX, path)
+    listener = publisher.tick_listener()
+    tick(listener, EboardKinematicState(), 5)
+    publisher.start()
+    tick(listener, EboardKinematicState(), 50)
+    publisher.stop()
+    datagrams = receive_all(client)
+    client.close()
+    # Ticks before the publisher started are not published.
+    assert np.array_equal(np.concatenate([samples for _, _, samples in datagrams])["erpm"], np.arange(50))
+
+
+def test_publishing_never_blocks(tmp_path):
+    publisher = TelemetryPublisher(
+        TelemetryTransport.UNIX, str(tmp_path / "nobody_listens.sock"), buffer_capacity=16, publish_period_ms=10000
+    )
+    listener = publisher.tick_listener()
+    publisher.start()
+    tick(listener, EboardKinematicState(), 100)
+    publisher.stop()
+    assert publisher.overflow_counts == [84]
+    assert publisher.sent_datagrams == 0
+    assert publisher.dropped_datagrams == 1
+
+
+def test_decode_rejects_other_datagrams():
+    with pytest.raises(ValueError):
+        decode_telemetry_datagram(b"short")
+    with pytest.raises(ValueError):
+        decode_telemetry_datagram(bytes(64))
+
+
+def test_decode_version_1_datagrams():
+    legacy = np.zeros(2, dtype=LEGACY_RECORD_DTYPE)
+    legacy["timestamp"] = [0.5, 0.6]
+    legacy["erpm"] = [100, 200]
+    board_index, sequence, samples = decode_telemetry_datagram(
+        TELEMETRY_HEADER.pack(TELEMETRY_MAGIC, 1, 3, 2, 0, 7) + legacy.tobytes()
+    )
+    assert (board_index, sequence) == (3, 7)
+    assert samples["erpm"].tolist() == [100, 200]
+    assert samples["simulated_time"].tolist() == [0.5, 0.6]
+    assert np.all(np.isnan(samples["timestamp"]))
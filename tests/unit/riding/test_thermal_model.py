@@ -0,0 +1,52 @@
+import math
+import pytest
+from bionic_boarder_simulation_tool.riding.eboard_kinematic_state import EboardKinematicState
+from bionic_boarder_simulation_tool.riding.thermal_model import ThermalModel, ThermalRC
+
+
+class TestThermalRC:
+    def test_exact_exponential_step(self):
+        rc = ThermalRC(thermal_resistance_K_per_W=2.0, time_constant_sec=10.0, ambient_temp_C=25.0)
+        assert rc.step(10.0, 10.0) == pytest.approx(45.0 - 20.0 * math.exp(-1.0))
+
+    def test_coarse_and_fine_steps_agree(self):
+        coarse = ThermalRC(2.0, 10.0, 25.0)
+        fine = ThermalRC(2.0, 10.0, 25.0)
+        coarse.step(10.0, 5.0)
+        for _ in range(500):
+            fine.step(10.0, 0.01)
+        assert coarse.temp_C == pytest.approx(fine.temp_C)
+
+    def test_large_step_is_stable(self):
+        rc = ThermalRC(2.0, 1.0, 25.0)
+        assert rc.step(10.0, 1000.0) == pytest.approx(45.0)
+        assert rc.step(0.0, 1000.0) == pytest.approx(25.0)
+
+
+class TestThermalModel:
+    def test_ticks_update_at_the_update_period(self):
+        model = ThermalModel.default()
+        eks = EboardKinematicState(0, 0, 0, 0, 0, 0, 0, 0, 0, 0)
+        eks.motor_current = 50.0
+        for i in range(9):
+            model.on_kinematic_tick(eks, (i + 1) * 0.01, 0.01)
+        assert model.snapshot.temp_motor_C == 25.0
+        model.on_kinematic_tick(eks, 0.1, 0.01)
+        assert model.snapshot.temp_fet_C > 25.0
+        assert model.snapshot.temp_motor_C > 25.0
+        assert model.snapshot.current_limit_scale == 1.0
+
+    def test_current_derating(self):
+        model = ThermalModel(
+            ThermalRC(1.0, 1.0, 25.0),
+            ThermalRC(1.0, 1.0, 25.0),
+            fet_resistance_ohm=0.0,
+            motor_resistance_ohm=1.0,
+            current_derating=True,
+        )
+        assert model.snapshot.current_limit_scale == 1.0
+        model.update(67.5, 1000.0)
+        assert model.snapshot.temp_motor_C == pytest.approx(92.5)
+        assert model.snapshot.current_limit_scale == pytest.approx(0.5)
+        model.update(200.0, 1000.0)
+        assert model.snapshot.current_limit_scale == 0.0
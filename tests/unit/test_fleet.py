@@ -0,0 +1,91 @@
+import json
+import os
+import socket
+import time
+import numpy as np
+from bionic_boarder_simulation_tool.app_input_arguments import load_app_input_arguments
+from bionic_boarder_simulation_tool.fleet import Fleet
+from bionic_boarder_simulation_tool.riding.recording_format import open_recording
+from bionic_boarder_simulation_tool.vesc.fw_6_00 import FirmwareMessage
+
+NUMBER_OF_BOARDS = 3
+
+
+def create_fleet() -> Fleet:
+    script_dir = os.path.dirname(__file__)
+    with open(os.path.join(script_dir, "../app_input_arguments_example.json"), "r") as data_file:
+        data = json.load(data_file)
+    data["transport"] = "tcp"
+    data["com_port"] = "127.0.0.1:0"
+    return Fleet([load_app_input_arguments(data) for _ in range(NUMBER_OF_BOARDS)])
+
+
+def test_every_board_answers_on_its_own_transport():
+    fleet = create_fleet()
+    assert len(fleet.boards) == NUMBER_OF_BOARDS
+    assert len(fleet.scheduler.kinematic_loops) == NUMBER_OF_BOARDS
+    addresses = {board.transport.address for board in fleet.boards}
+    assert len(addresses) == NUMBER_OF_BOARDS
+    fleet.start()
+    buffer = FirmwareMessage().buffer
+    for address in addresses:
+        host, port = address.split(":")
+        client = socket.create_connection((host, int(port)))
+        client.sendall(bytes([2, 1, FirmwareMessage.ID]) + bytes(253))
+        response = bytearray()
+        while len(response) < len(buffer) + 5:
+            response += client.recv(1024)
+        assert bytes(response[2:-3]) == buffer
+        client.close()
+    fleet.stop()
+
+
+def test_fleet_shares_one_recorder():
+    fleet = create_fleet()
+    fleet.start()
+    recorder = fleet.create_recorder(20)
+    assert len(recorder.record_file_names) == NUMBER_OF_BOARDS
+    recorder.start_recording()
+    time.sleep(0.1)
+    recorder.stop_recording()
+    fleet.stop()
+    time.sleep(0.05)
+    for file_name in recorder.record_file_names:
+        assert os.path.getsize(file_name) > 0
+        os.remove(file_name)
+
+
+def test_fleet_records_every_tick():
+    fleet = create_fleet()
+    recorder = fleet.create_recorder(20, decimation=1)
+    fleet.start()
+    recorder.start_recording()
+    time.sleep(0.2)
+    recorder.stop_recording()
+    fleet.stop()
+    time_step_sec = fleet.boards[0].app_input_arguments.fixed_time_step_ms / 1000.0
+    for file_name in recorder.record_file_names:
+        header, records = open_recording(file_name)
+        assert header.metadata["sample_period_ms"] == fleet.boards[0].app_input_arguments.fixed_time_step_ms
+        assert len(records) > 1
+        assert np.allclose(np.diff(records["simulated_time"]), time_step_sec)
+        os.remove(file_name)
+
+
+def test_missed_heartbeat_stops_only_its_board():
+    fleet = create_fleet()
+    ticks = [0] * NUMBER_OF_BOARDS
+    for i, board in enumerate(fleet.boards):
+        board.kinematic_loop.add_tick_listener(lambda eks, t, dt, i=i: ticks.__setitem__(i, ticks[i] + 1))
+    fleet.start()
+    cmp = fleet.boards[0].vesc_command_message_processor
+    cmp.set_heartbeat_timeout_sec(0.05)
+    cmp.heartbeat()
+    time.sleep(0.2)
+    assert cmp.heartbeat_watchdog.expired
+    assert [board.kinematic_loop.stopped for board in fleet.boards] == [True, False, False]
+    stopped_ticks = list(ticks)
+    time.sleep(0.1)
+    assert ticks[0] == stopped_ticks[0]
+    assert all(ticks[i] > stopped_ticks[i] for i in range(1, NUMBER_OF_BOARDS))
+    fleet.stop()
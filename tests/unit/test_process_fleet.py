@@ -0,0 +1,28 @@
+import json
+import os
+import time
+from bionic_boarder_simulation_tool.app_input_arguments import load_app_input_arguments
+from bionic_boarder_simulation_tool.process_fleet import ProcessFleet
+
+NUMBER_OF_BOARDS = 3
+
+
+def test_supervisor_mirrors_every_board():
+    script_dir = os.path.dirname(__file__)
+    with open(os.path.join(script_dir, "../app_input_arguments_example.json"), "r") as data_file:
+        data = json.load(data_file)
+    data["transport"] = "tcp"
+    data["com_port"] = "127.0.0.1:0"
+    fleet = ProcessFleet([load_app_input_arguments(data) for _ in range(NUMBER_OF_BOARDS)], 2, monitor_period_ms=20)
+    assert fleet.number_of_workers == 2
+    fleet.start()
+    deadline = time.monotonic() + 10.0
+    while time.monotonic() < deadline and (fleet.snapshot()["sequence"] == 0).any():
+        time.sleep(0.05)
+    states = fleet.snapshot()
+    assert (states["sequence"] > 0).all()
+    assert (states["sequence"] % 2 == 0).all()
+    time.sleep(0.1)
+    assert fleet.summary["number_of_boards"] == NUMBER_OF_BOARDS
+    assert fleet.stale_boards == set()
+    fleet.stop()
@@ -0,0 +1,44 @@
+import pytest
+from bionic_boarder_simulation_tool.riding.eboard_kinematic_state import EboardKinematicState
+from bionic_boarder_simulation_tool.shared_kinematic_state import KINEMATIC_STATE_FIELDS, SharedKinematicStateBlock
+
+
+@pytest.fixture
+def block():
+    block = SharedKinematicStateBlock(3)
+    yield block
+    block.close()
+
+
+def test_publish_and_snapshot(block):
+    eks = EboardKinematicState()
+    eks.velocity = 4.5
+    eks.erpm = 12000
+    eks.motor_current = 7.25
+    block.publish(1, eks, 2.0)
+    states = block.snapshot()
+    assert states["sequence"].tolist() == [0, 2, 0]
+    assert states["timestamp"][1] == 2.0
+    assert states["velocity"][1] == 4.5
+    assert states["erpm"][1] == 12000
+    assert states["motor_current"][1] == 7.25
+
+
+def test_attach_by_name(block):
+    eks = EboardKinematicState()
+    eks.pitch = 3.0
+    other = SharedKinematicStateBlock(block.number_of_boards, block.name)
+    other.publish(2, eks, 1.0)
+    other.close()
+    assert block.snapshot()["pitch"][2] == 3.0
+
+
+def test_copy_to_kinematic_state(block):
+    eks = EboardKinematicState()
+    for i, field_name in enumerate(KINEMATIC_STATE_FIELDS):
+        setattr(eks, field_name, i + 1)
+    block.publish(0, eks, 0.0)
+    copy = EboardKinematicState()
+    SharedKinematicStateBlock.copy_to_kinematic_state(block.snapshot()[0], copy)
+    for i, field_name in enumerate(KINEMATIC_STATE_FIELDS):
+        assert getattr(copy, field_name) == i + 1
@@ -0,0 +1,48 @@
+import json
+import os
+import socket
+import pytest
+from bionic_boarder_simulation_tool.app_input_arguments import AppInputArguments, load_app_input_arguments
+from bionic_boarder_simulation_tool.simulated_board import SimulatedBoard
+from bionic_boarder_simulation_tool.vesc.fw_6_02 import FW6_02CMP
+from bionic_boarder_simulation_tool.vesc.traffic_capture import read_capture
+
+
+@pytest.fixture
+def app_input_json():
+    script_dir = os.path.dirname(__file__)
+    with open(os.path.join(script_dir, "../app_input_arguments_example.json"), "r") as data_file:
+        data = json.load(data_file)
+    data["transport"] = "tcp"
+    data["com_port"] = "127.0.0.1:0"
+    return data
+
+
+def test_simulated_board_is_built_from_app_inputs(app_input_json):
+    app_input_json["vesc_fw"] = "6.02"
+    board = SimulatedBoard(load_app_input_arguments(app_input_json), "board7")
+    assert board.name == "board7"
+    assert isinstance(board.vesc_command_message_processor, FW6_02CMP)
+    assert board.kinematic_loop.fixed_time_step_ms == app_input_json["fixed_time_step_ms"]
+    assert board.motor_controller.control_time_step_ms == int(app_input_json["control_time_step_sec"] * 1000)
+    assert board.eboard.motor_kv == app_input_json["motor_kv"]
+    assert board.transport.address.startswith("127.0.0.1:")
+    board.transport.close()
+
+
+def test_stopping_the_board_finishes_its_traffic_capture(app_input_json, tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    board = SimulatedBoard(load_app_input_arguments(app_input_json), "board0", capture_traffic=True)
+    host, port = board.transport.address.split(":")
+    client = socket.create_connection((host, int(port)))
+    board.transport.write(b"frame")
+    board.stop()
+    assert [bytes(f.data) for f in read_capture(board.transport.capture_file_name)] == [b"frame"]
+    client.close()
+    board.transport.close()
+
+
+def test_unknown_firmware_version_raises(app_input_json):
+    app_input_json["vesc_fw"] = "5.03"
+    with pytest.raises(ValueError):
+        SimulatedBoard(AppInputArguments(**app_input_json))
@@ -2,6 +2,7 @@ import pytest
 from bionic_boarder_simulation_tool.vesc.command_message_processor import (
     CommandMessageProcessor,
 )
+from bionic_boarder_simulation_tool.vesc.values_message import ValuesMessage
 
 
 class TestCommandMessageProcessor(CommandMessageProcessor):
@@ -35,6 +36,9 @@ class TestCommandMessageProcessor(CommandMessageProcessor):
     def _publish_motor_controller_configuration(self):
         pass
 
+    def _values_message(self):
+        return ValuesMessage()
+
     def _update_current(self, command):
         pass
 
@@ -113,3 +117,45 @@ def test_command_id_names(processor):
     assert processor._command_id_name[5] == CommandMessageProcessor.FIRMWARE
     assert processor._command_id_name[7] == CommandMessageProcessor.BIONIC_BOARDER
     assert processor._command_id_name[8] == CommandMessageProcessor.MOTOR_CONTROLLER_CONFIGURATION
+
+
+def test_heartbeat_starts_single_watchdog(processor):
+    processor.set_heartbeat_timeout_sec(2.0)
+    assert processor.heartbeat_watchdog is None
+    processor.heartbeat()
+    watchdog = processor.heartbeat_watchdog
+    assert watchdog.running == True
+    processor.heartbeat()
+    assert processor.heartbeat_watchdog is watchdog
+    assert watchdog.heartbeat_count == 2
+    watchdog.stop()
+
+
+def test_unknown_command_is_counted(processor):
+    with pytest.raises(StopIteration):
+        processor.handle_command()
+    assert processor.unknown_command_count == 1
+    assert processor.command_counters()[CommandMessageProcessor.FIRMWARE].calls == 0
+
+
+def test_command_counters(processor, mocker, mock_serial):
+    mock_serial.return_value.read.side_effect = [b"a", b"b", b"c", StopIteration()]
+    mocker.patch.object(processor, "_update_rpm", autospec=True, side_effect=[None, ValueError(), None])
+    mocker.patch.object(processor, "_get_command_id", return_value=3)
+    with pytest.raises(StopIteration):
+        processor.handle_command()
+    counters = processor.command_counters()[CommandMessageProcessor.RPM]
+    assert counters.calls == 3
+    assert counters.errors == 1
+    assert counters.handler_time_sec > 0
+
+
+def test_read_and_decode_errors_are_counted(processor, mocker, mock_serial):
+    mocker.patch.object(CommandMessageProcessor, "READ_ERROR_PAUSE_SEC", 0.0)
+    mock_serial.return_value.read.side_effect = [OSError("unplugged"), b"a", b"b", StopIteration()]
+    mocker.patch.object(processor, "_update_rpm", autospec=True)
+    mocker.patch.object(processor, "_get_command_id", side_effect=[IndexError(), 3])
+    with pytest.raises(StopIteration):
+        processor.handle_command()
+    assert processor.receive_error_count == 2
+    assert processor.command_counters()[CommandMessageProcessor.RPM].calls == 1
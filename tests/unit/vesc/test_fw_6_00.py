@@ -6,6 +6,7 @@ from bionic_boarder_simulation_tool.vesc.fw_6_00 import (
     MotorControllerConfigurationMessage,
     BionicBoarderMessage,
     FW6_00CMP,
+    ValuesMessage,
 )
 from math import ldexp
 import struct
@@ -327,3 +328,68 @@ def test_update_rpm(mock_serial):
         pass
     assert eks.erpm <= mc.target_erpm
     mc.stop()
+
+
+
+def test_update_rpm_in_reverse(mock_serial):
+    eks = EboardKinematicState(0, 0, 0, 0, 0, 0, 0, 0, 0, 0)
+    eks_lock = Lock()
+    eb = EBoard(80.0, 0.5, 0.1, 10.0, 36.0, 2.0, 190, 6.0, 50.0, 500.0, 7)
+    mc = MotorController(eb, eks, eks_lock, FrictionalDecelerationModel(mu_rolling=0.01, c_drag=0.8, eboard=eb))
+    cmp = FW6_00CMP("COM1", 230400, 8, eb, eks, eks_lock, BatteryDischargeModel(42.0), mc)
+    cmp._update_rpm(bytes(3) + (-1000).to_bytes(4, "big", signed=True))
+    assert mc.target_erpm == -1000
+
+def test_update_current(mock_serial):
+    eks = EboardKinematicState(0, 0, 0, 0, 0, 0, 0, 0, 0, 0)
+    eks_lock = Lock()
+    eb = EBoard(
+        total_weight_with_rider_kg=80.0,
+        frontal_area_of_rider_m2=0.5,
+        wheel_diameter_m=0.1,
+        battery_max_capacity_Ah=10.0,
+        battery_max_voltage=36.0,
+        gear_ratio=2.0,
+        motor_kv=190,
+        motor_max_torque=6.0,
+        motor_max_amps=50.0,
+        motor_max_power_watts=500.0,
+        motor_pole_pairs=7,
+    )
+    fdm = FrictionalDecelerationModel(mu_rolling=0.01, c_drag=0.8, eboard=eb)
+    mc = MotorController(eb, eks, eks_lock, fdm)
+    cmp = FW6_00CMP("COM1", 230400, 8, None, eks, eks_lock, BatteryDischargeModel(42.0), mc)
+    command = bytes(3) + (-2500).to_bytes(4, "big", signed=True)
+    cmp._update_current(command)
+    assert mc.target_current == -2.5
+    command = bytes(3) + (2000).to_bytes(4, "big", signed=True)
+    cmp._update_current(command)
+    assert mc.target_current == 2.0
+    mc.stop()
+
+
+def test_values_selective_command(mock_serial):
+    eks = EboardKinematicState(0, 0, 0, 0, 0, 0, 0, 4200, 3.5, 10.0)
+    eb = EBoard(80.0, 0.5, 0.1, 10.0, 36.0, 2.0, 190, 6.0, 50.0, 500.0, 7)
+    cmp = FW6_00CMP("COM1", 230400, 256, eb, eks, Lock(), BatteryDischargeModel(36.0), None)
+    mask = 1 << 7
+    cmp._publish_values_selective(bytes([2, 5, ValuesMessage.SELECTIVE_ID]) + mask.to_bytes(4, "big"))
+    data = mock_serial.return_value.write.call_args.args[0]
+    assert data[2] == ValuesMessage.SELECTIVE_ID
+    assert struct.unpack(">Ii", data[3:11]) == (mask, 4200)
+    assert len(data) == 2 + 9 + 3
+
+
+def test_values_report_the_battery_state(mock_serial):
+    eks = EboardKinematicState(0, 0, 0, 0, 0, 0, 0, 4200, 3.5, 10.0)
+    eb = EBoard(80.0, 0.5, 0.1, 10.0, 36.0, 2.0, 190, 6.0, 50.0, 500.0, 7)
+    bdm = BatteryDischargeModel(36.0, 10.0, 0.1)
+    bdm.draw(10.0, 360)
+    cmp = FW6_00CMP("COM1", 230400, 256, eb, eks, Lock(), bdm, None)
+    mask = (1 << 8) | (1 << 9) | (1 << 11)
+    cmp._publish_values_selective(bytes([2, 5, ValuesMessage.SELECTIVE_ID]) + mask.to_bytes(4, "big"))
+    data = mock_serial.return_value.write.call_args.args[0]
+    input_voltage, amp_hours, watt_hours = struct.unpack(">hii", data[7:17])
+    assert input_voltage == int(bdm.snapshot.terminal_voltage * 1e1)
+    assert amp_hours == int(1.0 * 1e4)
+    assert watt_hours == int(bdm.snapshot.watt_hours * 1e4)
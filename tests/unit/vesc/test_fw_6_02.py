@@ -6,6 +6,7 @@ from bionic_boarder_simulation_tool.vesc.fw_6_02 import (
     MotorControllerConfigurationMessage,
     BionicBoarderMessage,
     FW6_02CMP,
+    ValuesMessage,
 )
 from bionic_boarder_simulation_tool.riding.battery_discharge_model import BatteryDischargeModel
 from bionic_boarder_simulation_tool.riding.eboard_kinematic_state import EboardKinematicState
@@ -330,3 +331,15 @@ class TestFW6_02CMP:
             pass
         assert eks.erpm <= mc.target_erpm
         mc.stop()
+
+
+def test_values_selective_command(mock_serial):
+    eks = EboardKinematicState(0, 0, 0, 0, 0, 0, 0, 4200, 3.5, 10.0)
+    eb = EBoard(80.0, 0.5, 0.1, 10.0, 36.0, 2.0, 190, 6.0, 50.0, 500.0, 7)
+    cmp = FW6_02CMP("COM1", 230400, 256, eb, eks, Lock(), BatteryDischargeModel(36.0), None)
+    mask = 1 << 7
+    cmp._publish_values_selective(bytes([2, 5, ValuesMessage.SELECTIVE_ID]) + mask.to_bytes(4, "big"))
+    data = mock_serial.return_value.write.call_args.args[0]
+    assert data[2] == ValuesMessage.SELECTIVE_ID
+    assert struct.unpack(">Ii", data[3:11]) == (mask, 4200)
+    assert len(data) == 2 + 9 + 3
@@ -0,0 +1,73 @@
+from bionic_boarder_simulation_tool.vesc.heartbeat_watchdog import HeartbeatTimeoutPolicy, HeartbeatWatchdog
+from threading import Event
+import time
+
+
+def test_watchdog_thread_starts_on_first_heartbeat():
+    watchdog = HeartbeatWatchdog(1.0, on_expired=lambda: None)
+    assert watchdog.running == False
+    watchdog.kick()
+    assert watchdog.running == True
+    watchdog.kick()
+    assert watchdog.heartbeat_count == 2
+    watchdog.stop()
+
+
+def test_heartbeats_in_time_do_not_expire():
+    expired = Event()
+    watchdog = HeartbeatWatchdog(0.1, on_expired=expired.set)
+    for _ in range(10):
+        watchdog.kick()
+        time.sleep(0.02)
+    assert expired.is_set() == False
+    assert watchdog.near_miss_count == 0
+    watchdog.stop()
+
+
+def test_exit_policy_expires_after_timeout():
+    expired = Event()
+    watchdog = HeartbeatWatchdog(0.05, on_expired=expired.set)
+    watchdog.kick()
+    assert expired.wait(1.0)
+    assert watchdog.expired == True
+    assert watchdog.coast_count == 0
+
+
+def test_near_miss_is_counted():
+    # The heartbeat arrives 0.1 s after the near miss fraction and 0.1 s before the timeout, so scheduling delays
+    # of a loaded host do not make the watchdog expire.
+    watchdog = HeartbeatWatchdog(1.0, on_expired=lambda: None)
+    watchdog.kick()
+    time.sleep(0.9)
+    watchdog.kick()
+    assert watchdog.near_miss_count == 1
+    assert watchdog.expired == False
+    watchdog.stop()
+
+
+def test_coast_then_exit_policy_coasts_before_expiring():
+    coasted = Event()
+    expired = Event()
+    watchdog = HeartbeatWatchdog(
+        0.05, HeartbeatTimeoutPolicy.COAST_THEN_EXIT, 0.1, coast=coasted.set, on_expired=expired.set
+    )
+    watchdog.kick()
+    assert coasted.wait(1.0)
+    assert expired.is_set() == False
+    assert expired.wait(1.0)
+    assert watchdog.coast_count == 1
+
+
+def test_coast_then_exit_policy_recovers_when_heartbeat_resumes():
+    coasted = Event()
+    expired = Event()
+    watchdog = HeartbeatWatchdog(
+        0.05, HeartbeatTimeoutPolicy.COAST_THEN_EXIT, 0.5, coast=coasted.set, on_expired=expired.set
+    )
+    watchdog.kick()
+    assert coasted.wait(1.0)
+    watchdog.kick()
+    time.sleep(0.03)
+    assert expired.is_set() == False
+    assert watchdog.running == True
+    watchdog.stop()
@@ -0,0 +1,54 @@
+import os
+import tempfile
+from bionic_boarder_simulation_tool.vesc.traffic_capture import (
+    CAPTURE_HEADER,
+    CapturingTransport,
+    TrafficDirection,
+    read_capture,
+)
+from bionic_boarder_simulation_tool.vesc.transport import PtyTransport
+
+
+def test_capture_round_trip():
+    with tempfile.TemporaryDirectory() as directory:
+        capture_file_name = os.path.join(directory, "capture.bin")
+        transport = CapturingTransport(PtyTransport(), capture_file_name)
+        client_fd = os.open(transport.transport.slave_name, os.O_RDWR | os.O_NOCTTY)
+        try:
+            os.write(client_fd, b"\x02\x01\x1e")
+            assert transport.read(3) == b"\x02\x01\x1e"
+            transport.write(b"response")
+            assert os.read(client_fd, 8) == b"response"
+        finally:
+            os.close(client_fd)
+            transport.close()
+        assert transport.frame_count == 2
+        frames = [(f.timestamp_sec, f.direction, bytes(f.data)) for f in read_capture(capture_file_name)]
+        assert [(d, data) for _, d, data in frames] == [
+            (TrafficDirection.INBOUND, b"\x02\x01\x1e"),
+            (TrafficDirection.OUTBOUND, b"response"),
+        ]
+        assert frames[0][0] <= frames[1][0]
+
+
+def test_truncated_record_is_ignored():
+    with tempfile.TemporaryDirectory() as directory:
+        capture_file_name = os.path.join(directory, "capture.bin")
+        transport = CapturingTransport(PtyTransport(), capture_file_name)
+        transport.write(b"complete")
+        transport.close()
+        with open(capture_file_name, "ab") as f:
+            f.write(b"\x00\x01")
+        assert [bytes(f.data) for f in read_capture(capture_file_name)] == [b"complete"]
+
+
+def test_read_capture_rejects_other_files():
+    with tempfile.TemporaryDirectory() as directory:
+        file_name = os.path.join(directory, "other.bin")
+        with open(file_name, "wb") as f:
+            f.write(bytes(CAPTURE_HEADER.size))
+        try:
+            list(read_capture(file_name))
+            assert False
+        except ValueError:
+            pass
@@ -0,0 +1,32 @@
+import os
+import tempfile
+from threading import Thread
+from bionic_boarder_simulation_tool.vesc.fw_6_00 import FW6_00CMP, FirmwareMessage
+from bionic_boarder_simulation_tool.vesc.traffic_capture import CapturingTransport
+from bionic_boarder_simulation_tool.vesc.traffic_replay import ReplayTarget, TrafficReplayClient
+from bionic_boarder_simulation_tool.vesc.transport import PtyTransport, TcpTransport
+
+NUMBER_OF_REQUESTS = 5
+
+
+def test_replay_at_max_speed():
+    firmware_request = bytes([2, 1, FirmwareMessage.ID]) + bytes(253)
+    response_size = len(FirmwareMessage().buffer) + 5
+    with tempfile.TemporaryDirectory() as directory:
+        capture_file_name = os.path.join(directory, "capture.bin")
+        capture = CapturingTransport(PtyTransport(), capture_file_name)
+        slave_fd = os.open(capture.transport.slave_name, os.O_RDWR | os.O_NOCTTY)
+        for _ in range(NUMBER_OF_REQUESTS):
+            os.write(slave_fd, firmware_request)
+            capture.read(len(firmware_request))
+        os.close(slave_fd)
+        capture.close()
+        transport = TcpTransport()
+        cmp = FW6_00CMP(transport, 0, 256, None, None, None, None, None)
+        Thread(target=cmp.handle_command, daemon=True).start()
+        target = ReplayTarget(f"tcp:{transport.address}")
+        stats = TrafficReplayClient(capture_file_name, speed=0).replay(target)
+        target.close()
+        assert stats["frames_sent"] == NUMBER_OF_REQUESTS
+        assert stats["bytes_sent"] == NUMBER_OF_REQUESTS * len(firmware_request)
+        assert stats["bytes_received"] == NUMBER_OF_REQUESTS * response_size
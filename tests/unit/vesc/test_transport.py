@@ -0,0 +1,140 @@
+import os
+import socket
+import struct
+import tempfile
+import pytest
+from bionic_boarder_simulation_tool.vesc.transport import (
+    PtyTransport,
+    SerialTransport,
+    TcpTransport,
+    TransportKind,
+    UnixSocketTransport,
+    create_transport,
+)
+from bionic_boarder_simulation_tool.vesc.fw_6_00 import FW6_00CMP, FirmwareMessage
+
+
+def test_serial_transport_delegates_to_serial_port(mocker):
+    mock_serial = mocker.patch("serial.Serial", autospec=True)
+    mock_serial.return_value.read.return_value = b"abc"
+    transport = SerialTransport("COM1", 230400)
+    assert transport.read(3) == b"abc"
+    transport.write(b"xyz")
+    mock_serial.return_value.write.assert_called_once_with(b"xyz")
+    assert transport.address == "COM1"
+
+
+def test_pty_transport_round_trip():
+    transport = PtyTransport()
+    client_fd = os.open(transport.slave_name, os.O_RDWR | os.O_NOCTTY)
+    try:
+        os.write(client_fd, b"\x02\x01\x00")
+        os.write(client_fd, b"\x01\x02\x03")
+        assert transport.read(6) == b"\x02\x01\x00\x01\x02\x03"
+        transport.write(b"response")
+        assert os.read(client_fd, 8) == b"response"
+    finally:
+        os.close(client_fd)
+        transport.close()
+
+
+def test_pty_transport_link_path():
+    with tempfile.TemporaryDirectory() as directory:
+        link_path = os.path.join(directory, "vesc")
+        transport = PtyTransport(link_path)
+        assert os.path.realpath(link_path) == os.path.realpath(transport.slave_name)
+        assert transport.address == link_path
+        transport.close()
+        assert not os.path.exists(link_path)
+
+
+def test_tcp_transport_round_trip():
+    transport = TcpTransport("127.0.0.1", 0)
+    host, port = transport.address.split(":")
+    client = socket.create_connection((host, int(port)))
+    try:
+        client.sendall(b"ab")
+        client.sendall(b"cd")
+        assert transport.read(4) == b"abcd"
+        transport.write(b"ok")
+        assert client.recv(2) == b"ok"
+    finally:
+        client.close()
+        transport.close()
+
+
+def test_tcp_transport_accepts_new_client_after_disconnect():
+    transport = TcpTransport("127.0.0.1", 0)
+    host, port = transport.address.split(":")
+    first = socket.create_connection((host, int(port)))
+    first.sendall(b"12")
+    first.close()
+    second = socket.create_connection((host, int(port)))
+    second.sendall(b"3456")
+    try:
+        assert transport.read(4) == b"3456"
+    finally:
+        second.close()
+        transport.close()
+
+
+def test_tcp_transport_accepts_new_client_after_reset():
+    transport = TcpTransport("127.0.0.1", 0)
+    host, port = transport.address.split(":")
+    first = socket.create_connection((host, int(port)))
+    first.sendall(b"12")
+    # Closing with a zero linger time resets the connection
+    first.setsockopt(socket.SOL_SOCKET, socket.SO_LINGER, struct.pack("ii", 1, 0))
+    first.close()
+    second = socket.create_connection((host, int(port)))
+    second.sendall(b"3456")
+    try:
+        assert transport.read(4) == b"3456"
+    finally:
+        second.close()
+        transport.close()
+
+
+def test_unix_socket_transport_round_trip():
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "vesc.sock")
+        transport = UnixSocketTransport(path)
+        client = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        client.connect(path)
+        try:
+            client.sendall(b"abc")
+            assert transport.read(3) == b"abc"
+            transport.write(b"def")
+            assert client.recv(3) == b"def"
+        finally:
+            client.close()
+            transport.close()
+        assert not os.path.exists(path)
+
+
+def test_create_transport():
+    transport = create_transport(TransportKind.TCP, "127.0.0.1:0", 230400)
+    assert isinstance(transport, TcpTransport)
+    transport.close()
+    transport = create_transport(TransportKind.PTY, "", 230400)
+    assert isinstance(transport, PtyTransport)
+    transport.close()
+    with pytest.raises(ValueError):
+        create_transport("bluetooth", "", 230400)
+
+
+def test_command_message_processor_over_pty():
+    transport = PtyTransport()
+    cmp = FW6_00CMP(transport, 0, 256, None, None, None, None, None)
+    client_fd = os.open(transport.slave_name, os.O_RDWR | os.O_NOCTTY)
+    try:
+        cmp._publish_firmware()
+        buffer = FirmwareMessage().buffer
+        expected = int.to_bytes(2) + int.to_bytes(len(buffer)) + buffer + int.to_bytes(cmp.crc16(buffer), 2) + b"\x03"
+        received = bytearray()
+        while len(received) < len(expected):
+            received += os.read(client_fd, len(expected) - len(received))
+        assert bytes(received) == expected
+    finally:
+        os.close(client_fd)
+        transport.close()
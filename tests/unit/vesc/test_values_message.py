@@ -0,0 +1,41 @@
+import struct
+from threading import Lock
+from bionic_boarder_simulation_tool.riding.eboard import EBoard
+from bionic_boarder_simulation_tool.riding.eboard_kinematic_state import EboardKinematicState
+from bionic_boarder_simulation_tool.vesc.values_message import ValuesMessage, build_values_message
+
+
+class TestValuesMessage:
+    def test_buffer_holds_all_fields(self):
+        message = ValuesMessage()
+        message.temp_fet = 35.5
+        message.rpm = 12000
+        message.status = 1
+        buffer = message.buffer
+        assert buffer[0] == ValuesMessage.ID
+        assert len(buffer) == 1 + 73
+        assert struct.unpack(">h", buffer[1:3])[0] == 355
+        assert struct.unpack(">i", buffer[23:27])[0] == 12000
+        assert buffer[-1] == 1
+
+    def test_selective_buffer_holds_selected_fields(self):
+        message = ValuesMessage()
+        message.avg_motor_current = 12.34
+        message.input_voltage = 41.2
+        mask = (1 << 2) | (1 << 8)
+        buffer = message.selective_buffer(mask)
+        assert buffer[0] == ValuesMessage.SELECTIVE_ID
+        assert struct.unpack(">Iih", buffer[1:]) == (mask, 1234, 412)
+
+    def test_packer_is_compiled_once_per_mask(self):
+        assert ValuesMessage.packer(0x3) is ValuesMessage.packer(0x3)
+        assert ValuesMessage.packer(0x0)[0].size == 0
+
+
+def test_values_message_without_a_battery_model():
+    eks = EboardKinematicState(0, 0, 0, 0, 0, 0, 0, 4200, 3.5, 10.0)
+    eb = EBoard(80.0, 0.5, 0.1, 10.0, 36.0, 2.0, 190, 6.0, 50.0, 500.0, 7)
+    vm = build_values_message(eb, eks, Lock())
+    assert vm.rpm == 4200
+    assert vm.input_voltage == 0.0 and vm.amp_hours == 0.0
+    assert vm.duty_cycle == 4200 / (190 * 36.0 * 7)